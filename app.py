@@ -1,4 +1,7 @@
 import psycopg2
+import psycopg2.errors
+import psycopg2.extensions
+import psycopg2.pool
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
@@ -6,23 +9,2034 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, Menu
 from tkinter import scrolledtext
 import threading
+import queue
+import time
+import io
+import os
+import json
+import pickle
+import base64
+import shutil
+import hashlib
+from contextlib import contextmanager, suppress
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+import multiprocessing
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 from matplotlib.figure import Figure
 import seaborn as sns
 from datetime import datetime
 import warnings
+import argparse
+import sys
+import traceback
 warnings.filterwarnings('ignore')
 
+# Столбцы результата запроса измерений (в порядке SELECT)
+MEASUREMENT_COLUMNS = [
+    'expirement_name', 'researcher', 'compound_name', 'measurements_time_hours',
+    'od_value', 'ph_value', 'temperature_celsius', 'replicate_number'
+]
+
+MEASUREMENTS_FIELDS = """
+    e.expirement_name,
+    r.fio as researcher,
+    c.compound_name,
+    m.measurements_time_hours,
+    m.od_value,
+    m.ph_value,
+    m.temperature_celsius,
+    m.replicate_number
+"""
+
+MEASUREMENTS_FROM = """
+FROM measurements m
+JOIN expirements e ON m.id_expirement = e.id_expirement
+JOIN compounds c ON m.compound_id = c.compound_id
+JOIN researchers r ON e.id_research = r.id_research
+"""
+
+MEASUREMENTS_SELECT = "SELECT " + MEASUREMENTS_FIELDS + MEASUREMENTS_FROM
+
+# id_measurement в конце: повторные измерения точки идут в порядке вставки, и первым
+# берется то же значение OD, что и в GROWTH_PUSHDOWN_QUERY
+MEASUREMENTS_ORDER = """
+ORDER BY c.compound_name, m.measurements_time_hours, m.replicate_number, m.id_measurement
+"""
+
+MEASUREMENTS_QUERY = MEASUREMENTS_SELECT + """
+WHERE m.id_expirement = %s AND m.id_measurement <= %s
+""" + MEASUREMENTS_ORDER
+
+# Только новые измерения: id_measurement в диапазоне (последний загруженный, текущий максимум]
+NEW_MEASUREMENTS_QUERY = MEASUREMENTS_SELECT + """
+WHERE m.id_expirement = %s AND m.id_measurement > %s AND m.id_measurement <= %s
+""" + MEASUREMENTS_ORDER
+
+# Несколько экспериментов одним запросом; строки идут подряд по id_expirement.
+# Параметры - массивы ID экспериментов и их версий max(id_measurement): каждый
+# эксперимент читается до своей версии, а не до общего максимума. Условие ANY
+# оставлено для планировщика - по нему строится диапазон индекса
+BATCH_COLUMNS = ['id_expirement'] + MEASUREMENT_COLUMNS
+
+BATCH_MEASUREMENTS_QUERY = "SELECT m.id_expirement," + MEASUREMENTS_FIELDS + MEASUREMENTS_FROM + """
+JOIN unnest(%(experiment_ids)s::int[], %(max_ids)s::int[]) AS v(id_expirement, max_id)
+    ON m.id_expirement = v.id_expirement AND m.id_measurement <= v.max_id
+WHERE m.id_expirement = ANY(%(experiment_ids)s)
+ORDER BY m.id_expirement, c.compound_name, m.measurements_time_hours, m.replicate_number, m.id_measurement
+"""
+
+# Дешевая проверка версии данных эксперимента (для кэша и дозагрузки)
+VERSION_QUERY = """
+SELECT count(*), max(id_measurement)
+FROM measurements
+WHERE id_expirement = %s
+"""
+
+BATCH_VERSION_QUERY = """
+SELECT id_expirement, count(*), max(id_measurement)
+FROM measurements
+WHERE id_expirement = ANY(%s)
+GROUP BY id_expirement
+"""
+
+# Столбцы и типы результатов расчета скорости роста и ингибирования
+# (id_expirement добавляется первым столбцом при расчете по нескольким экспериментам)
+GROWTH_COLUMNS = ['compound', 'replicate', 'initial_od', 'final_od', 'growth_rate', 'inhibition_percent']
+
+GROWTH_DTYPES = {
+    'id_expirement': np.int32,
+    'compound': object,
+    'replicate': np.int64,
+    'initial_od': np.float64,
+    'final_od': np.float64,
+    'growth_rate': np.float64,
+    'inhibition_percent': np.float64
+}
+
+# µmax по скользящему окну: столбцы результата и число точек в окне по умолчанию
+MUMAX_COLUMNS = ['compound', 'replicate', 'mu_max', 'window_start', 'window_end', 'r_squared', 'windows']
+
+MUMAX_DTYPES = {
+    'id_expirement': np.int32,
+    'compound': object,
+    'replicate': np.int64,
+    'mu_max': np.float64,
+    'window_start': np.float64,
+    'window_end': np.float64,
+    'r_squared': np.float64,
+    'windows': np.int64
+}
+
+DEFAULT_MUMAX_WINDOW = 3
+
+# Параметрические модели роста (логистическая, Гомпертца): столбцы результата
+FIT_MODELS = ('gompertz', 'logistic')
+
+FIT_COLUMNS = ['compound', 'replicate', 'model', 'mu_max', 'lag_time', 'carrying_capacity',
+               'amplitude', 'rss', 'r_squared', 'points', 'iterations', 'converged']
+
+FIT_DTYPES = {
+    'id_expirement': np.int32,
+    'compound': object,
+    'replicate': np.int64,
+    'model': object,
+    'mu_max': np.float64,
+    'lag_time': np.float64,
+    'carrying_capacity': np.float64,
+    'amplitude': np.float64,
+    'rss': np.float64,
+    'r_squared': np.float64,
+    'points': np.int64,
+    'iterations': np.int64,
+    'converged': bool
+}
+
+FIT_MAX_ITER = 200
+# Кривых в одной задаче пула процессов; меньшие объемы считаются в текущем процессе
+DEFAULT_FIT_SHARD = 512
+
+# Бутстреп-интервалы ингибирования: число повторных выборок и соединений в одной задаче
+DEFAULT_BOOTSTRAP_RESAMPLES = 10000
+DEFAULT_BOOTSTRAP_CHUNK = 64
+
+# Признак контрольной группы в названии соединения
+CONTROL_MARKER = 'Контроль'
+
+# Свертка измерений до начальной и конечной OD каждой пары (соединение, реплика)
+# на стороне PostgreSQL: клиенту возвращается одна строка на пару. Порядок строк
+# совпадает с расчетом в pandas: соединения по ORDER BY compound_name,
+# реплики - в порядке первого появления.
+GROWTH_PUSHDOWN_QUERY = """
+WITH per_replicate AS (
+    SELECT
+        c.compound_name AS compound,
+        m.replicate_number AS replicate,
+        min(m.measurements_time_hours) AS first_time,
+        (array_agg(m.od_value::float8 ORDER BY m.id_measurement)
+            FILTER (WHERE m.measurements_time_hours = %(start_time)s))[1] AS initial_od,
+        (array_agg(m.od_value::float8 ORDER BY m.id_measurement)
+            FILTER (WHERE m.measurements_time_hours = %(end_time)s))[1] AS final_od
+    FROM measurements m
+    JOIN compounds c ON m.compound_id = c.compound_id
+    WHERE m.id_expirement = %(experiment_id)s AND m.id_measurement <= %(max_id)s
+      AND m.replicate_number IS NOT NULL
+    GROUP BY c.compound_name, m.replicate_number
+)
+SELECT compound, replicate, initial_od, final_od
+FROM per_replicate
+WHERE initial_od > 0 AND final_od > 0 AND %(end_time)s > %(start_time)s
+ORDER BY compound, first_time, replicate
+"""
+
+# Окна (start_time, end_time), для которых ведется сводка growth_summary
+STANDARD_GROWTH_WINDOWS = [(0, 24)]
+
+# Сводка окна вместе с версией, по которой она построена. Нет строк - сводки нет
+# или она устарела; одна строка с NULL в compound_name - сводка свежая, но пустая.
+GROWTH_SUMMARY_QUERY = """
+SELECT g.compound_name AS compound, g.replicate_number AS replicate,
+       g.initial_od, g.final_od, g.growth_rate
+FROM growth_summary_state s
+LEFT JOIN growth_summary g
+    ON g.id_expirement = s.id_expirement AND g.start_time = s.start_time AND g.end_time = s.end_time
+WHERE s.id_expirement = %s AND s.start_time = %s AND s.end_time = %s
+  AND s.measurement_count = %s AND s.max_measurement_id IS NOT DISTINCT FROM %s
+ORDER BY g.position
+"""
+
+GROWTH_SUMMARY_STATE_QUERY = """
+SELECT start_time::float8, end_time::float8, measurement_count, max_measurement_id
+FROM growth_summary_state
+WHERE id_expirement = %s
+"""
+
+# Компактные типы столбцов загруженных измерений
+# (реплика читается как float, чтобы допускать NULL, и затем сужается до малого целого;
+# pH и температура - DECIMAL(10,2) и остаются float64: во float32 7.1 выгружается как 7.0999999)
+COLUMN_DTYPES = {
+    'id_expirement': np.int32,
+    'expirement_name': 'category',
+    'researcher': 'category',
+    'compound_name': 'category',
+    'measurements_time_hours': np.float64,
+    'od_value': np.float64,
+    'ph_value': np.float64,
+    'temperature_celsius': np.float64,
+    'replicate_number': np.float64
+}
+
+# Типы столбцов до оптимизации (для отчета о памяти)
+LEGACY_DTYPES = {
+    'id_expirement': np.int64,
+    'expirement_name': object,
+    'researcher': object,
+    'compound_name': object,
+    'measurements_time_hours': np.float64,
+    'od_value': np.float64,
+    'ph_value': np.float64,
+    'temperature_celsius': np.float64,
+    'replicate_number': np.int64
+}
+
+# DECIMAL из PostgreSQL сразу в float вместо объектов decimal.Decimal
+DECIMAL_TO_FLOAT = psycopg2.extensions.new_type(
+    psycopg2.extensions.DECIMAL.values, 'DECIMAL_TO_FLOAT',
+    lambda value, cursor: float(value) if value is not None else None
+)
+
+# Размер порции строк для серверного курсора
+DEFAULT_CHUNK_SIZE = 50000
+
+# Потоковая статистика при загрузке: столбцы со сводкой (как describe) и сжатие t-digest
+# (для каждого соединения - грубее, чтобы память не росла с числом соединений)
+STATS_COLUMNS = {
+    'od_value': 'Оптическая плотность (OD)',
+    'ph_value': 'pH',
+    'temperature_celsius': 'Температура'
+}
+DEFAULT_DIGEST_COMPRESSION = 200
+COMPOUND_DIGEST_COMPRESSION = 50
+
+# Режим 'reduce' для экспериментов больше памяти: общий лимит памяти загрузки
+# (четверть - на порцию строк) и оценка размера строки порции в объектах Python
+DEFAULT_OUT_OF_CORE_BYTES = 512 * 2**20
+STREAM_ROW_BYTES = 400
+
+# Таблица просмотра данных: (столбец, заголовок, ширина, формат числа или None для текста)
+# и предел длины подписи
+TABLE_COLUMNS = [
+    ('expirement_name', "Эксперимент", 200, None),
+    ('researcher', "Исследователь", 180, None),
+    ('compound_name', "Соединение", 150, None),
+    ('measurements_time_hours', "Время (ч)", 100, "{:.1f}"),
+    ('od_value', "OD", 100, "{:.4f}"),
+    ('ph_value', "pH", 80, "{:.2f}"),
+    ('temperature_celsius', "Температура", 120, "{:.2f}"),
+    ('replicate_number', "Реплика", 80, "{:g}")
+]
+TABLE_TEXT_LIMIT = 50
+
+# Очередь обновлений интерфейса: период опроса (мс) и время на обновления за один опрос (с)
+UI_POLL_MS = 16
+UI_FRAME_BUDGET = 0.008
+
+# Графики: разрешение отрисовки вне экрана и оформление графиков OD от условий через 24 ч
+PLOT_DPI = 100
+CONDITION_PLOT_STYLES = {
+    'temperature_celsius': {
+        'cmap': plt.cm.Set2, 'marker': 'o', 'xlabel': 'Температура, °C',
+        'title': 'Влияние температуры на рост микроорганизмов (24 ч)'
+    },
+    'ph_value': {
+        'cmap': plt.cm.Set3, 'marker': 's', 'xlabel': 'pH',
+        'title': 'Влияние pH на рост микроорганизмов (24 ч)'
+    }
+}
+
+# Фоновые задачи интерфейса: число рабочих потоков, длина истории и группа задач,
+# которые относятся к загруженному эксперименту (отменяются при загрузке другого)
+DEFAULT_JOB_WORKERS = 4
+JOB_HISTORY = 50
+EXPERIMENT_JOBS = 'experiment'
+JOB_STATES = {
+    'queued': "в очереди",
+    'running': "выполняется",
+    'done': "готово",
+    'failed': "ошибка",
+    'cancelled': "отменено"
+}
+
+# Пул соединений: максимум одновременных соединений и период проверки простаивающих
+DEFAULT_POOL_SIZE = 8
+HEALTH_CHECK_INTERVAL = 30.0
+
+# Кэш результатов анализа в памяти: число хранимых таблиц
+DEFAULT_ANALYSIS_CACHE_ENTRIES = 32
+
+# Кэш отрисованных графиков: объем в памяти и на диске (подкаталог локального кэша)
+DEFAULT_FIGURE_CACHE_BYTES = 64 * 1024**2
+DEFAULT_FIGURE_DISK_BYTES = 256 * 1024**2
+FIGURE_CACHE_SUBDIR = "figures"
+
+# Локальный кэш экспериментов
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".lab_analyzer", "cache")
+DEFAULT_CACHE_BYTES = 2 * 1024**3
+
+# Версионированные миграции схемы: NNN_имя.sql (откат - NNN_имя.down.sql)
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+class ColumnBuffer:
+    """Растущий типизированный массив для потоковой загрузки одного столбца"""
+    
+    def __init__(self, dtype, capacity=1024):
+        self.array = np.empty(capacity, dtype=dtype)
+        self.size = 0
+    
+    def extend(self, values):
+        values = np.asarray(values, dtype=self.array.dtype)
+        needed = self.size + len(values)
+        
+        if needed > len(self.array):
+            # resize на месте: realloc крупных блоков обычно обходится без копирования,
+            # поэтому пик памяти остается близким к итоговому размеру столбца
+            self.array.resize(max(needed, int(len(self.array) * 1.5)), refcheck=False)
+        
+        self.array[self.size:needed] = values
+        self.size = needed
+    
+    def view(self, start=0):
+        return self.array[start:self.size]
+    
+    def reset(self):
+        self.size = 0
+    
+    def finalize(self):
+        self.array.resize(self.size, refcheck=False)
+        return self.array
+
+class CategoryBuffer:
+    """Словарное кодирование строкового столбца при потоковой загрузке"""
+    
+    def __init__(self, capacity=1024):
+        self.codes = ColumnBuffer(np.int32, capacity)
+        self.mapping = {}
+    
+    def extend(self, values):
+        mapping = self.mapping
+        self.codes.extend([mapping.setdefault(value, len(mapping)) for value in values])
+    
+    @property
+    def size(self):
+        return self.codes.size
+    
+    def view(self, start=0):
+        """Коды строк начиная со start (названия - в порядке mapping)"""
+        return self.codes.view(start)
+    
+    def reset(self):
+        # Словарь сохраняется, чтобы коды оставались согласованными между порциями
+        self.codes.reset()
+    
+    def finalize(self):
+        return pd.Categorical.from_codes(self.codes.finalize(), categories=list(self.mapping))
+
+def make_column_buffer(dtype):
+    return CategoryBuffer() if dtype == 'category' else ColumnBuffer(dtype)
+
+class QuantileDigest:
+    """Сжатое представление распределения (t-digest) для приближенных квантилей.
+
+    Хранит центроиды (группа, среднее, вес) сразу для многих групп; внутри группы
+    центроиды упорядочены по среднему. Центроиды сливаются по шкале k1: в хвостах
+    они мельче, поэтому крайние квантили точнее. На группу - порядка compression / 2 центроидов.
+    """
+    
+    def __init__(self, compression=DEFAULT_DIGEST_COMPRESSION):
+        self.compression = compression
+        self.groups = np.empty(0, dtype=np.int64)
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self._sorted = True
+    
+    def update(self, values, groups=None, weights=None):
+        values = np.asarray(values, dtype=np.float64)
+        if not len(values):
+            return
+        groups = np.zeros(len(values), dtype=np.int64) if groups is None else np.asarray(groups, dtype=np.int64)
+        weights = np.ones(len(values)) if weights is None else np.asarray(weights, dtype=np.float64)
+        
+        # Пересжимаются только группы, получившие новые значения; остальные центроиды не трогаем
+        touched = np.zeros(max(int(groups.max()), int(self.groups.max()) if len(self.groups) else 0) + 1, dtype=bool)
+        touched[groups] = True
+        kept = ~touched[self.groups]
+        
+        groups = np.concatenate([self.groups[~kept], groups])
+        means = np.concatenate([self.means[~kept], values])
+        weights = np.concatenate([self.weights[~kept], weights])
+        # Сортировка по значению, затем устойчивая (поразрядная для целых) по группе - быстрее lexsort
+        order = np.argsort(means)
+        order = order[np.argsort(groups[order], kind='stable')]
+        groups, means, weights = groups[order], means[order], weights[order]
+        
+        # Доля веса группы левее каждого центроида
+        starts = np.flatnonzero(np.concatenate([[True], groups[1:] != groups[:-1]]))
+        sizes = np.diff(np.append(starts, len(groups)))
+        cumulative = np.cumsum(weights) - weights
+        before = np.repeat(cumulative[starts], sizes)
+        totals = np.repeat(np.add.reduceat(weights, starts), sizes)
+        left = (cumulative - before) / totals
+        
+        # Соседние центроиды одной группы в одной ячейке шкалы k1 сливаются
+        cells = np.floor(self.compression / (2 * np.pi) * np.arcsin(2 * left - 1))
+        merged = np.flatnonzero(np.concatenate([[True], (cells[1:] != cells[:-1]) | (groups[1:] != groups[:-1])]))
+        weights, means = np.add.reduceat(weights, merged), np.add.reduceat(means * weights, merged)
+        
+        # Обновленные группы дописываются в конец; упорядочение по группе - при первом запросе квантиля
+        self.groups = np.concatenate([self.groups[kept], groups[merged]])
+        self.means = np.concatenate([self.means[kept], means / weights])
+        self.weights = np.concatenate([self.weights[kept], weights])
+        self._sorted = False
+    
+    def merge(self, other):
+        self.update(other.means, other.groups, other.weights)
+    
+    def quantile(self, q, low, high, group=0):
+        """Квантиль q группы; low / high - точные минимум и максимум группы"""
+        if not self._sorted:
+            # Устойчивая сортировка по группе сохраняет порядок центроидов внутри группы
+            order = np.argsort(self.groups, kind='stable')
+            self.groups, self.means, self.weights = self.groups[order], self.means[order], self.weights[order]
+            self._sorted = True
+        start, end = np.searchsorted(self.groups, [group, group + 1])
+        if start == end:
+            return np.nan
+        means, weights = self.means[start:end], self.weights[start:end]
+        total = weights.sum()
+        centers = np.cumsum(weights) - weights / 2
+        return float(np.interp(q * total, np.concatenate([[0], centers, [total]]),
+                               np.concatenate([[low], means, [high]])))
+
+class RunningStats:
+    """Число, среднее, дисперсия, min / max и квантили столбца по группам, накапливаемые по порциям.
+
+    Среднее и дисперсия - по Уэлфорду: порция сводится к (n, среднее, M2) каждой группы
+    и сливается с накопленным итогом формулой Чана, без повторного прохода по строкам.
+    Все группы обновляются одними векторными операциями.
+    """
+    
+    def __init__(self, compression=DEFAULT_DIGEST_COMPRESSION):
+        self.count = np.zeros(0, dtype=np.int64)
+        self.mean = np.zeros(0)
+        self.m2 = np.zeros(0)
+        self.min = np.zeros(0)
+        self.max = np.zeros(0)
+        self.digest = QuantileDigest(compression)
+    
+    def _grow(self, size):
+        if size <= len(self.count):
+            return
+        extra = size - len(self.count)
+        self.count = np.concatenate([self.count, np.zeros(extra, dtype=np.int64)])
+        self.mean = np.concatenate([self.mean, np.zeros(extra)])
+        self.m2 = np.concatenate([self.m2, np.zeros(extra)])
+        self.min = np.concatenate([self.min, np.full(extra, np.nan)])
+        self.max = np.concatenate([self.max, np.full(extra, np.nan)])
+    
+    def update(self, values, groups=None):
+        """values - порция значений, groups - номера групп строк (по умолчанию одна группа 0)"""
+        values = np.asarray(values, dtype=np.float64)
+        present = ~np.isnan(values)
+        values = values[present]
+        groups = np.zeros(len(values), dtype=np.int64) if groups is None else np.asarray(groups)[present]
+        if not len(values):
+            return
+        size = int(groups.max()) + 1
+        self._grow(size)
+        
+        count = np.bincount(groups, minlength=size)
+        mean = np.bincount(groups, weights=values, minlength=size) / np.maximum(count, 1)
+        m2 = np.bincount(groups, weights=(values - mean[groups]) ** 2, minlength=size)
+        touched = np.flatnonzero(count)
+        count, mean, m2 = count[touched], mean[touched], m2[touched]
+        
+        # min / max групп - по отсортированным по группе значениям
+        order = np.argsort(groups, kind='stable')
+        starts = np.concatenate([[0], np.cumsum(count)[:-1]])
+        low = np.minimum.reduceat(values[order], starts)
+        high = np.maximum.reduceat(values[order], starts)
+        
+        total = self.count[touched] + count
+        delta = mean - self.mean[touched]
+        self.mean[touched] += delta * count / total
+        self.m2[touched] += m2 + delta ** 2 * self.count[touched] * count / total
+        self.count[touched] = total
+        self.min[touched] = np.fmin(self.min[touched], low)
+        self.max[touched] = np.fmax(self.max[touched], high)
+        self.digest.update(values, groups)
+    
+    def variance(self, group=0):
+        count = self.count[group] if group < len(self.count) else 0
+        return self.m2[group] / (count - 1) if count > 1 else np.nan
+    
+    def quantile(self, q, group=0):
+        if group >= len(self.count):
+            return np.nan
+        return self.digest.quantile(q, self.min[group], self.max[group], group)
+    
+    def describe(self, group=0):
+        """Сводка группы с ключами DataFrame.describe(); квантили приближенные"""
+        if group >= len(self.count) or not self.count[group]:
+            return {'count': 0.0, 'mean': np.nan, 'std': np.nan, 'min': np.nan,
+                    '25%': np.nan, '50%': np.nan, '75%': np.nan, 'max': np.nan}
+        return {'count': float(self.count[group]), 'mean': float(self.mean[group]),
+                'std': float(np.sqrt(self.variance(group))), 'min': float(self.min[group]),
+                '25%': self.quantile(0.25, group), '50%': self.quantile(0.5, group),
+                '75%': self.quantile(0.75, group), 'max': float(self.max[group])}
+
+class MeasurementStats:
+    """Статистика измерений, накапливаемая по мере чтения строк: в целом и по соединениям.
+
+    update() принимает порцию столбцов, поэтому статистика считается в том же проходе,
+    что и загрузка, а для уже загруженного кадра - одним проходом update_frame().
+    Соединения - группы RunningStats с номерами из compound_index.
+    """
+    
+    def __init__(self, columns=tuple(STATS_COLUMNS)):
+        self.columns = list(columns)
+        self.rows = 0
+        self.totals = {col: RunningStats() for col in self.columns}
+        self.compounds = {col: RunningStats(COMPOUND_DIGEST_COMPRESSION) for col in self.columns}
+        self.compound_index = {}
+        self.time_min = np.nan
+        self.time_max = np.nan
+        self.replicates = set()
+    
+    def clear(self):
+        self.__init__(self.columns)
+    
+    def update(self, columns, compound_codes, compound_names):
+        """Порция строк: columns - {столбец: массив}, compound_codes - коды в compound_names (-1 - нет)"""
+        compound_codes = np.asarray(compound_codes)
+        self.rows += len(compound_codes)
+        if 'measurements_time_hours' in columns:
+            time = np.asarray(columns['measurements_time_hours'], dtype=np.float64)
+            if len(time) and not np.isnan(time).all():
+                self.time_min = np.fmin(self.time_min, np.nanmin(time))
+                self.time_max = np.fmax(self.time_max, np.nanmax(time))
+        if 'replicate_number' in columns:
+            replicate = pd.unique(pd.Series(columns['replicate_number']).dropna())
+            self.replicates.update(replicate.tolist())
+        
+        # Коды порции -> постоянные номера соединений
+        index = self.compound_index
+        used = np.unique(compound_codes[compound_codes >= 0])
+        lookup = np.full(len(compound_names), -1, dtype=np.int64)
+        lookup[used] = [index.setdefault(name, len(index)) for name in np.asarray(compound_names, dtype=object)[used]]
+        named = compound_codes >= 0
+        groups = lookup[compound_codes[named]]
+        
+        for col in self.columns:
+            if col in columns:
+                values = np.asarray(columns[col], dtype=np.float64)
+                self.totals[col].update(values)
+                self.compounds[col].update(values[named], groups)
+    
+    def update_frame(self, data):
+        codes, names = pd.factorize(data['compound_name'])
+        columns = [col for col in self.columns + ['measurements_time_hours', 'replicate_number'] if col in data.columns]
+        self.update({col: data[col].to_numpy() for col in columns}, codes, names)
+    
+    def summary(self):
+        """Сводка в формате get_statistics"""
+        stats = {
+            'Общие': {
+                'Всего измерений': self.rows,
+                'Количество соединений': len(self.compound_index),
+                'Количество реплик': len(self.replicates),
+                'Временной диапазон': f"{self.time_min} - {self.time_max} ч"
+            }
+        }
+        for col in self.columns:
+            stats[STATS_COLUMNS.get(col, col)] = self.totals[col].describe()
+        return stats
+    
+    def compound_summary(self, col='od_value'):
+        """{соединение: describe() столбца col}"""
+        return {compound: self.compounds[col].describe(group) for compound, group in self.compound_index.items()}
+
+class MeasurementReduction:
+    """Свертка измерений по ключу (соединение, реплика, время) для экспериментов больше памяти.
+
+    Порции строк сводятся к первым значениям OD, pH и температуры в каждой точке (их
+    используют расчеты роста) и к числу, среднему и M2 всех OD точки (для кривых роста).
+    Строки из БД и из кэша идут по возрастанию ключа, поэтому свертки порций просто
+    дописываются в столбцовые буферы (сливается только точка на границе порций). Если
+    порядок нарушен, свертки копятся и сливаются, когда их становится столько же, сколько
+    уже слитых точек. Если свертка занимает больше max_bytes - MemoryError.
+    """
+    
+    KEYS = ['compound', 'replicate_number', 'measurements_time_hours']
+    FIRST = ['od_value', 'ph_value', 'temperature_celsius']
+    DTYPES = {
+        'compound': np.int32,
+        'replicate_number': np.float64,
+        'measurements_time_hours': np.float64,
+        'od_value': np.float64,
+        'ph_value': np.float64,
+        'temperature_celsius': np.float64,
+        'rows': np.int64,
+        'od_count': np.int64,
+        'od_mean': np.float64,
+        'od_m2': np.float64
+    }
+    
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes
+        self.compound_index = {}
+        self.labels = {}
+        self.rows = 0
+        self._buffers = {col: ColumnBuffer(dtype) for col, dtype in self.DTYPES.items()}
+        self._merged = None
+        self._parts = []
+        self._part_rows = 0
+    
+    def clear(self):
+        self.__init__(self.max_bytes)
+    
+    def update(self, columns, compound_codes, compound_names):
+        """Порция строк в формате MeasurementStats.update"""
+        compound_codes = np.asarray(compound_codes)
+        self.rows += len(compound_codes)
+        for col in ('expirement_name', 'researcher'):
+            if col in columns and col not in self.labels and len(columns[col]):
+                self.labels[col] = columns[col][0]
+        
+        # Строки без соединения в пары не входят - как в ordered_pairs
+        index = self.compound_index
+        used = np.unique(compound_codes[compound_codes >= 0])
+        lookup = np.full(len(compound_names), -1, dtype=np.int64)
+        lookup[used] = [index.setdefault(name, len(index)) for name in np.asarray(compound_names, dtype=object)[used]]
+        named = compound_codes >= 0
+        
+        frame = pd.DataFrame({'compound': lookup[compound_codes[named]]})
+        for col in self.KEYS[1:] + self.FIRST:
+            values = columns.get(col)
+            frame[col] = np.asarray(values, dtype=np.float64)[named] if values is not None else np.nan
+        if frame.empty:
+            return
+        
+        od = frame['od_value'].to_numpy()
+        present = ~np.isnan(od)
+        part = self._combine(frame.assign(rows=1, od_count=present.astype(np.int64), od_mean=od,
+                                          od_m2=np.where(present, 0.0, np.nan)))
+        
+        if self._buffers is not None and self._append_sorted(part):
+            self._check_memory()
+            return
+        if self._buffers is not None:
+            # Порядок ключей нарушен - дальше копим свертки порций и периодически сливаем
+            self._merged = self._buffer_frame()
+            self._buffers = None
+        self._parts.append(part)
+        self._part_rows += len(part)
+        if self._part_rows >= max(len(self._merged), 1 << 16):
+            self._merge()
+        self._check_memory()
+    
+    def update_frame(self, data):
+        codes, names = pd.factorize(data['compound_name'])
+        self.update({col: data[col].to_numpy() for col in data.columns if col != 'compound_name'}, codes, names)
+    
+    @classmethod
+    def _sort_keys(cls, frame):
+        # Порядок ORDER BY compound_name, время, реплика; NULL - в конце, как в PostgreSQL
+        return (frame['compound'].to_numpy(np.float64),
+                frame['measurements_time_hours'].fillna(np.inf).to_numpy(),
+                frame['replicate_number'].fillna(np.inf).to_numpy())
+    
+    def _append_sorted(self, part):
+        """Дописывает свертку порции, если ее ключи идут после уже записанных"""
+        compound, time, replicate = self._sort_keys(part)
+        increasing = (compound[1:] > compound[:-1]) | ((compound[1:] == compound[:-1]) & (
+            (time[1:] > time[:-1]) | ((time[1:] == time[:-1]) & (replicate[1:] > replicate[:-1]))))
+        if not increasing.all():
+            return False
+        
+        buffers = self._buffers
+        size = buffers['compound'].size
+        if size:
+            last = self._buffer_frame(size - 1)
+            last_key = tuple(key[0] for key in self._sort_keys(last))
+            first_key = (compound[0], time[0], replicate[0])
+            if first_key < last_key:
+                return False
+            if first_key == last_key:
+                # Точка продолжается из прошлой порции - сливаем две строки
+                merged = self._combine(pd.concat([last, part.iloc[:1]], ignore_index=True))
+                for col, buffer in buffers.items():
+                    buffer.array[size - 1] = merged[col].iloc[0]
+                part = part.iloc[1:]
+        
+        for col, buffer in buffers.items():
+            buffer.extend(part[col].to_numpy())
+        return True
+    
+    def _buffer_frame(self, start=0):
+        return pd.DataFrame({col: buffer.view(start) for col, buffer in self._buffers.items()})
+    
+    @classmethod
+    def _combine(cls, part):
+        """Слияние строк с одинаковым ключом: первые значения - по порядку строк, OD - формулой Чана"""
+        groups = part.groupby(cls.KEYS, sort=False, dropna=False).ngroup().to_numpy()
+        size = int(groups.max()) + 1 if len(groups) else 0
+        _, first = np.unique(groups, return_index=True)
+        
+        count = part['od_count'].to_numpy()
+        mean = np.where(count > 0, part['od_mean'].to_numpy(), 0.0)
+        m2 = np.where(count > 0, part['od_m2'].to_numpy(), 0.0)
+        total = np.bincount(groups, weights=count, minlength=size)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            combined_mean = np.bincount(groups, weights=count * mean, minlength=size) / total
+            combined_m2 = np.bincount(groups, weights=m2 + count * (mean - combined_mean[groups]) ** 2, minlength=size)
+        
+        result = part.iloc[first][cls.KEYS + cls.FIRST].reset_index(drop=True)
+        result['rows'] = np.bincount(groups, weights=part['rows'].to_numpy(), minlength=size).astype(np.int64)
+        result['od_count'] = total.astype(np.int64)
+        result['od_mean'] = np.where(total > 0, combined_mean, np.nan)
+        result['od_m2'] = np.where(total > 0, combined_m2, np.nan)
+        return result
+    
+    def _merge(self):
+        if self._buffers is not None:
+            return
+        if self._parts:
+            self._merged = self._combine(pd.concat([self._merged] + self._parts, ignore_index=True))
+        self._parts = []
+        self._part_rows = 0
+    
+    def _check_memory(self):
+        if self.max_bytes is not None and self.nbytes > self.max_bytes:
+            raise MemoryError(f"Свертка эксперимента ({self.rows} строк, {self.nbytes / 2**20:.1f} МБ) "
+                              f"превышает лимит {self.max_bytes / 2**20:.1f} МБ")
+    
+    @property
+    def nbytes(self):
+        if self._buffers is not None:
+            return int(sum(buffer.array.nbytes for buffer in self._buffers.values()))
+        frames = [self._merged] + self._parts
+        return int(sum(frame.memory_usage(index=False).sum() for frame in frames))
+    
+    def table(self):
+        """Свертка: по строке на точку в порядке первого появления"""
+        if self._buffers is not None:
+            return self._buffer_frame()
+        self._merge()
+        return self._merged
+    
+    def _columns(self):
+        # Столбцы свертки без сборки кадра (в буферах - представления без копий)
+        if self._buffers is not None:
+            return {col: buffer.view() for col, buffer in self._buffers.items()}
+        self._merge()
+        return {col: self._merged[col].to_numpy() for col in self._merged.columns}
+    
+    def __len__(self):
+        return len(self._columns()['compound'])
+    
+    def measurements(self):
+        """Кадр измерений по одной строке на точку (первые значения) в порядке первого появления.
+
+        Для расчетов роста, µmax и моделей он равнозначен полному кадру: они берут
+        первое измерение пары в каждой точке времени.
+        """
+        table = self._columns()
+        # Подписи эксперимента одинаковы во всех строках - сразу категориями, без массива строк
+        codes = np.zeros(len(table['compound']), dtype=np.int8)
+        data = pd.DataFrame({col: pd.Categorical.from_codes(codes, categories=[value])
+                             for col, value in self.labels.items()})
+        data['compound_name'] = pd.Categorical.from_codes(table['compound'],
+                                                          categories=list(self.compound_index))
+        for col in ['measurements_time_hours', 'od_value', 'ph_value', 'temperature_celsius', 'replicate_number']:
+            data[col] = np.array(table[col])
+        return optimize_dtypes(data)
+    
+    def curve_aggregates(self):
+        """Среднее и стандартное отклонение всех OD по (соединение, время) - как groupby по полным данным"""
+        table = self.table()
+        points = table[table['measurements_time_hours'].notna()]
+        points = points.assign(weighted=points['od_count'] * points['od_mean'].fillna(0.0))
+        grouped = points.groupby(['compound', 'measurements_time_hours'], sort=True)
+        result = grouped.agg(count=('od_count', 'sum'), total=('weighted', 'sum')).reset_index()
+        result['mean'] = result['total'] / result['count'].where(result['count'] > 0)
+        
+        # M2 по всем точкам: сумма M2 точек плюс n·(среднее точки - общее среднее)²
+        points = points.merge(result[['compound', 'measurements_time_hours', 'mean']],
+                              on=['compound', 'measurements_time_hours'])
+        points['spread'] = points['od_m2'].fillna(0.0) + points['od_count'] * (
+            points['od_mean'].fillna(0.0) - points['mean']) ** 2
+        m2 = points.groupby(['compound', 'measurements_time_hours'], sort=True)['spread'].sum().to_numpy()
+        result['std'] = np.sqrt(m2 / (result['count'] - 1).where(result['count'] > 1))
+        result['compound'] = np.asarray(list(self.compound_index), dtype=object)[result['compound'].to_numpy()]
+        return result[['compound', 'measurements_time_hours', 'count', 'mean', 'std']]
+
+def optimize_dtypes(data):
+    """Приведение столбцов измерений к компактным типам: float, категории, малые целые"""
+    for col, dtype in COLUMN_DTYPES.items():
+        if col not in data.columns:
+            continue
+        if col == 'replicate_number':
+            replicate = pd.to_numeric(data[col])
+            if not replicate.isna().any():
+                data[col] = pd.to_numeric(replicate.astype(np.int64), downcast='integer')
+        elif data[col].dtype != dtype:
+            data[col] = data[col].astype(dtype)
+    return data
+
+def append_measurements(data, new_rows, compound_order=None):
+    """Добавление новых измерений с сохранением порядка (соединение, время, реплика).
+
+    compound_order - порядок названий соединений (как в ORDER BY базы данных);
+    по умолчанию соединения сохраняют прежний порядок, а новые идут следом.
+    """
+    if new_rows.empty:
+        return data
+    
+    columns = {}
+    for col in data.columns:
+        if isinstance(data[col].dtype, pd.CategoricalDtype):
+            columns[col] = pd.api.types.union_categoricals(
+                [data[col].array, new_rows[col].astype('category').array])
+        else:
+            columns[col] = np.concatenate([data[col].to_numpy(), new_rows[col].to_numpy()])
+    combined = pd.DataFrame(columns, columns=data.columns)
+    
+    if compound_order is None:
+        compound_order = pd.unique(combined['compound_name'])
+    compound_rank = pd.Categorical(combined['compound_name'], categories=compound_order).codes
+    order = np.lexsort((combined['replicate_number'].to_numpy(),
+                        combined['measurements_time_hours'].to_numpy(),
+                        compound_rank))
+    return combined.iloc[order].reset_index(drop=True)
+
+def ordered_pairs(data):
+    """Строки измерений с парами (соединение, реплика) и сами пары в порядке расчета.
+
+    Соединения идут в порядке первого появления в data, реплики внутри соединения - тоже.
+    В кадре нескольких экспериментов (есть id_expirement) пары берутся внутри
+    каждого эксперимента. Возвращает (ключи пары, строки, пары).
+    """
+    group_keys = ['compound_name']
+    if 'id_expirement' in data.columns:
+        group_keys = ['id_expirement'] + group_keys
+    keys = group_keys + ['replicate_number']
+    
+    # Порядок соединения - по первой его строке, даже если у нее нет реплики;
+    # строки без соединения или реплики пар не образуют
+    rows = data[keys + ['measurements_time_hours', 'od_value']].dropna(subset=group_keys)
+    rows = rows.assign(_position=np.arange(len(rows)))
+    rows['_rank'] = rows.groupby(group_keys, observed=True, sort=False)['_position'].transform('min')
+    rows = rows.dropna(subset=['replicate_number'])
+    
+    pairs = rows.drop_duplicates(keys).sort_values(['_rank', '_position'], kind='stable')[keys]
+    return keys, rows, pairs.reset_index(drop=True)
+
+def compute_growth_rates(data, start_time, end_time):
+    """Скорость роста µ = (ln OD_end - ln OD_start) / Δt для каждой пары (соединение, реплика).
+
+    Все пары считаются за один проход (порядок пар - см. ordered_pairs); OD берется
+    из первой строки с нужным временем. Для кадра нескольких экспериментов
+    столбец id_expirement переходит в результат.
+    """
+    keys, rows, pairs = ordered_pairs(data)
+    
+    time_diff = end_time - start_time
+    if time_diff <= 0:
+        return growth_frame(pd.DataFrame(columns=keys))
+    
+    time = rows['measurements_time_hours']
+    initial = rows[time == start_time].drop_duplicates(keys)[keys + ['od_value']]
+    final = rows[time == end_time].drop_duplicates(keys)[keys + ['od_value']]
+    results = (pairs
+               .merge(initial.rename(columns={'od_value': 'initial_od'}), on=keys)
+               .merge(final.rename(columns={'od_value': 'final_od'}), on=keys))
+    results = results[(results['initial_od'] > 0) & (results['final_od'] > 0)]
+    
+    results = results.rename(columns={'compound_name': 'compound', 'replicate_number': 'replicate'})
+    results['compound'] = results['compound'].astype(object)
+    results['growth_rate'] = (np.log(results['final_od']) - np.log(results['initial_od'])) / time_diff
+    return growth_frame(results)
+
+def curve_matrix(data):
+    """Кинетические кривые всех пар в виде матрицы ln OD (пары × точки времени).
+
+    Возвращает (пары с колонками compound, replicate и, если есть, id_expirement;
+    точки времени; матрицу). В ячейке - первое измерение пары в этой точке,
+    пропуск и OD <= 0 - NaN.
+    """
+    keys, rows, pairs = ordered_pairs(data)
+    times = np.unique(rows['measurements_time_hours'].dropna().to_numpy(dtype=np.float64))
+    
+    pair_index = rows[keys].merge(pairs.assign(_pair=np.arange(len(pairs))), on=keys, how='left')['_pair']
+    points = pd.DataFrame({
+        'pair': pair_index.to_numpy(),
+        'time': np.searchsorted(times, rows['measurements_time_hours'].to_numpy(dtype=np.float64)),
+        'od': rows['od_value'].to_numpy(dtype=np.float64)
+    })[rows['measurements_time_hours'].notna().to_numpy()].drop_duplicates(['pair', 'time'])
+    log_od = np.full((len(pairs), len(times)), np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_od[points['pair'].to_numpy(), points['time'].to_numpy()] = np.where(
+            points['od'] > 0, np.log(points['od']), np.nan)
+    
+    pairs = pairs.rename(columns={'compound_name': 'compound', 'replicate_number': 'replicate'})
+    pairs['compound'] = pairs['compound'].astype(object)
+    return pairs, times, log_od
+
+def compute_max_growth_rates(data, window=DEFAULT_MUMAX_WINDOW):
+    """Максимальная удельная скорость роста µmax по всей кинетической кривой.
+
+    Для каждой пары (соединение, реплика) ln OD аппроксимируется прямой в каждом окне
+    из window соседних временных точек; µmax - наибольший наклон. Все кривые и все
+    окна решаются одним пакетным расчетом МНК над матрицей (пары × точки времени).
+    Окна с пропуском или OD <= 0 не учитываются.
+    """
+    if window < 2:
+        raise ValueError("Окно µmax должно содержать не меньше двух точек")
+    results, times, log_od = curve_matrix(data)
+    
+    if len(times) < window or results.empty:
+        return mumax_frame(results.assign(windows=0))
+    
+    # Наклон и R² каждого окна: (пары, окна, window) -> (пары, окна)
+    x = np.lib.stride_tricks.sliding_window_view(times, window)
+    y = np.lib.stride_tricks.sliding_window_view(log_od, window, axis=1)
+    x_centered = x - x.mean(axis=-1, keepdims=True)
+    y_centered = y - y.mean(axis=-1, keepdims=True)
+    sxx = (x_centered ** 2).sum(axis=-1)
+    sxy = (y_centered * x_centered).sum(axis=-1)
+    syy = (y_centered ** 2).sum(axis=-1)
+    slopes = sxy / sxx
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r_squared = np.where(syy > 0, sxy ** 2 / (sxx * syy), 1.0)
+    
+    valid = ~np.isnan(slopes)
+    best = np.where(valid, slopes, -np.inf).argmax(axis=1)
+    has_window = valid.any(axis=1)
+    picked = np.arange(len(results))
+    
+    results['mu_max'] = np.where(has_window, slopes[picked, best], np.nan)
+    results['window_start'] = np.where(has_window, x[best, 0], np.nan)
+    results['window_end'] = np.where(has_window, x[best, -1], np.nan)
+    results['r_squared'] = np.where(has_window, r_squared[picked, best], np.nan)
+    results['windows'] = valid.sum(axis=1)
+    return mumax_frame(results)
+
+STORE_COLUMNS = ['measurements_time_hours', 'od_value', 'ph_value', 'temperature_celsius', 'replicate_number']
+
+class ExperimentData:
+    """Измерения эксперимента в непрерывных столбцах NumPy с таблицами смещений (CSR).
+
+    Строки упорядочены по (соединение, реплика, время); соединения и реплики внутри
+    соединения - в порядке первого появления, как в ordered_pairs. Строки соединения i -
+    compound_offsets[i]:compound_offsets[i + 1], строки группы реплики j -
+    replicate_offsets[j]:replicate_offsets[j + 1], группы реплик соединения i -
+    compound_replicates[i]:compound_replicates[i + 1]. Срезы - представления без копирования.
+    """
+    __slots__ = ('compounds', 'columns', 'compound_offsets', 'replicate_offsets',
+                 'replicate_values', 'compound_replicates')
+    
+    def __init__(self, data):
+        compound_codes, compounds = pd.factorize(data['compound_name'])
+        rows = np.flatnonzero(compound_codes >= 0)
+        compound_codes = compound_codes[rows]
+        replicate = data['replicate_number'].to_numpy(dtype=np.float64)[rows]
+        time = data['measurements_time_hours'].to_numpy(dtype=np.float64)[rows]
+        
+        # Номер группы реплики растет с ее первым появлением, поэтому сортировка
+        # по (соединение, группа) сохраняет порядок реплик внутри соединения
+        groups = pd.DataFrame({'compound': compound_codes, 'replicate': replicate}).groupby(
+            ['compound', 'replicate'], sort=False, dropna=False).ngroup().to_numpy()
+        order = np.lexsort((time, groups, compound_codes))
+        taken = rows[order]
+        
+        self.compounds = [str(name) for name in compounds]
+        self.columns = {col: np.ascontiguousarray(data[col].to_numpy()[taken])
+                        for col in STORE_COLUMNS if col in data.columns}
+        self.compound_offsets = np.concatenate([[0], np.cumsum(np.bincount(compound_codes, minlength=len(compounds)))])
+        
+        groups = groups[order]
+        starts = np.flatnonzero(np.concatenate([[True], groups[1:] != groups[:-1]])) if len(groups) else np.array([], dtype=np.int64)
+        self.replicate_offsets = np.append(starts, len(groups))
+        self.replicate_values = self.columns['replicate_number'][starts]
+        self.compound_replicates = np.searchsorted(compound_codes[order][starts], np.arange(len(compounds) + 1))
+    
+    def __len__(self):
+        return int(self.compound_offsets[-1])
+    
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in self.columns.values()) + self.compound_offsets.nbytes \
+            + self.replicate_offsets.nbytes + self.replicate_values.nbytes + self.compound_replicates.nbytes
+    
+    def compound_view(self, i, columns=None):
+        """Столбцы соединения i: {имя: представление}"""
+        start, end = self.compound_offsets[i], self.compound_offsets[i + 1]
+        return {col: self.columns[col][start:end] for col in (columns or self.columns)}
+    
+    def compound_counts(self, mask):
+        """Число строк mask (маска по всем строкам хранилища) у каждого соединения"""
+        totals = np.concatenate([[0], np.cumsum(mask)])
+        return totals[self.compound_offsets[1:]] - totals[self.compound_offsets[:-1]]
+    
+    def replicate_view(self, j, columns=None):
+        """Столбцы группы реплики j (см. compound_replicates): {имя: представление}"""
+        start, end = self.replicate_offsets[j], self.replicate_offsets[j + 1]
+        return {col: self.columns[col][start:end] for col in (columns or self.columns)}
+
+def grouped_mean_std(keys, values):
+    """Среднее и стандартное отклонение values по значениям keys, как groupby(keys).mean() / .std().
+
+    Возвращает (упорядоченные ключи, средние, отклонения); пропуски в keys и values не учитываются.
+    """
+    valid = ~pd.isna(keys)
+    keys, values = keys[valid], values[valid].astype(np.float64)
+    unique, inverse = np.unique(keys, return_inverse=True)
+    present = ~np.isnan(values)
+    counts = np.bincount(inverse, weights=present, minlength=len(unique))
+    filled = np.where(present, values, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = np.bincount(inverse, weights=filled, minlength=len(unique)) / counts
+        deviations = np.where(present, values - means[inverse], 0.0)
+        stds = np.sqrt(np.bincount(inverse, weights=deviations ** 2, minlength=len(unique)) / (counts - 1))
+    stds[counts < 2] = np.nan
+    return unique, means, stds
+
+class TimeIndex:
+    """Отсортированный индекс времени по парам (соединение, реплика) в формате CSR.
+
+    Измерения всех пар лежат в плоских массивах times / log_od, упорядоченных по паре
+    и времени; измерения пары i - срез offsets[i]:offsets[i + 1]. Для каждой точки
+    времени пары берется первое измерение, OD <= 0 хранится как NaN.
+    """
+    
+    def __init__(self, data):
+        if isinstance(data, ExperimentData):
+            self._from_store(data)
+            return
+        keys, rows, pairs = ordered_pairs(data)
+        rows = rows[rows['measurements_time_hours'].notna()]
+        pair = rows[keys].merge(pairs.assign(_pair=np.arange(len(pairs))), on=keys, how='left')['_pair'].to_numpy()
+        times = rows['measurements_time_hours'].to_numpy(dtype=np.float64)
+        od = rows['od_value'].to_numpy(dtype=np.float64)
+        
+        # Устойчивая сортировка по (пара, время): первое измерение в точке идет первым
+        order = np.lexsort((times, pair))
+        pair, times, od = pair[order], times[order], od[order]
+        first = np.ones(len(pair), dtype=bool)
+        first[1:] = (pair[1:] != pair[:-1]) | (times[1:] != times[:-1])
+        pair, times, od = pair[first], times[first], od[first]
+        
+        self.pairs = pairs.rename(columns={'compound_name': 'compound', 'replicate_number': 'replicate'})
+        self.pairs['compound'] = self.pairs['compound'].astype(object)
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(pair, minlength=len(pairs)))])
+        self.times = np.ascontiguousarray(times)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.log_od = np.where(od > 0, np.log(od), np.nan)
+        self.grid = np.unique(times)
+        self._pair = pair
+    
+    def _from_store(self, store):
+        """Индекс по ExperimentData: строки уже упорядочены по (соединение, реплика, время)"""
+        has_replicate = ~pd.isna(store.replicate_values)
+        groups = np.flatnonzero(has_replicate)
+        compound = np.searchsorted(store.compound_replicates, groups, side='right') - 1
+        self.pairs = pd.DataFrame({'compound': pd.Series([store.compounds[i] for i in compound], dtype=object),
+                                   'replicate': store.replicate_values[groups]})
+        
+        # Группы без номера реплики пар не образуют
+        row_group = np.repeat(np.arange(len(has_replicate)), np.diff(store.replicate_offsets))
+        keep = has_replicate[row_group]
+        pair = (np.cumsum(has_replicate) - 1)[row_group[keep]]
+        times = store.columns['measurements_time_hours'][keep]
+        od = store.columns['od_value'][keep].astype(np.float64)
+        
+        # Первое измерение в каждой точке времени пары, строки без времени - в конце группы
+        first = ~np.isnan(times)
+        first[1:] &= (pair[1:] != pair[:-1]) | (times[1:] != times[:-1])
+        pair, times, od = pair[first], times[first], od[first]
+        
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(pair, minlength=len(groups)))])
+        self.times = np.ascontiguousarray(times)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.log_od = np.where(od > 0, np.log(od), np.nan)
+        self.grid = np.unique(times)
+        self._pair = pair
+    
+    def __len__(self):
+        return len(self.pairs)
+    
+    def curve(self, i):
+        """Времена и ln OD пары i (представления, без копирования)"""
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return self.times[start:end], self.log_od[start:end]
+    
+    def values_at(self, grid, interpolate=False):
+        """ln OD всех пар в точках grid: матрица (пары × точки).
+
+        Без интерполяции - только измеренные точки, иначе линейная интерполяция ln OD
+        между соседними измерениями пары с OD > 0; за пределы кривой значения не продлеваются.
+        """
+        grid = np.asarray(grid, dtype=np.float64)
+        pair, times, log_od = self._pair, self.times, self.log_od
+        if interpolate:
+            valid = ~np.isnan(log_od)
+            pair, times, log_od = pair[valid], times[valid], log_od[valid]
+        
+        # Ранги времени точны, поэтому ключ (пара, ранг) позволяет одним searchsorted
+        # найти для каждой точки grid последнее измерение пары не позже нее
+        ranks = np.unique(np.concatenate([times, grid]))
+        span = len(ranks)
+        sample_keys = pair * span + np.searchsorted(ranks, times)
+        query_pair = np.repeat(np.arange(len(self.pairs)), len(grid))
+        query_time = np.tile(grid, len(self.pairs))
+        query_keys = query_pair * span + np.searchsorted(ranks, query_time)
+        
+        left = np.searchsorted(sample_keys, query_keys, side='right') - 1
+        clipped = np.clip(left, 0, None)
+        found = (left >= 0) & (pair[clipped] == query_pair)
+        exact = found & (times[clipped] == query_time)
+        values = np.where(exact, log_od[clipped], np.nan)
+        
+        if interpolate:
+            right = np.clip(left + 1, 0, len(pair) - 1)
+            between = found & ~exact & (left + 1 < len(pair)) & (pair[right] == query_pair)
+            t0, t1 = times[clipped[between]], times[right[between]]
+            y0, y1 = log_od[clipped[between]], log_od[right[between]]
+            values[between] = y0 + (y1 - y0) * (query_time[between] - t0) / (t1 - t0)
+        return values.reshape(len(self.pairs), len(grid))
+
+def growth_rate_matrix(index, grid=None, interpolate=False):
+    """Скорости роста всех пар для всех окон (start, end) из точек grid за один проход.
+
+    Возвращает (grid, массив пары × start × end); ячейки с end <= start и окна без
+    данных - NaN. Без интерполяции ячейка совпадает с compute_growth_rates для того же окна.
+    """
+    grid = index.grid if grid is None else np.unique(np.asarray(grid, dtype=np.float64))
+    log_od = index.values_at(grid, interpolate)
+    time_diff = grid[np.newaxis, :] - grid[:, np.newaxis]
+    time_diff = np.where(time_diff > 0, time_diff, np.nan)
+    rates = (log_od[:, np.newaxis, :] - log_od[:, :, np.newaxis]) / time_diff
+    return grid, rates
+
+def compound_window_means(pairs, rates):
+    """Средняя по репликам матрица окон (start × end) для каждого соединения из pairs"""
+    codes, compounds = pd.factorize(pairs['compound'])
+    valid = ~np.isnan(rates)
+    sums = np.zeros((len(compounds),) + rates.shape[1:])
+    counts = np.zeros_like(sums)
+    np.add.at(sums, codes, np.where(valid, rates, 0.0))
+    np.add.at(counts, codes, valid)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return list(compounds), sums / counts
+
+def growth_frame(results):
+    """Таблица результатов роста с единым набором столбцов и типов для всех способов расчета"""
+    columns = GROWTH_COLUMNS
+    if isinstance(results, pd.DataFrame) and 'id_expirement' in results.columns:
+        columns = ['id_expirement'] + GROWTH_COLUMNS
+    frame = pd.DataFrame(results, columns=columns).reset_index(drop=True)
+    return frame.astype({col: GROWTH_DTYPES[col] for col in columns})
+
+def mumax_frame(results):
+    """Таблица µmax с единым набором столбцов и типов"""
+    columns = MUMAX_COLUMNS
+    if 'id_expirement' in results.columns:
+        columns = ['id_expirement'] + MUMAX_COLUMNS
+    frame = pd.DataFrame(results, columns=columns).reset_index(drop=True)
+    return frame.astype({col: MUMAX_DTYPES[col] for col in columns})
+
+def growth_model(model, times, params):
+    """Значения модели роста y = ln(OD/OD0) и якобиан по параметрам (A, µmax, λ).
+
+    Параметризация Цвитеринга: 'gompertz' - модифицированная модель Гомпертца,
+    'logistic' - логистическая. params - (кривые × 3); возвращает (кривые × точки)
+    и (кривые × точки × 3).
+    """
+    a, mu, lag = (params[:, i, None] for i in range(3))
+    shift = lag - times
+    if model == 'gompertz':
+        u = np.minimum(mu * np.e / a * shift + 1, 50.0)
+        g = np.exp(-np.exp(u))
+        ge = np.exp(u - np.exp(u))
+        values = a * g
+        jacobian = np.stack([g + ge * mu * np.e * shift / a, -ge * np.e * shift, -ge * mu * np.e], axis=-1)
+    elif model == 'logistic':
+        v = 4 * mu / a * shift + 2
+        s = 0.5 * (1 - np.tanh(v / 2))
+        ds = s * (1 - s)
+        values = a * s
+        jacobian = np.stack([s + ds * 4 * mu * shift / a, -ds * 4 * shift, -ds * 4 * mu], axis=-1)
+    else:
+        raise ValueError(f"Неизвестная модель роста: {model}")
+    return values, jacobian
+
+def fit_growth_curves(times, y, initial, model, max_iter=FIT_MAX_ITER, tol=1e-10):
+    """Пакетный метод Левенберга - Марквардта для всех кривых сразу.
+
+    y - (кривые × точки), NaN - пропуск; initial - начальные (A, µmax, λ).
+    Каждая кривая имеет свой коэффициент затухания и останавливается независимо.
+    Возвращает (параметры, остаточная сумма квадратов, сошлась ли, число итераций).
+    """
+    mask = ~np.isnan(y)
+    y = np.where(mask, y, 0.0)
+    params = initial.astype(np.float64, copy=True)
+    damping = np.full(len(params), 1e-3)
+    iterations = np.zeros(len(params), dtype=np.int64)
+    converged = np.zeros(len(params), dtype=bool)
+    
+    with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+        values, jacobian = growth_model(model, times, params)
+        residuals = np.where(mask, y - values, 0.0)
+        cost = (residuals ** 2).sum(axis=1)
+        active = np.isfinite(cost)
+        
+        for _ in range(max_iter):
+            idx = np.flatnonzero(active)
+            if not idx.size:
+                break
+            jac = jacobian[idx] * mask[idx, :, None]
+            jtj = np.einsum('ntp,ntq->npq', jac, jac)
+            gradient = np.einsum('ntp,nt->np', jac, residuals[idx])
+            diagonal = np.einsum('npp->np', jtj)
+            system = jtj + (damping[idx, None] * diagonal + 1e-12)[:, :, None] * np.eye(3)
+            step = np.linalg.solve(system, gradient[:, :, None])[:, :, 0]
+            
+            trial = params[idx] + step
+            trial[:, :2] = np.maximum(trial[:, :2], 1e-9)
+            trial_values, trial_jacobian = growth_model(model, times, trial)
+            trial_residuals = np.where(mask[idx], y[idx] - trial_values, 0.0)
+            trial_cost = (trial_residuals ** 2).sum(axis=1)
+            
+            better = trial_cost < cost[idx]
+            accepted = idx[better]
+            improvement = cost[accepted] - trial_cost[better]
+            params[accepted] = trial[better]
+            values[accepted] = trial_values[better]
+            jacobian[accepted] = trial_jacobian[better]
+            residuals[accepted] = trial_residuals[better]
+            cost[accepted] = trial_cost[better]
+            damping[accepted] /= 10
+            damping[idx[~better]] *= 10
+            iterations[idx] += 1
+            
+            done = improvement <= tol * (cost[accepted] + tol)
+            converged[accepted[done]] = True
+            active[accepted[done]] = False
+            # Шаг не уменьшает ошибку даже при сильном затухании - минимум найден
+            stalled = idx[~better][damping[idx[~better]] > 1e10]
+            converged[stalled] = True
+            active[stalled] = False
+    
+    return params, cost, converged, iterations
+
+def _fit_shard(shm_name, shape, times, start, end, initial, model, max_iter):
+    """Подгонка строк [start, end) матрицы кривых из общей памяти (для пула процессов)"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        y = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)[start:end].copy()
+    finally:
+        shm.close()
+    return fit_growth_curves(times, y, initial, model, max_iter)
+
+def initial_fit_params(times, y, growth_rate):
+    """Стартовые (A, µmax, λ): A - наибольший прирост ln OD, µmax - двухточечная оценка,
+    λ - время, когда касательная с наклоном µmax из точки наибольшего роста пересекает 0"""
+    a = np.nanmax(y, axis=1)
+    mu = np.where(growth_rate > 0, growth_rate, a / (times[-1] - times[0]))
+    half = np.nanargmin(np.abs(np.where(np.isnan(y), np.inf, y) - a[:, None] / 2), axis=1)
+    lag = times[half] - a / 2 / mu
+    return np.column_stack([np.maximum(a, 1e-3), np.maximum(mu, 1e-3), np.clip(lag, times[0], times[-1])])
+
+def fit_growth_models(data, model='gompertz', growth=None, executor=None,
+                      shard_size=DEFAULT_FIT_SHARD, max_iter=FIT_MAX_ITER):
+    """Подгонка модели роста к кривой каждой пары (соединение, реплика).
+
+    Кривая - ln(OD/OD0) от первой измеренной точки; нужны хотя бы 4 точки.
+    Старт - двухточечная скорость роста из growth (таблица calculate_growth_rate).
+    С executor кривые делятся на части по shard_size и считаются в пуле процессов:
+    матрица кривых передается через общую память, каждой задаче - только границы строк.
+    """
+    if model not in FIT_MODELS:
+        raise ValueError(f"Неизвестная модель роста: {model}")
+    results, times, log_od = curve_matrix(data)
+    
+    first = np.argmax(~np.isnan(log_od), axis=1)
+    log_od0 = log_od[np.arange(len(log_od)), first]
+    y = log_od - log_od0[:, None]
+    points = (~np.isnan(y)).sum(axis=1)
+    fitted = np.flatnonzero(points >= 4)
+    
+    key_cols = [col for col in ('id_expirement', 'compound', 'replicate') if col in results.columns]
+    growth_rate = np.full(len(results), np.nan)
+    if growth is not None and not growth.empty:
+        warm = results[key_cols].merge(growth[key_cols + ['growth_rate']].drop_duplicates(key_cols),
+                                       on=key_cols, how='left')
+        growth_rate = warm['growth_rate'].to_numpy(dtype=np.float64)
+    
+    y_fit = np.ascontiguousarray(y[fitted])
+    initial = initial_fit_params(times, y_fit, growth_rate[fitted]) if fitted.size else np.empty((0, 3))
+    
+    if executor is None or len(fitted) <= shard_size:
+        params, rss, converged, iterations = fit_growth_curves(times, y_fit, initial, model, max_iter)
+    else:
+        shm = shared_memory.SharedMemory(create=True, size=y_fit.nbytes)
+        try:
+            np.ndarray(y_fit.shape, dtype=np.float64, buffer=shm.buf)[:] = y_fit
+            futures = [executor.submit(_fit_shard, shm.name, y_fit.shape, times, start,
+                                       min(start + shard_size, len(fitted)),
+                                       initial[start:start + shard_size], model, max_iter)
+                       for start in range(0, len(fitted), shard_size)]
+            parts = [future.result() for future in futures]
+        finally:
+            shm.close()
+            shm.unlink()
+        params, rss, converged, iterations = (np.concatenate(part) for part in zip(*parts))
+    
+    def column(values, fill):
+        full = np.full(len(results), fill, dtype=np.asarray(values).dtype if fitted.size else None)
+        full[fitted] = values
+        return full
+    
+    centered = y_fit - np.nanmean(y_fit, axis=1, keepdims=True) if fitted.size else y_fit
+    total = np.nansum(centered ** 2, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r_squared = np.where(total > 0, 1 - rss / total, np.nan)
+    
+    results['model'] = model
+    results['amplitude'] = column(params[:, 0], np.nan)
+    results['mu_max'] = column(params[:, 1], np.nan)
+    results['lag_time'] = column(params[:, 2], np.nan)
+    results['carrying_capacity'] = np.exp(log_od0 + results['amplitude'].to_numpy())
+    results['rss'] = column(rss, np.nan)
+    results['r_squared'] = column(r_squared, np.nan)
+    results['points'] = points
+    results['iterations'] = column(iterations, 0)
+    results['converged'] = column(converged, False)
+    return fit_frame(results)
+
+def fit_frame(results):
+    """Таблица параметров моделей роста с единым набором столбцов и типов"""
+    columns = FIT_COLUMNS
+    if 'id_expirement' in results.columns:
+        columns = ['id_expirement'] + FIT_COLUMNS
+    frame = pd.DataFrame(results, columns=columns).reset_index(drop=True)
+    return frame.astype({col: FIT_DTYPES[col] for col in columns})
+
+def query_growth(conn, experiment_id, max_id, start_time, end_time):
+    """Скорость роста по начальной и конечной OD, свернутым в PostgreSQL.
+
+    Из базы приходит по строке на пару (соединение, реплика); логарифмы
+    считаются здесь же, как и в pandas-расчете, поэтому результаты совпадают побитно.
+    """
+    params = {
+        'experiment_id': experiment_id,
+        'max_id': max_id,
+        'start_time': start_time,
+        'end_time': end_time
+    }
+    results = pd.read_sql_query(GROWTH_PUSHDOWN_QUERY, conn, params=params)
+    results['growth_rate'] = (np.log(results['final_od']) - np.log(results['initial_od'])) / (end_time - start_time)
+    return growth_frame(results)
+
+def read_growth_summary(conn, experiment_id, version, start_time, end_time):
+    """Сводка роста окна, если она построена по версии version; иначе None"""
+    with conn.cursor() as cursor:
+        cursor.execute(GROWTH_SUMMARY_QUERY, (experiment_id, start_time, end_time) + tuple(version))
+        rows = cursor.fetchall()
+    if not rows:
+        return None
+    summary = pd.DataFrame(rows, columns=['compound', 'replicate', 'initial_od', 'final_od', 'growth_rate'])
+    return growth_frame(summary.dropna(subset=['compound']))
+
+def store_growth_summary(conn, experiment_id, version, windows, force=False):
+    """Пересчитывает устаревшие окна сводки эксперимента; возвращает число обновленных окон"""
+    with conn.cursor() as cursor:
+        cursor.execute(GROWTH_SUMMARY_STATE_QUERY, (experiment_id,))
+        stored = {(start, end): (count, max_id) for start, end, count, max_id in cursor.fetchall()}
+    
+    refreshed = 0
+    try:
+        for start_time, end_time in windows:
+            if not force and stored.get((float(start_time), float(end_time))) == tuple(version):
+                continue
+            results = query_growth(conn, experiment_id, version[1], start_time, end_time)
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    DELETE FROM growth_summary
+                    WHERE id_expirement = %s AND start_time = %s AND end_time = %s
+                """, (experiment_id, start_time, end_time))
+                cursor.executemany("""
+                    INSERT INTO growth_summary (id_expirement, start_time, end_time, position, compound_name,
+                                                replicate_number, initial_od, final_od, growth_rate)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """, [(experiment_id, start_time, end_time, position, row.compound, int(row.replicate),
+                       float(row.initial_od), float(row.final_od), float(row.growth_rate))
+                      for position, row in enumerate(results.itertuples(index=False))])
+                cursor.execute("""
+                    INSERT INTO growth_summary_state (id_expirement, start_time, end_time,
+                                                      measurement_count, max_measurement_id)
+                    VALUES (%s, %s, %s, %s, %s)
+                    ON CONFLICT (id_expirement, start_time, end_time) DO UPDATE
+                    SET measurement_count = EXCLUDED.measurement_count,
+                        max_measurement_id = EXCLUDED.max_measurement_id,
+                        refreshed_at = now()
+                """, (experiment_id, start_time, end_time) + tuple(version))
+            refreshed += 1
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return refreshed
+
+def apply_inhibition(results, control_data, control_mean, index=None):
+    """Заполняет inhibition_percent для строк index (по умолчанию - для всех)"""
+    rows = results.index if index is None else index
+    growth = results.loc[rows, 'growth_rate'].astype(np.float64)
+    is_control = results.loc[rows, 'compound'].isin(control_data['compound'])
+    
+    # Контроль - 0%, образцы без скорости роста - NaN
+    results.loc[rows, 'inhibition_percent'] = np.where(
+        is_control, 0.0, ((control_mean - growth) / control_mean) * 100)
+
+def compute_inhibition(results, group_by=None):
+    """Ингибирование относительно средней скорости роста контроля своей группы.
+
+    group_by - столбцы группы с собственным контролем (планшет, эксперимент);
+    по умолчанию id_expirement, если он есть, иначе вся таблица - одна группа.
+    Возвращает копию results и список групп без пригодного контроля
+    (нет контроля или его средняя скорость неположительна) - у них inhibition_percent = NaN.
+    """
+    if group_by is None:
+        group_by = ['id_expirement'] if 'id_expirement' in results.columns else []
+    results = results.copy()
+    
+    if group_by:
+        groups = results.groupby(group_by, sort=False, dropna=False).ngroup().to_numpy()
+        keys = results[group_by].drop_duplicates().apply(tuple, axis=1).tolist()
+    else:
+        groups = np.zeros(len(results), dtype=np.int64)
+        keys = [()]
+    
+    growth = results['growth_rate'].astype(np.float64)
+    control_mask = results['compound'].str.contains(CONTROL_MARKER, case=False, na=False).to_numpy()
+    
+    # Групп немного - среднее контроля считаем так же, как для одной группы
+    control_means = np.full(len(keys), np.nan)
+    for group, control_growth in growth[control_mask].groupby(groups[control_mask]):
+        control_means[group] = control_growth.mean()
+    valid = control_means > 0
+    
+    control_mean = control_means[groups]
+    inhibition = np.where(control_mask, 0.0, ((control_mean - growth.to_numpy()) / control_mean) * 100)
+    results['inhibition_percent'] = np.where(valid[groups], inhibition, np.nan)
+    
+    missing = [key for key, ok in zip(keys, valid) if not ok]
+    return results, missing
+
+def _bootstrap_chunk(values, counts, control_means, seed, confidence):
+    """Доверительные интервалы ингибирования для части соединений одной группы.
+
+    values - (соединения × max реплик), дополненные нулями до общей ширины; counts - число
+    реплик соединения; control_means - средние контроля по всем повторным выборкам.
+    Выборки реплик с возвращением строятся одним массивом индексов (соединения × выборки × реплики).
+    """
+    rng = np.random.default_rng(seed)
+    resamples = len(control_means)
+    width = values.shape[1]
+    draws = (rng.random((len(values), resamples, width)) * counts[:, None, None]).astype(np.intp)
+    picked = np.take_along_axis(values[:, None, :], draws, axis=2)
+    used = np.arange(width) < counts[:, None, None]
+    means = np.where(used, picked, 0.0).sum(axis=2) / counts[:, None]
+    
+    # Выборки с неположительным средним контроля не дают процента ингибирования
+    valid = control_means > 0
+    if not valid.any():
+        return np.full((2, len(values)), np.nan)
+    inhibition = (control_means[valid] - means[:, valid]) / control_means[valid] * 100
+    tail = (1 - confidence) / 2 * 100
+    return np.percentile(inhibition, [tail, 100 - tail], axis=1)
+
+def bootstrap_inhibition(results, resamples=DEFAULT_BOOTSTRAP_RESAMPLES, confidence=0.95, seed=0,
+                         group_by=None, executor=None, chunk_size=DEFAULT_BOOTSTRAP_CHUNK):
+    """Бутстреп-интервалы процента ингибирования каждого соединения.
+
+    В каждой повторной выборке реплики контроля и соединения выбираются с возвращением,
+    ингибирование считается по их средним. Группы с собственным контролем - как в
+    compute_inhibition. Соединения обрабатываются частями по chunk_size, у каждой части
+    свой поток случайных чисел из seed, поэтому результат не зависит от executor.
+    Возвращает по строке на соединение: число реплик, ингибирование по средним, границы интервала.
+    """
+    if group_by is None:
+        group_by = ['id_expirement'] if 'id_expirement' in results.columns else []
+    growth = results.dropna(subset=['growth_rate'])
+    control_mask = growth['compound'].str.contains(CONTROL_MARKER, case=False, na=False)
+    groups = [((), growth)] if not group_by else growth.groupby(group_by, sort=False)
+    group_seeds = np.random.SeedSequence(seed).spawn(len(groups) if group_by else 1)
+    
+    tasks = []
+    rows = []
+    for (key, group), group_seed in zip(groups, group_seeds):
+        key = key if isinstance(key, tuple) else (key,)
+        control = group.loc[control_mask[group.index], 'growth_rate'].to_numpy()
+        samples = group[~control_mask[group.index]].groupby('compound', sort=False)['growth_rate']
+        compounds = list(samples.groups.keys())
+        if control.size == 0 or not compounds:
+            continue
+        
+        control_seed, *chunk_seeds = group_seed.spawn(1 + -(-len(compounds) // chunk_size))
+        control_draws = np.random.default_rng(control_seed).integers(0, control.size, (resamples, control.size))
+        control_means = control[control_draws].mean(axis=1)
+        control_mean = control.mean()
+        
+        series = [samples.get_group(compound).to_numpy() for compound in compounds]
+        for start, chunk_seed in zip(range(0, len(compounds), chunk_size), chunk_seeds):
+            chunk = series[start:start + chunk_size]
+            counts = np.array([len(values) for values in chunk])
+            values = np.zeros((len(chunk), counts.max()))
+            for i, compound_values in enumerate(chunk):
+                values[i, :len(compound_values)] = compound_values
+            tasks.append((values, counts, control_means, chunk_seed, confidence))
+            for compound, compound_values in zip(compounds[start:start + chunk_size], chunk):
+                point = (control_mean - compound_values.mean()) / control_mean * 100 if control_mean > 0 else np.nan
+                rows.append(key + (compound, len(compound_values), point))
+    
+    if executor is not None and len(tasks) > 1:
+        intervals = list(executor.map(_bootstrap_chunk, *zip(*tasks)))
+    else:
+        intervals = [_bootstrap_chunk(*task) for task in tasks]
+    
+    summary = pd.DataFrame(rows, columns=group_by + ['compound', 'replicates', 'inhibition_percent'])
+    bounds = np.concatenate(intervals, axis=1) if intervals else np.empty((2, 0))
+    summary['ci_low'] = bounds[0]
+    summary['ci_high'] = bounds[1]
+    return summary
+
+def split_experiments(combined):
+    """Разбиение результата пакетного запроса на отдельные эксперименты по id_expirement"""
+    if combined.empty:
+        return {}
+    
+    ids = combined['id_expirement'].to_numpy()
+    bounds = np.flatnonzero(ids[1:] != ids[:-1]) + 1
+    starts = np.concatenate([[0], bounds])
+    ends = np.concatenate([bounds, [len(ids)]])
+    data = combined.drop(columns='id_expirement')
+    
+    parts = {}
+    for start, end in zip(starts, ends):
+        part = data.iloc[start:end].reset_index(drop=True)
+        for col in part.columns:
+            if isinstance(part[col].dtype, pd.CategoricalDtype):
+                part[col] = part[col].cat.remove_unused_categories()
+        parts[int(ids[start])] = part
+    return parts
+
+def parse_experiment_ids(spec):
+    """Разбор списка ID вида "1-50, 60, 75-80" """
+    experiment_ids = []
+    for part in spec.replace(';', ',').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            first, last = (int(value) for value in part.split('-', 1))
+            experiment_ids.extend(range(first, last + 1))
+        else:
+            experiment_ids.append(int(part))
+    return experiment_ids
+
+def memory_report(data):
+    """Сравнение памяти по столбцам: исходные типы против компактных"""
+    legacy = data.astype({col: dtype for col, dtype in LEGACY_DTYPES.items()
+                          if col in data.columns and not (dtype == np.int64 and data[col].isna().any())})
+    report = pd.DataFrame({
+        'before_bytes': legacy.memory_usage(index=False, deep=True),
+        'after_bytes': data.memory_usage(index=False, deep=True)
+    })
+    report.loc['Итого'] = report.sum()
+    report['ratio'] = report['before_bytes'] / report['after_bytes']
+    return report
+
+def list_migrations(directory=MIGRATIONS_DIR):
+    """Файлы миграций в порядке версий: [(версия, путь)]"""
+    migrations = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".sql") and not name.endswith(".down.sql"):
+            migrations.append((name[:-len(".sql")], os.path.join(directory, name)))
+    return migrations
+
+def apply_migrations(conn, directory=MIGRATIONS_DIR):
+    """Применяет еще не примененные миграции, каждую в своей транзакции.
+
+    Примененные версии хранятся в таблице schema_migrations; возвращает список новых версий.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version VARCHAR(200) PRIMARY KEY,
+                applied_at TIMESTAMP NOT NULL DEFAULT now()
+            )
+        """)
+        cursor.execute("SELECT version FROM schema_migrations")
+        applied = {row[0] for row in cursor.fetchall()}
+    conn.commit()
+    
+    new_versions = []
+    for version, path in list_migrations(directory):
+        if version in applied:
+            continue
+        with open(path, encoding="utf-8") as f:
+            sql = f.read()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(sql)
+                cursor.execute("INSERT INTO schema_migrations (version) VALUES (%s)", (version,))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        new_versions.append(version)
+    return new_versions
+
+class ConnectionPool:
+    """Потокобезопасный пул соединений с PostgreSQL.
+
+    Поверх ThreadedConnectionPool: ожидание свободного соединения вместо PoolError,
+    проверка простаивавших соединений и замена сломанных новыми.
+    """
+    
+    def __init__(self, minconn=1, maxconn=DEFAULT_POOL_SIZE, **connect_params):
+        self._pool = psycopg2.pool.ThreadedConnectionPool(minconn, maxconn, **connect_params)
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._last_used = {}
+        self.maxconn = maxconn
+    
+    @contextmanager
+    def connection(self):
+        self._slots.acquire()
+        try:
+            conn = self._checkout()
+            broken = False
+            try:
+                yield conn
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                broken = True
+                raise
+            finally:
+                self._return(conn, broken)
+        finally:
+            self._slots.release()
+    
+    def _checkout(self):
+        # Одна повторная попытка: сломанное соединение закрывается, пул открывает новое
+        for _ in range(2):
+            conn = self._pool.getconn()
+            if self._is_healthy(conn):
+                psycopg2.extensions.register_type(DECIMAL_TO_FLOAT, conn)
+                return conn
+            self._last_used.pop(id(conn), None)
+            self._pool.putconn(conn, close=True)
+        raise psycopg2.OperationalError("Не удалось получить рабочее соединение из пула")
+    
+    def _is_healthy(self, conn):
+        if conn.closed:
+            return False
+        if time.monotonic() - self._last_used.get(id(conn), 0.0) < HEALTH_CHECK_INTERVAL:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+    
+    def _return(self, conn, broken):
+        if not broken and not conn.closed:
+            try:
+                # Не оставляем открытых транзакций у свободных соединений
+                conn.rollback()
+            except psycopg2.Error:
+                broken = True
+        
+        if broken or conn.closed:
+            self._last_used.pop(id(conn), None)
+            self._pool.putconn(conn, close=True)
+        else:
+            self._last_used[id(conn)] = time.monotonic()
+            self._pool.putconn(conn)
+    
+    def closeall(self):
+        self._pool.closeall()
+
+class AnalysisCache:
+    """Кэш результатов анализа в памяти с вытеснением давно не использованных (LRU).
+
+    Ключ - (эксперимент, версия данных, окно, вид результата, движок), поэтому после
+    перезагрузки или дозагрузки данных старые записи не находятся; invalidate
+    дополнительно освобождает их память. Наружу отдаются копии таблиц.
+    """
+    
+    def __init__(self, max_entries=DEFAULT_ANALYSIS_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            frame = self._entries.get(key)
+            if frame is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return frame.copy()
+    
+    def put(self, key, frame):
+        with self._lock:
+            self._entries[key] = frame.copy()
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, experiment_id, keep_version=None):
+        """Удаляет записи эксперимента, кроме построенных по версии keep_version"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == experiment_id and key[1] != keep_version]:
+                del self._entries[key]
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class FigureCache:
+    """Кэш отрисованных графиков: в памяти и, если задан cache_dir, на диске (оба - LRU по объему).
+
+    Ключ - (эксперимент, версия данных, вид графика, размер, параметры, формат), значение -
+    байты: PNG для окна, фигура в pickle или файл экспорта. Запись, вытесненная из памяти,
+    остается на диске и при обращении возвращается в память. invalidate удаляет записи
+    эксперимента прежних версий из обоих уровней.
+    
+    Фигуры в pickle (формат MEMORY_ONLY) на диск не пишутся и с диска не читаются:
+    распаковка pickle выполнила бы код любого файла, подложенного в каталог кэша.
+    На диске - только готовые изображения и файлы экспорта.
+    """
+    
+    MEMORY_ONLY = ('figure',)
+    
+    def __init__(self, max_bytes=DEFAULT_FIGURE_CACHE_BYTES, cache_dir=None, max_disk_bytes=DEFAULT_FIGURE_DISK_BYTES):
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.cache_dir = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        self.set_cache_dir(cache_dir)
+    
+    def set_cache_dir(self, cache_dir):
+        """Включает дисковый уровень в cache_dir или выключает его (None)"""
+        with self._lock:
+            if cache_dir is not None:
+                os.makedirs(cache_dir, exist_ok=True)
+            self.cache_dir = cache_dir
+    
+    def _version_prefix(self, experiment_id, version):
+        return f"fig_{experiment_id}_{'_'.join(map(str, version))}_"
+    
+    def _path(self, key):
+        # Имя файла: эксперимент и версия (для invalidate без чтения файлов) и хэш всего ключа
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{self._version_prefix(key[0], key[1])}{digest}")
+    
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+            if self.cache_dir is not None and key[-1] not in self.MEMORY_ONLY:
+                path = self._path(key)
+                try:
+                    with open(path, 'rb') as f:
+                        data = f.read()
+                    os.utime(path)
+                except OSError:
+                    data = None
+            if data is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, data)
+            return data
+    
+    def put(self, key, data):
+        with self._lock:
+            self._remember(key, data)
+            if self.cache_dir is None or key[-1] in self.MEMORY_ONLY:
+                return
+            path = self._path(key)
+            tmp_path = f"{path}.tmp{threading.get_ident()}"
+            try:
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+                self._evict()
+            except OSError:
+                # Без дискового уровня кэш продолжает работать в памяти
+                with suppress(OSError):
+                    os.remove(tmp_path)
+    
+    def _remember(self, key, data):
+        if key in self._entries:
+            self._nbytes -= len(self._entries.pop(key))
+        self._entries[key] = data
+        self._nbytes += len(data)
+        while self._nbytes > self.max_bytes and self._entries:
+            self._nbytes -= len(self._entries.popitem(last=False)[1])
+    
+    def invalidate(self, experiment_id, keep_version=None):
+        """Удаляет записи эксперимента, кроме построенных по версии keep_version"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == experiment_id and key[1] != keep_version]:
+                self._nbytes -= len(self._entries.pop(key))
+            if self.cache_dir is None:
+                return
+            prefix = f"fig_{experiment_id}_"
+            keep = self._version_prefix(experiment_id, keep_version) if keep_version is not None else None
+            for name in os.listdir(self.cache_dir):
+                if name.startswith(prefix) and (keep is None or not name.startswith(keep)):
+                    with suppress(OSError):
+                        os.remove(os.path.join(self.cache_dir, name))
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+    
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            with suppress(OSError):
+                info = os.stat(path)
+                entries.append((info.st_mtime, info.st_size, path))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            with suppress(OSError):
+                os.remove(path)
+            total -= size
+
+class ExperimentCache:
+    """Локальный столбцовый кэш экспериментов: по файлу .npy на столбец.
+
+    Запись действительна, пока совпадает версия данных (count, max(id_measurement)).
+    При превышении max_bytes вытесняются давно не открывавшиеся эксперименты (LRU).
+    """
+    
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    def _entry_dir(self, experiment_id):
+        return os.path.join(self.cache_dir, f"exp_{experiment_id}")
+    
+    def _read_meta(self, entry_dir):
+        try:
+            with open(os.path.join(entry_dir, "meta.json"), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def _write_meta(self, entry_dir, meta):
+        with open(os.path.join(entry_dir, "meta.json"), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+    
+    def get(self, experiment_id, version):
+        """Данные эксперимента из кэша или None, если записи нет или версия устарела"""
+        with self._lock:
+            entry_dir = self._entry_dir(experiment_id)
+            meta = self._read_meta(entry_dir)
+            if meta is None or tuple(meta['version']) != tuple(version):
+                return None
+            
+            columns = {}
+            for col in meta['columns']:
+                # Столбцы отображаются в память и читаются с диска по мере обращения
+                values = np.load(os.path.join(entry_dir, f"{col}.npy"), mmap_mode='r')
+                if col in meta['categories']:
+                    values = pd.Categorical.from_codes(np.array(values), categories=meta['categories'][col])
+                columns[col] = values
+            
+            meta['last_access'] = time.time()
+            self._write_meta(entry_dir, meta)
+        
+        # Без copy=False pandas сводит столбцы в общие блоки и читает их с диска целиком
+        return pd.DataFrame(columns, columns=meta['columns'], copy=False)
+    
+    def iter_chunks(self, experiment_id, version, chunk_size):
+        """Порции кэшированного эксперимента в формате MeasurementStats.update или None без записи.
+
+        Столбцы отображаются в память, поэтому в памяти одновременно только одна порция.
+        """
+        with self._lock:
+            entry_dir = self._entry_dir(experiment_id)
+            meta = self._read_meta(entry_dir)
+            if meta is None or tuple(meta['version']) != tuple(version) or 'compound_name' not in meta['categories']:
+                return None
+            arrays = {col: np.load(os.path.join(entry_dir, f"{col}.npy"), mmap_mode='r') for col in meta['columns']}
+            meta['last_access'] = time.time()
+            self._write_meta(entry_dir, meta)
+        
+        def chunks():
+            codes = arrays.pop('compound_name')
+            names = meta['categories']['compound_name']
+            labels = {col: meta['categories'][col] for col in arrays if col in meta['categories']}
+            for start in range(0, len(codes), chunk_size):
+                columns = {col: np.array(values[start:start + chunk_size]) for col, values in arrays.items()}
+                for col, categories in labels.items():
+                    columns[col] = pd.Categorical.from_codes(columns[col], categories=categories)
+                yield columns, np.array(codes[start:start + chunk_size]), names
+        return chunks()
+    
+    def put(self, experiment_id, version, data):
+        with self._lock:
+            entry_dir = self._entry_dir(experiment_id)
+            tmp_dir = f"{entry_dir}.tmp{threading.get_ident()}"
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            os.makedirs(tmp_dir)
+            
+            meta = {'version': list(version), 'columns': list(data.columns), 'categories': {},
+                    'last_access': time.time(), 'nbytes': 0}
+            for col in data.columns:
+                values = data[col]
+                if isinstance(values.dtype, pd.CategoricalDtype):
+                    meta['categories'][col] = values.cat.categories.tolist()
+                    values = values.cat.codes
+                path = os.path.join(tmp_dir, f"{col}.npy")
+                np.save(path, values.to_numpy())
+                meta['nbytes'] += os.path.getsize(path)
+            self._write_meta(tmp_dir, meta)
+            
+            # Подменяем запись целиком, чтобы не оставить наполовину записанный эксперимент
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(tmp_dir, entry_dir)
+            self._evict()
+    
+    def invalidate(self, experiment_id):
+        with self._lock:
+            shutil.rmtree(self._entry_dir(experiment_id), ignore_errors=True)
+    
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            entry_dir = os.path.join(self.cache_dir, name)
+            meta = self._read_meta(entry_dir)
+            if name.startswith("exp_") and meta is not None:
+                entries.append((meta['last_access'], meta['nbytes'], entry_dir))
+        
+        total = sum(nbytes for _, nbytes, _ in entries)
+        for _, nbytes, entry_dir in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= nbytes
+
 class LabExperimentAnalyzer:
     def __init__(self):
-        self.conn = None
+        self.pool = None
         self.data = None
         self.growth_results = None
+        self.max_growth_results = None
+        self.fit_results = None
+        self.inhibition_ci = None
+        self.store = None
+        self.statistics = None
+        self.reduction = None
+        self.out_of_core_bytes = DEFAULT_OUT_OF_CORE_BYTES
+        self.time_index = None
+        self.growth_matrix = None
+        self.analysis_cache = AnalysisCache()
+        self.figure_cache = FigureCache()
+        self.fit_workers = None
+        self._process_pool = None
         self.current_experiment_id = None
+        self.load_mode = 'pandas'
+        self.chunk_size = DEFAULT_CHUNK_SIZE
+        self.memory_reports = {}
+        self.data_version = None
+        self.growth_window = None
+        self.growth_engine = 'pandas'
+        self.use_growth_summary = True
+        self.cache = None
+        self._state_lock = threading.RLock()
     
-    def connect(self, dbname, user, password, host='localhost', port='5432'):
+    def connect(self, dbname, user, password, host='localhost', port='5432', pool_size=DEFAULT_POOL_SIZE):
         try:
-            self.conn = psycopg2.connect(
+            self.pool = ConnectionPool(
+                minconn=1,
+                maxconn=pool_size,
                 dbname=dbname,
                 user=user,
                 password=password,
@@ -35,6 +2049,20 @@ class LabExperimentAnalyzer:
             self.log(f"❌ Ошибка подключения: {e}", "error")
             return False
     
+    def run_query(self, func):
+        """Выполняет func(conn) на соединении из пула; при обрыве связи повторяет один раз"""
+        for attempt in range(2):
+            used = []
+            try:
+                with self.pool.connection() as conn:
+                    used.append(conn)
+                    return func(conn)
+            except Exception as e:
+                # Повторяем только если соединение оборвалось (pandas оборачивает ошибки psycopg2)
+                if attempt or not used or not used[0].closed:
+                    raise
+                self.log(f"Соединение потеряно ({e}), переподключение", "warning")
+    
     def log(self, message, level="info"):
         timestamp = datetime.now().strftime("%H:%M:%S")
         if level == "error":
@@ -44,82 +2072,661 @@ class LabExperimentAnalyzer:
         else:
             print(f"[{timestamp}] ℹ️ {message}")
     
-    def load_experiment_data(self, experiment_id):
+    def load_experiment_data(self, experiment_id, mode=None, chunk_size=None, progress_callback=None):
+        """Загрузка измерений эксперимента.
+
+        mode: 'pandas' - pd.read_sql_query, 'stream' - серверный курсор с чтением порциями,
+        'copy' - COPY (...) TO STDOUT в CSV с разбором сразу в массивы NumPy
+        (при ошибке COPY используется pd.read_sql_query), 'reduce' - свертка без загрузки
+        всех строк (см. load_experiment_reduced).
+        progress_callback(rows, rows_per_sec) вызывается после каждой порции в режиме 'stream'.
+        """
+        if (mode or self.load_mode) == 'reduce':
+            return self.load_experiment_reduced(experiment_id, progress_callback=progress_callback)
+        try:
+            stats = MeasurementStats()
+            data, version = self._fetch(experiment_id, mode, chunk_size, progress_callback, stats)
+            
+            with self._state_lock:
+                if (experiment_id, version) != (self.current_experiment_id, self.data_version):
+                    # Результаты анализа прежних данных больше не относятся к загруженным
+                    self._reset_results()
+                    self.analysis_cache.invalidate(experiment_id, keep_version=version)
+                    self.figure_cache.invalidate(experiment_id, keep_version=version)
+                self.data = data
+                self.store = None
+                self.statistics = stats
+                self.reduction = None
+                self.data_version = version
+                self.current_experiment_id = experiment_id
+            
+            if data.empty:
+                self.log(f"⚠️ Нет данных для эксперимента ID={experiment_id}", "warning")
+                return data
+            
+            self.log(f"📥 Загружено {len(data)} строк из БД "
+                     f"({data.memory_usage(deep=True).sum() / 2**20:.1f} МБ в памяти)")
+            self.log(f"🧪 Соединения: {', '.join(data['compound_name'].unique())}")
+            self.log(f"⏰ Временные точки: {sorted(data['measurements_time_hours'].unique())}")
+            
+            return data
+            
+        except Exception as e:
+            self.log(f"❌ Ошибка загрузки данных: {e}", "error")
+            return None
+    
+    def load_experiment_reduced(self, experiment_id, max_bytes=None, progress_callback=None):
+        """Загрузка эксперимента больше памяти: в памяти остается только свертка по точкам.
+
+        Строки читаются порциями из локального кэша (если там актуальная версия) или серверным
+        курсором; по каждой порции обновляются MeasurementStats и MeasurementReduction.
+        self.data - кадр по одной строке на (соединение, реплика, время), поэтому расчеты
+        роста, ингибирования и моделей работают без изменений. max_bytes ограничивает
+        память загрузки (по умолчанию out_of_core_bytes).
+        """
+        max_bytes = max_bytes or self.out_of_core_bytes
+        chunk_size = max(1000, min(self.chunk_size, max_bytes // 4 // STREAM_ROW_BYTES))
+        try:
+            version = self.probe_version(experiment_id)
+            stats = MeasurementStats()
+            reduction = MeasurementReduction(max_bytes * 3 // 4)
+            started = time.perf_counter()
+            
+            chunks = self.cache.iter_chunks(experiment_id, version, chunk_size) if self.cache is not None else None
+            if chunks is not None:
+                for chunk in chunks:
+                    stats.update(*chunk)
+                    reduction.update(*chunk)
+                source = "локального кэша"
+            else:
+                self.run_query(lambda conn: self._load_streaming(
+                    conn, MEASUREMENTS_QUERY, (experiment_id, version[1]), chunk_size, progress_callback,
+                    stats=stats, keep_rows=False, reduction=reduction))
+                source = "БД"
+            data = reduction.measurements()
+            
+            with self._state_lock:
+                if (experiment_id, version) != (self.current_experiment_id, self.data_version):
+                    self._reset_results()
+                    self.analysis_cache.invalidate(experiment_id, keep_version=version)
+                    self.figure_cache.invalidate(experiment_id, keep_version=version)
+                self.data = data
+                self.store = None
+                self.statistics = stats
+                self.reduction = reduction
+                self.data_version = version
+                self.current_experiment_id = experiment_id
+            
+            self.log(f"🧮 Свертка эксперимента ID={experiment_id} из {source}: {reduction.rows} строк -> "
+                     f"{len(data)} точек ({reduction.nbytes / 2**20:.1f} МБ) за {time.perf_counter() - started:.2f} с")
+            return data
+            
+        except MemoryError as e:
+            self.log(f"❌ {e}", "error")
+            return None
+        except Exception as e:
+            self.log(f"❌ Ошибка загрузки данных: {e}", "error")
+            return None
+    
+    def growth_curves(self):
+        """Средняя кинетическая кривая и ее отклонение по каждому соединению: [(соединение, время, OD, std)].
+
+        После загрузки в режиме 'reduce' - по свертке всех измерений, иначе - по срезам ExperimentData.
+        """
+        reduction = self.reduction
+        if reduction is not None:
+            aggregates = reduction.curve_aggregates()
+            return [(compound, group['measurements_time_hours'].to_numpy(), group['mean'].to_numpy(),
+                     group['std'].to_numpy()) for compound, group in aggregates.groupby('compound', sort=False)]
+        
+        store = self.data_store()
+        curves = []
+        for i, compound in enumerate(store.compounds):
+            # Срез соединения из ExperimentData - без фильтрации всего кадра
+            view = store.compound_view(i, ['measurements_time_hours', 'od_value'])
+            curves.append((compound, *grouped_mean_std(view['measurements_time_hours'], view['od_value'])))
+        return curves
+    
+    def condition_curves(self, column, time=24):
+        """Средняя OD и ее отклонение по значениям column (температура, pH) в момент time:
+        [(соединение, значения, OD, std)] - только соединения с измерениями в этот момент."""
+        store = self.data_store()
+        at_time = store.columns['measurements_time_hours'] == time
+        curves = []
+        for i in np.flatnonzero(store.compound_counts(at_time)):
+            view = store.compound_view(i, ['measurements_time_hours', column, 'od_value'])
+            selected = view['measurements_time_hours'] == time
+            # Группируем по значению условия (ключи уже упорядочены)
+            curves.append((store.compounds[i], *grouped_mean_std(view[column][selected], view['od_value'][selected])))
+        return curves
+    
+    def replicate_values(self, time=24):
+        """OD всех измерений каждого соединения в момент time: [(соединение, значения)]"""
+        store = self.data_store()
+        at_time = store.columns['measurements_time_hours'] == time
+        replicates = []
+        for i, compound in enumerate(store.compounds):
+            start, end = store.compound_offsets[i], store.compound_offsets[i + 1]
+            od = store.columns['od_value'][start:end][at_time[start:end]]
+            if len(od):
+                replicates.append((compound, od))
+        return replicates
+    
+    def process_pool(self, workers=None):
+        """Пул процессов анализатора или None для расчета в одном процессе.
+
+        workers - число процессов (по умолчанию self.fit_workers или все ядра).
+        """
+        workers = workers or self.fit_workers or os.cpu_count() or 1
+        return self._get_process_pool(workers) if workers > 1 else None
+    
+    def fetch_experiment_data(self, experiment_id, mode=None, chunk_size=None, progress_callback=None):
+        """Чтение измерений эксперимента без изменения состояния анализатора.
+
+        Каждый вызов берет свое соединение из пула, поэтому несколько экспериментов
+        можно загружать параллельно из разных потоков.
+        """
+        return self._fetch(experiment_id, mode, chunk_size, progress_callback)[0]
+    
+    def enable_cache(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_BYTES):
+        self.cache = ExperimentCache(cache_dir, max_bytes)
+        # Отрисованные графики переживают перезапуск вместе с данными
+        self.figure_cache.set_cache_dir(os.path.join(cache_dir, FIGURE_CACHE_SUBDIR))
+    
+    def disable_cache(self):
+        self.cache = None
+        self.figure_cache.set_cache_dir(None)
+    
+    def probe_version(self, experiment_id):
+        """Версия данных эксперимента: (число измерений, максимальный id_measurement)"""
+        def probe(conn):
+            with conn.cursor() as cursor:
+                cursor.execute(VERSION_QUERY, (experiment_id,))
+                count, max_id = cursor.fetchone()
+            return (count, max_id if max_id is not None else 0)
+        return self.run_query(probe)
+    
+    def _fetch(self, experiment_id, mode=None, chunk_size=None, progress_callback=None, stats=None):
+        mode = mode or self.load_mode
+        version = self.probe_version(experiment_id)
+        cache = self.cache
+        
+        if cache is not None:
+            started = time.perf_counter()
+            data = cache.get(experiment_id, version)
+            if data is not None:
+                self.log(f"💾 Эксперимент ID={experiment_id} открыт из кэша за "
+                         f"{time.perf_counter() - started:.2f} с")
+                if stats is not None:
+                    stats.update_frame(data)
+                return data, version
+        
+        # Ограничиваем выборку проверенной версией, чтобы данные и версия совпадали
+        data = self._run_load(mode, MEASUREMENTS_QUERY, (experiment_id, version[1]),
+                              chunk_size, progress_callback, stats=stats)
+        
+        if cache is not None and not data.empty:
+            try:
+                cache.put(experiment_id, version, data)
+            except OSError as e:
+                self.log(f"Не удалось записать кэш: {e}", "warning")
+        return data, version
+    
+    def _run_load(self, mode, query, params, chunk_size=None, progress_callback=None,
+                  columns=MEASUREMENT_COLUMNS, stats=None):
+        if mode == 'stream':
+            return self.run_query(lambda conn: self._load_streaming(
+                conn, query, params, chunk_size or self.chunk_size, progress_callback, columns, stats))
+        if mode == 'copy':
+            data = self.run_query(lambda conn: self._load_copy_with_fallback(conn, query, params, columns))
+        else:
+            data = self.run_query(lambda conn: self._load_pandas(conn, query, params))
+        # Кадр уже в памяти - статистика за один проход по его столбцам
+        if stats is not None:
+            stats.update_frame(data)
+        return data
+    
+    def load_experiments(self, experiment_ids, mode=None, chunk_size=None, progress_callback=None):
+        """Загрузка нескольких экспериментов одним запросом WHERE id_expirement = ANY(...).
+
+        experiment_ids - список или range. Возвращает словарь {id: DataFrame}
+        с теми же столбцами, что и load_experiment_data; состояние анализатора не меняется.
+        """
+        experiment_ids = sorted({int(experiment_id) for experiment_id in experiment_ids})
+        mode = mode or self.load_mode
+        cache = self.cache
+        
+        try:
+            versions = self.probe_versions(experiment_ids)
+            result = {}
+            missing = []
+            
+            for experiment_id in experiment_ids:
+                if versions[experiment_id][0] == 0:
+                    continue
+                data = cache.get(experiment_id, versions[experiment_id]) if cache is not None else None
+                if data is not None:
+                    result[experiment_id] = data
+                else:
+                    missing.append(experiment_id)
+            from_cache = len(result)
+            
+            if missing:
+                max_ids = [versions[experiment_id][1] for experiment_id in missing]
+                combined = self._run_load(mode, BATCH_MEASUREMENTS_QUERY,
+                                          {'experiment_ids': missing, 'max_ids': max_ids},
+                                          chunk_size, progress_callback, BATCH_COLUMNS)
+                
+                for experiment_id, data in split_experiments(combined).items():
+                    result[experiment_id] = data
+                    if cache is not None:
+                        try:
+                            cache.put(experiment_id, versions[experiment_id], data)
+                        except OSError as e:
+                            self.log(f"Не удалось записать кэш: {e}", "warning")
+            
+            empty = [experiment_id for experiment_id in experiment_ids if experiment_id not in result]
+            for experiment_id in empty:
+                result[experiment_id] = optimize_dtypes(pd.DataFrame(columns=MEASUREMENT_COLUMNS))
+            
+            self.log(f"📚 Загружено {len(experiment_ids)} экспериментов "
+                     f"({sum(len(data) for data in result.values())} строк, "
+                     f"из кэша: {from_cache}, без данных: {len(empty)})")
+            return {experiment_id: result[experiment_id] for experiment_id in experiment_ids}
+            
+        except Exception as e:
+            self.log(f"❌ Ошибка пакетной загрузки: {e}", "error")
+            return None
+    
+    def probe_versions(self, experiment_ids):
+        """Версии данных нескольких экспериментов одним запросом"""
+        def probe(conn):
+            with conn.cursor() as cursor:
+                cursor.execute(BATCH_VERSION_QUERY, (list(experiment_ids),))
+                return {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+        versions = self.run_query(probe)
+        return {experiment_id: versions.get(experiment_id, (0, 0)) for experiment_id in experiment_ids}
+    
+    def refresh_experiment_data(self, mode=None):
+        """Дозагрузка измерений текущего эксперимента с id_measurement больше последнего загруженного.
+
+        Новые строки добавляются к self.data, а в growth_results пересчитываются
+        только затронутые пары (соединение, реплика). Возвращает новые строки.
+        """
+        if self.data is None or self.current_experiment_id is None:
+            self.log("❌ Данные не загружены", "error")
+            return None
+        
+        try:
+            with self._state_lock:
+                experiment_id = self.current_experiment_id
+                old_version = self.data_version
+            
+            version = self.probe_version(experiment_id)
+            if version == old_version:
+                self.log("🔄 Новых измерений нет")
+                return self.data.iloc[:0]
+            
+            new_rows = self._run_load(mode or self.load_mode, NEW_MEASUREMENTS_QUERY,
+                                      (experiment_id, old_version[1], version[1]))
+            
+            # Новые соединения встраиваем в порядок сортировки базы данных
+            known = set(self.data['compound_name'].unique())
+            compound_order = None
+            if set(new_rows['compound_name'].unique()) - known:
+                compound_order = self._compound_order(known | set(new_rows['compound_name'].unique()))
+            
+            if version[0] != old_version[0] + len(new_rows):
+                # Измерения удалялись или вставлялись задним числом - нужна полная перезагрузка,
+                # если за это время не загрузили другой эксперимент (или более новую версию)
+                if not self._refresh_is_current(experiment_id, old_version):
+                    return None
+                self.log("⚠️ Данные эксперимента изменились не только добавлением, полная перезагрузка", "warning")
+                return self.load_experiment_data(experiment_id, mode)
+            
+            with self._state_lock:
+                if not self._refresh_is_current(experiment_id, old_version):
+                    return None
+                if self.reduction is not None:
+                    # Режим 'reduce': новые строки сворачиваются, новые соединения - в конце, как при загрузке
+                    self.reduction.update_frame(new_rows)
+                    self.data = self.reduction.measurements()
+                    compound_order = None
+                else:
+                    self.data = append_measurements(self.data, new_rows, compound_order)
+                self.store = None
+                if self.statistics is not None:
+                    self.statistics.update_frame(new_rows)
+                self.data_version = version
+                self.max_growth_results = None
+                self.fit_results = None
+                self.time_index = None
+                self.growth_matrix = None
+                self._refresh_growth_results(new_rows, compound_order)
+                self.analysis_cache.invalidate(experiment_id, keep_version=version)
+                self.figure_cache.invalidate(experiment_id, keep_version=version)
+                self._cache_growth_results()
+            
+            # Перезаписывать весь кэш при каждой дозагрузке дорого - запись обновится при следующей загрузке
+            if self.cache is not None:
+                self.cache.invalidate(experiment_id)
+            
+            self.log(f"🔄 Добавлено {len(new_rows)} новых измерений (всего {len(self.data)})")
+            return new_rows
+            
+        except Exception as e:
+            self.log(f"❌ Ошибка обновления данных: {e}", "error")
+            return None
+    
+    def _refresh_is_current(self, experiment_id, version):
+        with self._state_lock:
+            if self.current_experiment_id != experiment_id or self.data_version != version:
+                self.log("⚠️ Эксперимент был перезагружен во время обновления", "warning")
+                return False
+            return True
+    
+    def _compound_order(self, names):
+        def query(conn):
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT DISTINCT compound_name FROM compounds "
+                               "WHERE compound_name = ANY(%s) ORDER BY compound_name", (list(names),))
+                return [row[0] for row in cursor.fetchall()]
+        return self.run_query(query)
+    
+    def _refresh_growth_results(self, new_rows, compound_order=None):
+        """Пересчет growth_results только для пар (соединение, реплика), получивших новые строки"""
+        if self.growth_results is None or self.growth_results.empty or self.growth_window is None:
+            return
+        
+        start_time, end_time = self.growth_window
+        affected = pd.MultiIndex.from_frame(
+            new_rows[['compound_name', 'replicate_number']].drop_duplicates().astype(object))
+        
+        # Для скорости роста нужны только строки в начальное и конечное время
+        data = self.data
+        window_rows = data[data['measurements_time_hours'].isin([start_time, end_time])]
+        pair_index = pd.MultiIndex.from_frame(window_rows[['compound_name', 'replicate_number']].astype(object))
+        recomputed = compute_growth_rates(window_rows[pair_index.isin(affected)], start_time, end_time)
+        
+        results = self.growth_results
+        result_pairs = pd.MultiIndex.from_frame(results[['compound', 'replicate']].astype(object))
+        keep = results[~result_pairs.isin(affected)]
+        
+        # Прежние пары остаются на своих местах, новые - в конце блока своего соединения
+        positions = {pair: i for i, pair in enumerate(result_pairs)}
+        updated = pd.concat([keep, recomputed], ignore_index=True)
+        if compound_order is None:
+            compound_order = pd.unique(pd.concat([results['compound'], updated['compound']]))
+        compound_rank = {compound: i for i, compound in enumerate(compound_order)}
+        updated['_rank'] = updated['compound'].map(compound_rank)
+        updated['_position'] = [positions.get(pair, len(results))
+                                for pair in zip(updated['compound'], updated['replicate'])]
+        updated = (updated.sort_values(['_rank', '_position'], kind='stable')
+                   .drop(columns=['_rank', '_position']).reset_index(drop=True))
+        
+        if results['inhibition_percent'].notna().any():
+            control_mask = updated['compound'].str.contains(CONTROL_MARKER, case=False, na=False)
+            control_data = updated[control_mask]
+            control_mean = control_data['growth_rate'].mean()
+            recomputed_mask = pd.MultiIndex.from_frame(
+                updated[['compound', 'replicate']].astype(object)).isin(affected)
+            
+            if control_data.empty or not control_mean > 0:
+                updated['inhibition_percent'] = None
+            elif (control_mask & recomputed_mask).any():
+                # Изменилась средняя скорость роста контроля - пересчитываем все образцы
+                apply_inhibition(updated, control_data, control_mean)
+            else:
+                apply_inhibition(updated, control_data, control_mean, updated.index[recomputed_mask])
+        
+        # Бутстреп-интервалы по старым репликам больше не действительны
+        self.growth_results = updated.drop(columns=['inhibition_ci_low', 'inhibition_ci_high'], errors='ignore')
+        self.inhibition_ci = None
+    
+    def _load_streaming(self, conn, query, params, chunk_size, progress_callback=None,
+                        columns=MEASUREMENT_COLUMNS, stats=None, keep_rows=True, reduction=None):
+        """Потоковое чтение через именованный (серверный) курсор в типизированные массивы.
+
+        stats (MeasurementStats) и reduction (MeasurementReduction) обновляются по каждой
+        порции. При keep_rows=False строки после этого отбрасываются и возвращается None.
+        """
+        buffers = {col: make_column_buffer(COLUMN_DTYPES[col]) for col in columns}
+        if stats is not None:
+            # Повторная попытка после обрыва связи считает статистику заново
+            stats.clear()
+        if reduction is not None:
+            reduction.clear()
+        cursor_name = f"lab_stream_{threading.get_ident()}_{int(time.time() * 1000)}"
+        started = time.perf_counter()
+        total = 0
+        
+        try:
+            with conn.cursor(name=cursor_name) as cursor:
+                cursor.itersize = chunk_size
+                cursor.execute(query, params)
+                
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    
+                    # Транспонируем порцию строк в столбцы и дописываем в буферы
+                    start = buffers[columns[0]].size
+                    for col, values in zip(columns, zip(*rows)):
+                        buffers[col].extend(values)
+                    
+                    if stats is not None or reduction is not None:
+                        names = buffers['compound_name']
+                        values = {col: buffer.view(start) if isinstance(buffer, ColumnBuffer)
+                                  else pd.Categorical.from_codes(buffer.view(start), categories=list(buffer.mapping))
+                                  for col, buffer in buffers.items() if buffer is not names}
+                        chunk = (values, names.view(start), list(names.mapping))
+                        for consumer in (stats, reduction):
+                            if consumer is not None:
+                                consumer.update(*chunk)
+                    if not keep_rows:
+                        for buffer in buffers.values():
+                            buffer.reset()
+                    
+                    total += len(rows)
+                    if progress_callback is not None:
+                        elapsed = time.perf_counter() - started
+                        progress_callback(total, total / elapsed if elapsed > 0 else 0.0)
+        finally:
+            # Закрываем транзакцию, открытую серверным курсором
+            conn.rollback()
+        
+        elapsed = time.perf_counter() - started
+        self.log(f"🚚 Потоковая загрузка: {total} строк за {elapsed:.2f} с "
+                 f"({total / elapsed if elapsed > 0 else 0:.0f} строк/с)")
+        if not keep_rows:
+            return None
+        
+        arrays = {col: buffers[col].finalize() for col in columns}
+        return optimize_dtypes(pd.DataFrame(arrays, columns=columns))
+    
+    def _load_copy(self, conn, query, params, columns=MEASUREMENT_COLUMNS):
+        """Загрузка через COPY (...) TO STDOUT в формате CSV с разбором в столбцы NumPy"""
+        started = time.perf_counter()
+        buffer = io.BytesIO()
+        encoding = psycopg2.extensions.encodings[conn.encoding]
+        
+        try:
+            with conn.cursor() as cursor:
+                # COPY не принимает параметры, поэтому подставляем их на стороне клиента
+                select_sql = cursor.mogrify(query, params).decode(encoding)
+                cursor.copy_expert(f"COPY ({select_sql.strip()}) TO STDOUT WITH (FORMAT csv)", buffer)
+        finally:
+            conn.rollback()
+        
+        transferred = buffer.tell()
+        if transferred == 0:
+            return optimize_dtypes(pd.DataFrame(columns=columns))
+        buffer.seek(0)
+        
+        # Парсер CSV на C сразу заполняет типизированные массивы без создания объектов на строку
+        data = pd.read_csv(buffer, header=None, names=columns, encoding=encoding,
+                           dtype={col: COLUMN_DTYPES[col] for col in columns}, keep_default_na=False, na_values=[''])
+        optimize_dtypes(data)
+        
+        elapsed = time.perf_counter() - started
+        self.log(f"🚚 Загрузка через COPY: {len(data)} строк ({transferred / 1024:.0f} КБ) за {elapsed:.2f} с "
+                 f"({len(data) / elapsed if elapsed > 0 else 0:.0f} строк/с)")
+        return data
+    
+    def _load_copy_with_fallback(self, conn, query, params, columns=MEASUREMENT_COLUMNS):
+        try:
+            return self._load_copy(conn, query, params, columns)
+        except Exception as e:
+            if conn.closed:
+                raise
+            self.log(f"COPY недоступен ({e}), используется pd.read_sql_query", "warning")
+            return self._load_pandas(conn, query, params)
+    
+    def _load_pandas(self, conn, query, params):
+        return optimize_dtypes(pd.read_sql_query(query, conn, params=params))
+    
+    def stream_statistics(self, experiment_id, chunk_size=None, progress_callback=None):
+        """Статистика измерений эксперимента за один потоковый проход без сохранения строк в памяти"""
         try:
-            query = """
-            SELECT 
-                e.expirement_name,
-                r.fio as researcher,
-                c.compound_name,
-                m.measurements_time_hours,
-                m.od_value,
-                m.ph_value,
-                m.temperature_celsius,
-                m.replicate_number
-            FROM measurements m
-            JOIN expirements e ON m.id_expirement = e.id_expirement
-            JOIN compounds c ON m.compound_id = c.compound_id
-            JOIN researchers r ON e.id_research = r.id_research
-            WHERE m.id_expirement = %s
-            ORDER BY c.compound_name, m.measurements_time_hours, m.replicate_number
-            """
-            
-            self.data = pd.read_sql_query(query, self.conn, params=(experiment_id,))
-            self.current_experiment_id = experiment_id
-            
-            if self.data.empty:
-                self.log(f"⚠️ Нет данных для эксперимента ID={experiment_id}", "warning")
-                return self.data
-            
-            self.log(f"📥 Загружено {len(self.data)} строк из БД")
-            self.log(f"🧪 Соединения: {', '.join(self.data['compound_name'].unique())}")
-            self.log(f"⏰ Временные точки: {sorted(self.data['measurements_time_hours'].unique())}")
-            
-            return self.data
+            version = self.probe_version(experiment_id)
+            stats = MeasurementStats()
+            self.run_query(lambda conn: self._load_streaming(
+                conn, MEASUREMENTS_QUERY, (experiment_id, version[1]), chunk_size or self.chunk_size,
+                progress_callback, stats=stats, keep_rows=False))
+            self.log(f"📊 Статистика эксперимента ID={experiment_id}: {stats.rows} измерений")
+            return stats
             
         except Exception as e:
-            self.log(f"❌ Ошибка загрузки данных: {e}", "error")
+            self.log(f"❌ Ошибка расчета статистики: {e}", "error")
             return None
     
-    def calculate_growth_rate(self, start_time=0, end_time=24):
+    def get_memory_report(self):
+        """Отчет о памяти загруженного эксперимента (до и после сжатия типов)"""
         if self.data is None or self.data.empty:
+            return None
+        
+        report = memory_report(self.data)
+        self.memory_reports[self.current_experiment_id] = report
+        return report
+    
+    def data_store(self):
+        """ExperimentData загруженных данных; строится один раз на версию данных"""
+        with self._state_lock:
+            if self.store is None and self.data is not None:
+                self.store = ExperimentData(self.data)
+            return self.store
+    
+    def _reset_results(self):
+        self.growth_results = None
+        self.growth_window = None
+        self.max_growth_results = None
+        self.fit_results = None
+        self.inhibition_ci = None
+        self.time_index = None
+        self.growth_matrix = None
+    
+    def _snapshot(self):
+        """(данные, эксперимент, версия) на один момент: расчет идет по снимку, а не по self.data"""
+        with self._state_lock:
+            return self.data, self.current_experiment_id, self.data_version
+    
+    def _is_current(self, snapshot):
+        # Вызывается под _state_lock: снимок все еще описывает загруженные данные
+        return (self.current_experiment_id, self.data_version) == snapshot[1:]
+    
+    def _stale(self, snapshot, what):
+        """Вызывается под _state_lock: True (с предупреждением), если снимок устарел и результат надо отбросить"""
+        if self._is_current(snapshot):
+            return False
+        self.log(f"⚠️ Данные сменились во время расчета {what}, результат отброшен", "warning")
+        return True
+    
+    def _analysis_key(self, kind, window, engine, snapshot=None):
+        """Ключ AnalysisCache для снимка (по умолчанию - загруженных данных) или None, если версия неизвестна.
+
+        Движок входит в ключ: явный engine='sql' не должен получать результат pandas из кэша.
+        """
+        _, experiment_id, version = snapshot or (None, self.current_experiment_id, self.data_version)
+        if experiment_id is None or version is None:
+            return None
+        return (experiment_id, tuple(version), tuple(window), kind, engine)
+    
+    def figure_key(self, kind, figsize, params=()):
+        """Ключ FigureCache (без формата) для графика загруженных данных или None, если версия неизвестна"""
+        if self.current_experiment_id is None or self.data_version is None:
+            return None
+        return (self.current_experiment_id, tuple(self.data_version), kind, tuple(figsize), tuple(params))
+    
+    def _cached_analysis(self, kind, window, engine, snapshot):
+        key = self._analysis_key(kind, window, engine, snapshot)
+        results = self.analysis_cache.get(key) if key is not None else None
+        if results is not None:
+            with self._state_lock:
+                if self._is_current(snapshot):
+                    self.growth_results = results
+                    self.growth_window = tuple(window)
+                    self.inhibition_ci = None
+        return results
+    
+    def _cache_growth_results(self):
+        """Кладет текущие growth_results в кэш: как скорость роста и, если есть, как ингибирование"""
+        if self.growth_results is None or self.growth_window is None:
+            return
+        # Затронутые дозагрузкой пары пересчитываются в pandas
+        key = self._analysis_key('growth', self.growth_window, 'pandas')
+        if key is None:
+            return
+        results = self.growth_results.drop(columns=['inhibition_ci_low', 'inhibition_ci_high'], errors='ignore')
+        if results['inhibition_percent'].notna().any():
+            self.analysis_cache.put(self._analysis_key('inhibition', self.growth_window, 'pandas'), results)
+        self.analysis_cache.put(key, results.assign(inhibition_percent=np.nan))
+    
+    def calculate_growth_rate(self, start_time=0, end_time=24, engine=None):
+        """Скорость роста по двум точкам.
+
+        engine: 'pandas' - расчет по загруженным данным, 'sql' - расчет в PostgreSQL
+        (клиенту передается только итоговая таблица). Повторный расчет для тех же
+        эксперимента, окна и версии данных берется из analysis_cache.
+        """
+        return self._calculate_growth_rate(self._snapshot(), start_time, end_time, engine)
+    
+    def _calculate_growth_rate(self, snapshot, start_time, end_time, engine):
+        data, experiment_id, version = snapshot
+        if data is None or data.empty:
             self.log("❌ Данные не загружены", "error")
             return None
         
+        engine = engine or self.growth_engine
+        cached = self._cached_analysis('growth', (start_time, end_time), engine, snapshot)
+        if cached is not None:
+            self.log(f"⚡ Скорость роста из кэша анализа ({len(cached)} значений)")
+            return cached if not cached.empty else pd.DataFrame()
+        
         try:
-            results = []
+            results = self._read_growth_summary(experiment_id, version, start_time, end_time)
+            if results is not None:
+                self.log("🗂️ Скорость роста взята из сводки growth_summary")
+            elif engine == 'sql':
+                results = self._query_growth(experiment_id, version, start_time, end_time)
+            else:
+                results = compute_growth_rates(data, start_time, end_time)
             
-            for compound in self.data['compound_name'].unique():
-                compound_data = self.data[self.data['compound_name'] == compound]
-                
-                for replicate in compound_data['replicate_number'].unique():
-                    rep_data = compound_data[compound_data['replicate_number'] == replicate]
-                    
-                    # Ищем измерения в начальное и конечное время
-                    start_measurement = rep_data[rep_data['measurements_time_hours'] == start_time]
-                    end_measurement = rep_data[rep_data['measurements_time_hours'] == end_time]
-                    
-                    if not start_measurement.empty and not end_measurement.empty:
-                        initial_od = start_measurement.iloc[0]['od_value']
-                        final_od = end_measurement.iloc[0]['od_value']
-                        time_diff = end_time - start_time
-                        
-                        if time_diff > 0 and initial_od > 0 and final_od > 0:
-                            growth_rate = (np.log(final_od) - np.log(initial_od)) / time_diff
-                            
-                            results.append({
-                                'compound': compound,
-                                'replicate': replicate,
-                                'initial_od': initial_od,
-                                'final_od': final_od,
-                                'growth_rate': growth_rate,
-                                'inhibition_percent': None
-                            })
-            
-            if results:
-                self.growth_results = pd.DataFrame(results)
+            # Пока шел расчет, мог загрузиться другой эксперимент - результат снимка ему не принадлежит
+            with self._state_lock:
+                if not self._is_current(snapshot):
+                    self.log("⚠️ Данные сменились во время расчета скорости роста, результат отброшен", "warning")
+                    return None
+                self.growth_window = (start_time, end_time)
+                self.growth_results = results
+                self.inhibition_ci = None
+                key = self._analysis_key('growth', self.growth_window, engine, snapshot)
+                if key is not None:
+                    self.analysis_cache.put(key, results)
+            
+            if not results.empty:
                 self.log(f"✅ Рассчитано {len(results)} значений скорости роста")
-                return self.growth_results
+                return results
             else:
                 self.log("⚠️ Не удалось рассчитать скорость роста", "warning")
                 return pd.DataFrame()
@@ -128,24 +2735,46 @@ class LabExperimentAnalyzer:
             self.log(f"❌ Ошибка расчета скорости роста: {e}", "error")
             return None
     
-    def calculate_inhibition(self):
-        """Расчет процента ингибирования роста"""
-        if self.data is None:
+    def calculate_inhibition(self, engine=None, start_time=None, end_time=None):
+        """Расчет процента ингибирования роста.
+
+        Окно - заданное явно, иначе окно последнего расчета скорости роста (по умолчанию 0-24 ч);
+        скорость роста пересчитывается, если growth_results построены для другого окна
+        или движок задан явно (growth_results могли быть рассчитаны другим движком).
+        """
+        snapshot = self._snapshot()
+        if snapshot[0] is None:
             self.log("❌ Данные не загружены", "error")
             return None
         
+        with self._state_lock:
+            growth_window = self.growth_window if self._is_current(snapshot) else None
+            growth = self.growth_results if growth_window is not None else None
+        if start_time is None or end_time is None:
+            window = growth_window or (0, 24)
+        else:
+            window = (start_time, end_time)
+        explicit_engine = engine is not None
+        engine = engine or self.growth_engine
+        cached = self._cached_analysis('inhibition', window, engine, snapshot)
+        if cached is not None:
+            self.log(f"⚡ Ингибирование из кэша анализа ({len(cached)} образцов)")
+            return cached
+        
         try:
-            # Сначала рассчитываем скорость роста
-            if self.growth_results is None or self.growth_results.empty:
-                self.calculate_growth_rate()
+            # Сначала рассчитываем скорость роста для нужного окна
+            if growth is None or growth_window != window or explicit_engine:
+                growth = self._calculate_growth_rate(snapshot, *window, engine)
+                if growth is None:
+                    return None
             
-            if self.growth_results.empty:
+            if growth.empty:
                 self.log("⚠️ Нет данных для расчета ингибирования", "warning")
                 return None
             
             # Находим контрольную группу
-            control_mask = self.growth_results['compound'].str.contains('Контроль', case=False, na=False)
-            control_data = self.growth_results[control_mask]
+            control_mask = growth['compound'].str.contains(CONTROL_MARKER, case=False, na=False)
+            control_data = growth[control_mask]
             
             if control_data.empty:
                 self.log("⚠️ Не найдена контрольная группа", "warning")
@@ -159,20 +2788,19 @@ class LabExperimentAnalyzer:
                 return None
             
             # Расчет ингибирования
-            inhibition_results = self.growth_results.copy()
-            
-            for idx, row in inhibition_results.iterrows():
-                if row['compound'] in control_data['compound'].values:
-                    inhibition_percent = 0
-                else:
-                    if pd.notnull(row['growth_rate']):
-                        inhibition_percent = ((control_mean - row['growth_rate']) / control_mean) * 100
-                    else:
-                        inhibition_percent = None
-                
-                inhibition_results.at[idx, 'inhibition_percent'] = inhibition_percent
+            inhibition_results = growth.copy()
+            apply_inhibition(inhibition_results, control_data, control_mean)
             
-            self.growth_results = inhibition_results
+            with self._state_lock:
+                if not self._is_current(snapshot):
+                    self.log("⚠️ Данные сменились во время расчета ингибирования, результат отброшен", "warning")
+                    return None
+                self.growth_results = inhibition_results
+                self.growth_window = window
+                self.inhibition_ci = None
+                key = self._analysis_key('inhibition', window, engine, snapshot)
+                if key is not None:
+                    self.analysis_cache.put(key, inhibition_results)
             self.log(f"✅ Рассчитано ингибирование для {len(inhibition_results)} образцов")
             return inhibition_results
             
@@ -180,10 +2808,227 @@ class LabExperimentAnalyzer:
             self.log(f"❌ Ошибка расчета ингибирования: {e}", "error")
             return None
     
+    def calculate_max_growth_rate(self, window=DEFAULT_MUMAX_WINDOW):
+        """µmax каждой реплики по скользящему окну из window точек (см. compute_max_growth_rates)"""
+        snapshot = self._snapshot()
+        data = snapshot[0]
+        if data is None or data.empty:
+            self.log("❌ Данные не загружены", "error")
+            return None
+        
+        try:
+            results = compute_max_growth_rates(data, window)
+            with self._state_lock:
+                if self._stale(snapshot, "µmax"):
+                    return None
+                self.max_growth_results = results
+            fitted = int(results['mu_max'].notna().sum())
+            if fitted:
+                self.log(f"✅ Рассчитано µmax для {fitted} из {len(results)} реплик (окно {window} точки)")
+            else:
+                self.log(f"⚠️ Нет реплик с {window} последовательными измерениями OD > 0", "warning")
+            return results
+            
+        except Exception as e:
+            self.log(f"❌ Ошибка расчета µmax: {e}", "error")
+            return None
+    
+    def calculate_growth_matrix(self, grid=None, interpolate=False):
+        """Скорости роста всех реплик для всех окон (start, end) из точек grid (см. growth_rate_matrix).
+
+        По умолчанию окна строятся по измеренным точкам времени. Индекс времени TimeIndex
+        строится один раз для загруженных данных. Результат - (пары, grid, матрица) в growth_matrix.
+        """
+        snapshot = self._snapshot()
+        if snapshot[0] is None or snapshot[0].empty:
+            self.log("❌ Данные не загружены", "error")
+            return None
+        
+        try:
+            # Индекс времени строится по тем же данным, что и снимок
+            with self._state_lock:
+                if self._stale(snapshot, "матрицы окон"):
+                    return None
+                if self.time_index is None:
+                    self.time_index = TimeIndex(self.data_store())
+                index = self.time_index
+            grid, rates = growth_rate_matrix(index, grid, interpolate)
+            matrix = (index.pairs, grid, rates)
+            with self._state_lock:
+                if self._stale(snapshot, "матрицы окон"):
+                    return None
+                self.growth_matrix = matrix
+            windows = len(grid) * (len(grid) - 1) // 2
+            self.log(f"✅ Матрица скоростей роста: {len(index)} реплик × {windows} окон"
+                     + (" (с интерполяцией)" if interpolate else ""))
+            return matrix
+            
+        except Exception as e:
+            self.log(f"❌ Ошибка расчета матрицы окон: {e}", "error")
+            return None
+    
+    def calculate_inhibition_ci(self, resamples=DEFAULT_BOOTSTRAP_RESAMPLES, confidence=0.95, seed=0, workers=1):
+        """Бутстреп-интервалы ингибирования по соединениям (см. bootstrap_inhibition).
+
+        Границы добавляются в growth_results столбцами inhibition_ci_low / inhibition_ci_high,
+        сводка по соединениям сохраняется в inhibition_ci. workers > 1 - расчет в пуле процессов.
+        """
+        with self._state_lock:
+            snapshot, growth = self._snapshot(), self.growth_results
+        if growth is None or 'inhibition_percent' not in growth.columns or growth['inhibition_percent'].isna().all():
+            if self.calculate_inhibition() is None:
+                return None
+            with self._state_lock:
+                snapshot, growth = self._snapshot(), self.growth_results
+        
+        try:
+            executor = self._get_process_pool(workers) if workers > 1 else None
+            summary = bootstrap_inhibition(growth, resamples, confidence, seed, executor=executor)
+            
+            keys = [col for col in summary.columns if col in ('id_expirement', 'compound')]
+            bounds = summary[keys + ['ci_low', 'ci_high']].rename(
+                columns={'ci_low': 'inhibition_ci_low', 'ci_high': 'inhibition_ci_high'})
+            results = growth.drop(columns=['inhibition_ci_low', 'inhibition_ci_high'], errors='ignore')
+            
+            # Интервалы относятся только к тем growth_results, по которым считались
+            with self._state_lock:
+                if not self._is_current(snapshot) or self.growth_results is not growth:
+                    self.log("⚠️ Данные сменились во время расчета интервалов, результат отброшен", "warning")
+                    return None
+                self.growth_results = results.merge(bounds, on=keys, how='left')
+                self.inhibition_ci = summary
+            self.log(f"✅ Бутстреп-интервалы {confidence:.0%} для {len(summary)} соединений ({resamples} выборок)")
+            return summary
+            
+        except Exception as e:
+            self.log(f"❌ Ошибка расчета доверительных интервалов: {e}", "error")
+            return None
+    
+    def fit_growth_curves(self, model='gompertz', workers=None):
+        """Лаг-фаза, µmax и емкость среды по модели роста для каждой реплики.
+
+        workers - число процессов (по умолчанию self.fit_workers или все ядра; 1 - без пула).
+        Старт подгонки - двухточечные скорости роста из growth_results.
+        """
+        with self._state_lock:
+            snapshot, growth, growth_window = self._snapshot(), self.growth_results, self.growth_window
+        data = snapshot[0]
+        if data is None or data.empty:
+            self.log("❌ Данные не загружены", "error")
+            return None
+        
+        try:
+            if growth is None or growth.empty:
+                growth = compute_growth_rates(data, *(growth_window or (0, 24)))
+            
+            executor = self.process_pool(workers)
+            
+            started = time.perf_counter()
+            results = fit_growth_models(data, model, growth, executor)
+            with self._state_lock:
+                if self._stale(snapshot, "модели роста"):
+                    return None
+                self.fit_results = results
+            self.log(f"✅ Модель {model}: подогнано {int(results['converged'].sum())} из {len(results)} кривых "
+                     f"за {time.perf_counter() - started:.2f} с")
+            return results
+            
+        except Exception as e:
+            self.log(f"❌ Ошибка подгонки моделей роста: {e}", "error")
+            return None
+    
+    def _get_process_pool(self, workers):
+        """Пул процессов для расчетов; создается при первом использовании и переиспользуется"""
+        with self._state_lock:
+            if self._process_pool is None or self._process_pool._max_workers != workers:
+                if self._process_pool is not None:
+                    self._process_pool.shutdown(wait=False)
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            return self._process_pool
+    
+    def calculate_batch_inhibition(self, experiments, start_time=0, end_time=24):
+        """Скорость роста и ингибирование для нескольких экспериментов одним расчетом.
+
+        experiments - словарь {id: DataFrame} (например, из load_experiments); у каждого
+        эксперимента свой контроль. Состояние анализатора не меняется.
+        """
+        try:
+            frames = [data.assign(id_expirement=np.int32(experiment_id))
+                      for experiment_id, data in experiments.items() if len(data)]
+            if not frames:
+                self.log("⚠️ Нет данных для расчета ингибирования", "warning")
+                return None
+            
+            growth = compute_growth_rates(pd.concat(frames, ignore_index=True), start_time, end_time)
+            results, missing = compute_inhibition(growth)
+            if missing:
+                ids = ', '.join(str(key[0]) for key in missing)
+                self.log(f"⚠️ Нет пригодной контрольной группы в экспериментах: {ids}", "warning")
+            
+            self.log(f"✅ Рассчитано ингибирование для {len(results)} образцов "
+                     f"из {results['id_expirement'].nunique()} экспериментов")
+            return results
+            
+        except Exception as e:
+            self.log(f"❌ Ошибка расчета ингибирования: {e}", "error")
+            return None
+    
+    def _query_growth(self, experiment_id, version, start_time, end_time):
+        return self.run_query(lambda conn: query_growth(conn, experiment_id, version[1], start_time, end_time))
+    
+    def _read_growth_summary(self, experiment_id, version, start_time, end_time):
+        """Готовая сводка роста для версии version эксперимента или None"""
+        if not self.use_growth_summary or version is None:
+            return None
+        try:
+            return self.run_query(lambda conn: read_growth_summary(
+                conn, experiment_id, version, start_time, end_time))
+        except psycopg2.errors.UndefinedTable:
+            # Миграция 002 не применена - сводки нет, считаем по измерениям
+            self.use_growth_summary = False
+            self.log("⚠️ Таблица growth_summary не найдена (python app.py migrate)", "warning")
+            return None
+        except (psycopg2.Error, AttributeError) as e:
+            # Нет соединения (или пула): сводка - только ускорение, данные уже в памяти
+            self.log(f"⚠️ Сводка роста недоступна ({e}), расчет по загруженным данным", "warning")
+            return None
+    
+    def refresh_growth_summary(self, experiment_ids=None, windows=None, force=False):
+        """Обновляет сводку роста для экспериментов (по умолчанию - для всех)"""
+        windows = windows or STANDARD_GROWTH_WINDOWS
+        try:
+            if experiment_ids is None:
+                experiment_ids = self.get_available_experiments()['id_expirement'].tolist()
+            versions = self.probe_versions(experiment_ids)
+            
+            refreshed = 0
+            for experiment_id in experiment_ids:
+                refreshed += self.run_query(lambda conn: store_growth_summary(
+                    conn, experiment_id, versions[experiment_id], windows, force))
+            self.log(f"🗂️ Сводка роста: обновлено окон {refreshed} для {len(experiment_ids)} экспериментов")
+            return refreshed
+        except Exception as e:
+            self.log(f"❌ Ошибка обновления сводки роста: {e}", "error")
+            return None
+    
+    def migrate(self, directory=MIGRATIONS_DIR):
+        """Применяет к базе недостающие миграции схемы"""
+        try:
+            applied = self.run_query(lambda conn: apply_migrations(conn, directory))
+            if applied:
+                self.log(f"🛠️ Применены миграции: {', '.join(applied)}")
+            else:
+                self.log("🛠️ Схема в актуальном состоянии")
+            return applied
+        except Exception as e:
+            self.log(f"❌ Ошибка применения миграций: {e}", "error")
+            return None
+    
     def get_available_experiments(self):
         try:
             query = "SELECT id_expirement, expirement_name FROM expirements ORDER BY id_expirement"
-            experiments = pd.read_sql_query(query, self.conn)
+            experiments = self.run_query(lambda conn: pd.read_sql_query(query, conn))
             self.log(f"📋 Получено {len(experiments)} экспериментов")
             return experiments
         except Exception as e:
@@ -198,7 +3043,7 @@ class LabExperimentAnalyzer:
             JOIN researchers r ON e.id_research = r.id_research
             WHERE e.id_expirement = %s
             """
-            info = pd.read_sql_query(query, self.conn, params=(experiment_id,))
+            info = self.run_query(lambda conn: pd.read_sql_query(query, conn, params=(experiment_id,)))
             if not info.empty:
                 self.log(f"📄 Получена информация об эксперименте ID={experiment_id}")
                 return info.iloc[0]
@@ -208,31 +3053,683 @@ class LabExperimentAnalyzer:
             return None
     
     def get_statistics(self):
-        if self.data is None or self.data.empty:
+        """Сводка по загруженным данным из статистики, накопленной при загрузке (квантили приближенные)"""
+        if self.statistics is None and (self.data is None or self.data.empty):
             return None
         
         try:
-            stats = {
-                'Общие': {
-                    'Всего измерений': len(self.data),
-                    'Количество соединений': self.data['compound_name'].nunique(),
-                    'Количество реплик': self.data['replicate_number'].nunique(),
-                    'Временной диапазон': f"{self.data['measurements_time_hours'].min()} - {self.data['measurements_time_hours'].max()} ч"
-                },
-                'Оптическая плотность (OD)': self.data['od_value'].describe().to_dict(),
-                'pH': self.data['ph_value'].describe().to_dict(),
-                'Температура': self.data['temperature_celsius'].describe().to_dict()
-            }
-            return stats
+            with self._state_lock:
+                if self.statistics is None:
+                    self.statistics = MeasurementStats()
+                    self.statistics.update_frame(self.data)
+                return self.statistics.summary()
         except Exception as e:
             self.log(f"❌ Ошибка расчета статистики: {e}", "error")
             return None
     
     def close(self):
-        if self.conn:
-            self.conn.close()
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+        if self.pool:
+            self.pool.closeall()
+            self.pool = None
             self.log("🔌 Соединение с БД закрыто")
 
+def build_growth_figure(figsize, curves):
+    """Кривые роста: средняя OD и ее отклонение по каждому соединению (curves - см. growth_curves)"""
+    if not curves:
+        return None
+    fig = Figure(figsize=figsize)
+    ax = fig.add_subplot(111)
+    
+    # Используем цветовую палитру
+    colors = plt.cm.tab10(np.linspace(0, 1, len(curves)))
+    
+    for (compound, times, mean_curve, std_curve), color in zip(curves, colors):
+        # Рисуем кривую со стандартным отклонением
+        ax.plot(times, mean_curve, 
+               label=compound, color=color, linewidth=2, marker='o', markersize=6)
+        
+        # Заливка для стандартного отклонения
+        ax.fill_between(times,
+                      mean_curve - std_curve,
+                      mean_curve + std_curve,
+                      color=color, alpha=0.2)
+    
+    ax.set_xlabel('Время, часы', fontsize=12)
+    ax.set_ylabel('Оптическая плотность (OD)', fontsize=12)
+    ax.set_title('Кинетика роста микроорганизмов', fontsize=14, fontweight='bold')
+    ax.legend(loc='best', fontsize=10)
+    ax.grid(True, alpha=0.3, linestyle='--')
+    ax.set_axisbelow(True)
+    
+    fig.tight_layout()
+    return fig
+
+def build_inhibition_figure(figsize, data, intervals=None):
+    """Ингибирование по соединениям: data - growth_results, intervals - бутстреп-интервалы или None"""
+    if data is None or data.empty:
+        return None
+    
+    # Фильтруем контроль и удаляем NaN
+    control_mask = data['compound'].str.contains(CONTROL_MARKER, case=False, na=False)
+    plot_data = data[~control_mask].dropna(subset=['inhibition_percent'])
+    if plot_data.empty:
+        return None
+    
+    # Группируем по соединениям
+    grouped = plot_data.groupby('compound')['inhibition_percent']
+    compounds = list(grouped.groups.keys())
+    means = grouped.mean().values
+    stds = grouped.std().values
+    
+    fig = Figure(figsize=figsize)
+    ax = fig.add_subplot(111)
+    
+    if intervals is not None and not intervals.empty:
+        # Столбцы - ингибирование по средним, усы - бутстреп-интервал
+        intervals = intervals.set_index('compound').reindex(compounds)
+        means = intervals['inhibition_percent'].to_numpy()
+        errors = np.vstack([means - intervals['ci_low'].to_numpy(), intervals['ci_high'].to_numpy() - means])
+        colors = sns.color_palette('viridis', len(compounds))
+        ax.bar(range(len(compounds)), means, yerr=errors, color=colors, capsize=5)
+        ax.set_xticks(range(len(compounds)))
+        ax.set_xticklabels(compounds)
+    else:
+        # Используем seaborn для построения графика
+        sns.barplot(data=plot_data, x='compound', y='inhibition_percent', 
+                   ax=ax, palette='viridis', ci='sd', capsize=0.1)
+    
+    # Добавляем значения на столбцы
+    for i, (mean, std) in enumerate(zip(means, stds)):
+        ax.text(i, mean + 3, f'{mean:.1f}%', ha='center', fontweight='bold', fontsize=10)
+    
+    ax.set_xticklabels(ax.get_xticklabels(), rotation=45, ha='right')
+    ax.set_ylabel('% Ингибирования роста', fontsize=12)
+    ax.set_title('Эффективность соединений', fontsize=14, fontweight='bold')
+    ax.set_ylim(0, 105)
+    ax.grid(True, alpha=0.3, axis='y')
+    
+    # Линия 50% ингибирования
+    ax.axhline(y=50, color='red', linestyle='--', alpha=0.5, linewidth=1.5)
+    ax.text(0.02, 0.98, '50% ингибирование', transform=ax.transAxes, 
+           color='red', fontsize=10, verticalalignment='top')
+    
+    fig.tight_layout()
+    return fig
+
+def build_condition_figure(figsize, curves, column):
+    """OD через 24 ч в зависимости от условия column (температура или pH); curves - см. condition_curves"""
+    if not curves:
+        return None
+    style = CONDITION_PLOT_STYLES[column]
+    fig = Figure(figsize=figsize)
+    ax = fig.add_subplot(111)
+    
+    colors = style['cmap'](np.linspace(0, 1, len(curves)))
+    for (compound, values, mean_od, std_od), color in zip(curves, colors):
+        ax.plot(values, mean_od, label=compound, 
+               color=color, marker=style['marker'], linewidth=2, markersize=8)
+        
+        # Отображаем стандартное отклонение
+        ax.fill_between(values,
+                      mean_od - std_od,
+                      mean_od + std_od,
+                      color=color, alpha=0.2)
+    
+    ax.set_xlabel(style['xlabel'], fontsize=12)
+    ax.set_ylabel('Оптическая плотность (OD)', fontsize=12)
+    ax.set_title(style['title'], fontsize=14, fontweight='bold')
+    ax.legend(loc='best', fontsize=10)
+    ax.grid(True, alpha=0.3, linestyle='--')
+    ax.set_axisbelow(True)
+    
+    fig.tight_layout()
+    return fig
+
+def build_replicates_figure(figsize, replicates):
+    """Разброс OD реплик через 24 ч по соединениям; replicates - см. replicate_values"""
+    if not replicates:
+        return None
+    fig = Figure(figsize=figsize)
+    ax = fig.add_subplot(111)
+    
+    plot_data = [values for _, values in replicates]
+    labels = [f"{compound}\n(n={len(values)})" for compound, values in replicates]
+    
+    # Создаем boxplot
+    bp = ax.boxplot(plot_data, labels=labels, patch_artist=True, showmeans=True)
+    
+    # Настраиваем цвета
+    colors = plt.cm.Paired(np.linspace(0, 1, len(plot_data)))
+    for patch, color in zip(bp['boxes'], colors):
+        patch.set_facecolor(color)
+        patch.set_alpha(0.7)
+    
+    ax.set_xlabel('Соединения', fontsize=12)
+    ax.set_ylabel('Оптическая плотность (OD, 24 ч)', fontsize=12)
+    ax.set_title('Сравнение реплик по соединениям', fontsize=14, fontweight='bold')
+    ax.grid(True, alpha=0.3, axis='y')
+    ax.set_axisbelow(True)
+    
+    # Поворачиваем подписи если их много
+    if len(labels) > 4:
+        ax.set_xticklabels(ax.get_xticklabels(), rotation=45, ha='right')
+    
+    fig.tight_layout()
+    return fig
+
+def render_figure(builder, figsize, args, dpi=PLOT_DPI):
+    """Строит фигуру builder(figsize, *args) и рисует ее вне экрана (Agg).
+
+    Возвращает (PNG, фигура в pickle - для сохранения и интерактивного окна) или None,
+    если данных для графика нет. Функция верхнего уровня - для пула процессов.
+    """
+    fig = builder(figsize, *args)
+    if fig is None:
+        return None
+    return figure_bytes(fig, dpi)
+
+def figure_bytes(fig, dpi=PLOT_DPI):
+    """(PNG, фигура в pickle) уже построенной фигуры - в формате render_figure и FigureCache"""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=dpi)
+    return buffer.getvalue(), pickle.dumps(fig)
+
+def render_figures(tasks, executor=None, dpi=PLOT_DPI):
+    """Отрисовка нескольких фигур: tasks - {ключ: (builder, figsize, args)}.
+
+    Выдает (ключ, результат render_figure, ошибка или None) по мере готовности. С executor
+    фигуры строятся параллельно в пуле процессов, иначе - по очереди в этом потоке.
+    Если перебор прервать, еще не начатые фигуры отменяются.
+    """
+    if executor is None:
+        for key, (builder, figsize, args) in tasks.items():
+            try:
+                yield key, render_figure(builder, figsize, args, dpi), None
+            except Exception as e:
+                yield key, None, e
+        return
+    
+    futures = {executor.submit(render_figure, builder, figsize, args, dpi): key
+               for key, (builder, figsize, args) in tasks.items()}
+    try:
+        for future in as_completed(futures):
+            error = future.exception()
+            yield futures[future], None if error else future.result(), error
+    finally:
+        for future in futures:
+            future.cancel()
+
+class UIDispatcher:
+    """Очередь обновлений интерфейса из рабочих потоков.
+
+    Tk можно трогать только из главного потока. Рабочие потоки кладут вызовы в очередь,
+    главный цикл забирает их через root.after каждые poll_ms и выполняет, пока не истечет
+    budget секунд, - остаток переходит в следующий опрос, и окно не замирает.
+    """
+    
+    def __init__(self, root, poll_ms=UI_POLL_MS, budget=UI_FRAME_BUDGET, on_error=None):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.budget = budget
+        self.on_error = on_error
+        self._queue = queue.SimpleQueue()
+        self._main_thread = threading.get_ident()
+        self._job = self.root.after(self.poll_ms, self._poll)
+    
+    def post(self, func, *args, **kwargs):
+        """Вызов в главном потоке при следующем опросе (можно из любого потока)"""
+        self._queue.put((func, args, kwargs))
+    
+    def call(self, func, *args, **kwargs):
+        """В главном потоке - сразу, из рабочего - через очередь"""
+        if threading.get_ident() == self._main_thread:
+            return func(*args, **kwargs)
+        self.post(func, *args, **kwargs)
+    
+    def drain(self, budget=None):
+        """Выполняет вызовы из очереди (хотя бы один), пока не истечет budget; возвращает их число"""
+        deadline = time.perf_counter() + (self.budget if budget is None else budget)
+        done = 0
+        while True:
+            try:
+                func, args, kwargs = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                func(*args, **kwargs)
+            except Exception as e:
+                self._report(e)
+            done += 1
+            if time.perf_counter() >= deadline:
+                break
+        return done
+    
+    def close(self):
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+    
+    def _poll(self):
+        try:
+            self.drain()
+        finally:
+            self._job = self.root.after(self.poll_ms, self._poll)
+    
+    def _report(self, error):
+        try:
+            if self.on_error is not None:
+                self.on_error(error)
+                return
+        except Exception:
+            pass
+        traceback.print_exception(type(error), error, error.__traceback__)
+
+class JobCancelled(Exception):
+    """Задача отменена (см. Job.check)"""
+
+_job_context = threading.local()
+
+def current_job():
+    """Задача JobScheduler, выполняемая в этом потоке, или None"""
+    return getattr(_job_context, 'job', None)
+
+class Job:
+    """Фоновая задача JobScheduler: ключ, группа, состояние, прогресс и время выполнения"""
+    
+    def __init__(self, key, title=None, group=None):
+        self.key = key
+        self.title = title or key
+        self.group = group
+        self.state = 'queued'
+        self.progress = None
+        self.message = None
+        self.result = None
+        self.error = None
+        self.submitted = time.perf_counter()
+        self.started = None
+        self.finished = None
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+        self._notify = None
+    
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+    
+    @property
+    def active(self):
+        return self.state in ('queued', 'running')
+    
+    @property
+    def elapsed(self):
+        """Время выполнения, с (для выполняемой задачи - на текущий момент)"""
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+    
+    def cancel(self):
+        if not self._cancel.is_set() and self.active:
+            self._cancel.set()
+            self._changed()
+    
+    def check(self):
+        """JobCancelled, если задачу отменили"""
+        if self.cancelled:
+            raise JobCancelled(self.title)
+    
+    def report(self, progress=None, message=None):
+        """Прогресс (доля 0..1 или None, если объем неизвестен) и короткое сообщение"""
+        self.progress = progress
+        self.message = message
+        self._changed()
+    
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+    
+    def _changed(self):
+        if self._notify is not None:
+            self._notify(self)
+
+class JobScheduler:
+    """Ограниченный пул фоновых задач с ключами.
+
+    Повторная отправка задачи с тем же ключом отменяет прежнюю, а новая стартует только после
+    ее завершения, поэтому результаты двух загрузок не перемешиваются. after - ключи задач,
+    которые должны завершиться раньше. Отмена кооперативная: задача проверяет Job.cancelled
+    (в ее потоке - current_job()) и не публикует результаты. on_change(job) вызывается
+    из любого потока при каждом изменении задачи.
+    """
+    
+    def __init__(self, max_workers=DEFAULT_JOB_WORKERS, on_change=None, history=JOB_HISTORY):
+        self.on_change = on_change
+        self.history = deque(maxlen=history)
+        self._active = OrderedDict()
+        self._lock = threading.Lock()
+        self._queue = queue.SimpleQueue()
+        # Потоки-демоны: незавершенный запрос к БД не задерживает выход из программы
+        self._workers = [threading.Thread(target=self._worker, name=f"lab-job-{i}", daemon=True)
+                         for i in range(max_workers)]
+        for worker in self._workers:
+            worker.start()
+    
+    def submit(self, key, func, *args, title=None, group=None, after=(), **kwargs):
+        job = Job(key, title, group)
+        job._notify = self._changed
+        with self._lock:
+            stale = self._active.get(key)
+            waits = [stale] if stale is not None else []
+            waits += [self._active[other] for other in after if other != key and other in self._active]
+            self._active[key] = job
+        if stale is not None:
+            stale.cancel()
+        self._queue.put((job, waits, func, args, kwargs))
+        self._changed(job)
+        return job
+    
+    def cancel(self, key):
+        with self._lock:
+            job = self._active.get(key)
+        if job is not None:
+            job.cancel()
+        return job
+    
+    def cancel_group(self, group):
+        """Отмена всех активных задач группы; возвращает их число"""
+        jobs = [job for job in self.active() if job.group == group]
+        for job in jobs:
+            job.cancel()
+        return len(jobs)
+    
+    def cancel_all(self):
+        for job in self.active():
+            job.cancel()
+    
+    def active(self):
+        with self._lock:
+            return list(self._active.values())
+    
+    def jobs(self):
+        """Активные задачи, затем завершенные (последние - первыми)"""
+        with self._lock:
+            return list(self._active.values()) + list(self.history)
+    
+    def shutdown(self):
+        self.cancel_all()
+        for _ in self._workers:
+            self._queue.put(None)
+    
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            self._run(*item)
+    
+    def _run(self, job, waits, func, args, kwargs):
+        # Задачи из waits отправлены раньше, поэтому уже выполняются или завершены
+        for other in waits:
+            other.wait()
+        
+        if not job.cancelled:
+            job.state = 'running'
+            job.started = time.perf_counter()
+            self._changed(job)
+            _job_context.job = job
+            try:
+                job.result = func(*args, **kwargs)
+                job.state = 'cancelled' if job.cancelled else 'done'
+            except JobCancelled:
+                job.state = 'cancelled'
+            except Exception as e:
+                job.state = 'failed'
+                job.error = e
+            finally:
+                _job_context.job = None
+        else:
+            job.state = 'cancelled'
+        job.finished = time.perf_counter()
+        
+        with self._lock:
+            if self._active.get(job.key) is job:
+                del self._active[job.key]
+            self.history.appendleft(job)
+        job._done.set()
+        self._changed(job)
+    
+    def _changed(self, job):
+        if self.on_change is not None:
+            self.on_change(job)
+
+class TableModel:
+    """Данные таблицы просмотра по столбцам: сортировка и подписи только для окна строк.
+
+    Текстовые столбцы хранятся кодами, подпись форматируется один раз на значение;
+    числа форматируются только при показе. Сортировка - перестановка номеров строк.
+    """
+    
+    def __init__(self, columns=TABLE_COLUMNS):
+        self.columns = [col for col, _, _, _ in columns]
+        self.formats = {col: fmt for col, _, _, fmt in columns}
+        self.size = 0
+        self.order = None
+        self.sort_column = None
+        self.descending = False
+        self._values = {}
+        self._labels = {}
+        self._ranks = {}
+    
+    def __len__(self):
+        return self.size
+    
+    def set_data(self, data):
+        """Новые данные (DataFrame или None); сортировка по выбранному столбцу сохраняется"""
+        self._values, self._labels, self._ranks = {}, {}, {}
+        self.size = 0 if data is None else len(data)
+        for col in self.columns:
+            if data is None or col not in data.columns:
+                continue
+            values = data[col]
+            if self.formats[col] is not None:
+                self._values[col] = values.to_numpy()
+                continue
+            
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                codes, categories = values.cat.codes.to_numpy(), values.cat.categories
+            else:
+                codes, categories = pd.factorize(values)
+            names = [str(name) for name in categories]
+            # Последняя подпись - для пропуска (код -1)
+            self._values[col] = codes
+            self._labels[col] = np.array([name[:TABLE_TEXT_LIMIT] + "..." if len(name) > TABLE_TEXT_LIMIT
+                                          else name for name in names] + [""], dtype=object)
+            ranks = np.full(len(names) + 1, np.nan)
+            ranks[np.argsort(np.array(names, dtype=object), kind='stable')] = np.arange(len(names))
+            self._ranks[col] = ranks
+        
+        self.order = None
+        if self.sort_column is not None:
+            self.sort(self.sort_column, self.descending)
+    
+    def sort(self, col, descending=False):
+        """Сортировка по столбцу; равные строки сохраняют порядок загрузки, пропуски - в конце"""
+        self.sort_column, self.descending = col, descending
+        values = self._values.get(col)
+        if values is None:
+            self.order = None
+            return
+        key = self._ranks[col][values] if col in self._ranks else values.astype(np.float64)
+        self.order = np.argsort(-key if descending else key, kind='stable')
+    
+    def rows(self, start, stop):
+        """Подписи строк start..stop (в порядке сортировки) - кортежи по столбцам"""
+        stop = min(stop, self.size)
+        index = np.arange(start, stop) if self.order is None else self.order[start:stop]
+        columns = []
+        for col in self.columns:
+            values = self._values.get(col)
+            if values is None:
+                columns.append([""] * len(index))
+            elif col in self._labels:
+                columns.append(self._labels[col][values[index]])
+            else:
+                fmt = self.formats[col]
+                columns.append(["" if value != value else fmt.format(value) for value in values[index].tolist()])
+        return list(zip(*columns))
+
+class VirtualTable:
+    """Treeview, в котором строк столько, сколько помещается на экране.
+
+    Прокрутка меняет смещение окна в TableModel и перезаписывает значения видимых строк,
+    поэтому открытие, прокрутка и сортировка не зависят от числа строк в данных.
+    """
+    
+    def __init__(self, parent, columns=TABLE_COLUMNS, height=15):
+        self.columns = columns
+        self.model = TableModel(columns)
+        self.headings = {col: name for col, name, _, _ in columns}
+        self.offset = 0
+        self.visible = height
+        self.selected = None
+        
+        self.frame = ttk.Frame(parent)
+        self.tree = ttk.Treeview(self.frame, columns=self.model.columns, show="headings",
+                                 height=height, selectmode="browse")
+        for col, name, width, _ in columns:
+            self.tree.heading(col, text=name, command=lambda col=col: self.sort(col))
+            self.tree.column(col, width=width, minwidth=50)
+        
+        # Вертикальная прокрутка - по строкам модели, а не по строкам Treeview
+        self.vsb = ttk.Scrollbar(self.frame, orient="vertical", command=self.yview)
+        hsb = ttk.Scrollbar(self.frame, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(xscrollcommand=hsb.set)
+        self.status = ttk.Label(self.frame, anchor=tk.W)
+        
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.vsb.grid(row=0, column=1, sticky="ns")
+        hsb.grid(row=1, column=0, sticky="ew")
+        self.status.grid(row=2, column=0, columnspan=2, sticky="ew")
+        self.frame.grid_columnconfigure(0, weight=1)
+        self.frame.grid_rowconfigure(0, weight=1)
+        
+        self.tree.bind("<Configure>", lambda event: self._fit())
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda event: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll(3))
+        self.tree.bind("<Up>", lambda event: self._move_selection(-1))
+        self.tree.bind("<Down>", lambda event: self._move_selection(1))
+        self.tree.bind("<Prior>", lambda event: self._move_selection(-self.visible))
+        self.tree.bind("<Next>", lambda event: self._move_selection(self.visible))
+        self.tree.bind("<Home>", lambda event: self._move_selection(-self.model.size))
+        self.tree.bind("<End>", lambda event: self._move_selection(self.model.size))
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.render()
+    
+    def prepare(self, data):
+        """Модель с новыми данными и текущей сортировкой; ее можно строить в рабочем потоке"""
+        model = TableModel(self.columns)
+        model.sort_column, model.descending = self.model.sort_column, self.model.descending
+        model.set_data(data)
+        return model
+    
+    def set_model(self, model):
+        self.model = model
+        self.offset = 0
+        self.selected = None
+        self.render()
+        self._fit()
+    
+    def set_data(self, data):
+        self.set_model(self.prepare(data))
+    
+    def sort(self, col):
+        """Сортировка по щелчку на заголовке; повторный щелчок меняет направление"""
+        descending = self.model.sort_column == col and not self.model.descending
+        self.model.sort(col, descending)
+        for name, text in self.headings.items():
+            arrow = (" ▼" if descending else " ▲") if name == col else ""
+            self.tree.heading(name, text=text + arrow)
+        self.offset = 0
+        self.selected = None
+        self.render()
+    
+    def yview(self, *args):
+        """Команда полосы прокрутки: moveto <доля> или scroll <n> units|pages"""
+        if args[0] == 'moveto':
+            self.scroll_to(int(float(args[1]) * self.model.size))
+        elif args[0] == 'scroll':
+            step = self.visible if args[2] == 'pages' else 1
+            self.scroll(int(args[1]) * step)
+    
+    def scroll(self, rows):
+        self.scroll_to(self.offset + rows)
+        return "break"
+    
+    def scroll_to(self, offset):
+        offset = max(0, min(offset, self.model.size - self.visible))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+    
+    def render(self):
+        """Подписи видимого окна строк в строки Treeview и положение полосы прокрутки"""
+        rows = self.model.rows(self.offset, self.offset + self.visible)
+        items = list(self.tree.get_children())
+        for item in items[len(rows):]:
+            self.tree.delete(item)
+        del items[len(rows):]
+        for item, values in zip(items, rows):
+            self.tree.item(item, values=values)
+        for values in rows[len(items):]:
+            items.append(self.tree.insert("", tk.END, values=values))
+        
+        slot = None if self.selected is None else self.selected - self.offset
+        self.tree.selection_set([items[slot]] if slot is not None and 0 <= slot < len(items) else [])
+        
+        size = self.model.size
+        if size:
+            self.vsb.set(self.offset / size, min(1.0, (self.offset + self.visible) / size))
+            self.status.config(text=f"Строки {self.offset + 1}–{self.offset + len(rows)} из {size}")
+        else:
+            self.vsb.set(0.0, 1.0)
+            self.status.config(text="Нет данных")
+    
+    def _fit(self):
+        # Число видимых строк - по высоте виджета и высоте первой строки
+        items = self.tree.get_children()
+        bbox = self.tree.bbox(items[0]) if items else ""
+        if not bbox:
+            return
+        visible = max(1, (self.tree.winfo_height() - bbox[1]) // bbox[3])
+        if visible != self.visible:
+            self.visible = visible
+            self.offset = max(0, min(self.offset, self.model.size - visible))
+            self.render()
+    
+    def _on_wheel(self, event):
+        # Windows присылает delta кратно 120, macOS - малыми шагами
+        steps = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        return self.scroll(-3 * steps)
+    
+    def _on_select(self, event):
+        selection = self.tree.selection()
+        if selection:
+            self.selected = self.offset + self.tree.index(selection[0])
+    
+    def _move_selection(self, rows):
+        if not self.model.size:
+            return "break"
+        current = self.offset - 1 if self.selected is None else self.selected
+        self.selected = max(0, min(current + rows, self.model.size - 1))
+        if self.selected < self.offset:
+            self.offset = self.selected
+        elif self.selected >= self.offset + self.visible:
+            self.offset = self.selected - self.visible + 1
+        self.render()
+        return "break"
+
 class ModernLabAnalyzerGUI:
     def __init__(self, root):
         self.root = root
@@ -248,8 +3745,17 @@ class ModernLabAnalyzerGUI:
         
         self.analyzer = LabExperimentAnalyzer()
         self.current_experiment_id = None
+        self.batch_experiments = {}
         self.graph_windows = []
         
+        # Обновления интерфейса из рабочих потоков и накопленные строки журнала
+        self.dispatcher = UIDispatcher(root, on_error=lambda e: self.log_output(f"✗ Ошибка интерфейса: {e}", "error"))
+        self._log_lines = deque()
+        
+        # Фоновые задачи: ограниченный пул, панель задач обновляется через очередь интерфейса
+        self.jobs = JobScheduler(on_change=self._on_job_change)
+        self._jobs_tick = None
+        
         self.setup_ui()
         
     def setup_ui(self):
@@ -273,9 +3779,12 @@ class ModernLabAnalyzerGUI:
         main_container = ttk.Frame(self.root)
         main_container.pack(fill=tk.BOTH, expand=True, padx=15, pady=15)
         
-        # Панель статуса
-        self.status_bar = ttk.Label(self.root, text="Готов к работе", relief=tk.SUNKEN, anchor=tk.W)
-        self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        # Панель статуса и фоновых задач
+        bottom_frame = ttk.Frame(self.root)
+        bottom_frame.pack(side=tk.BOTTOM, fill=tk.X)
+        self.status_bar = ttk.Label(bottom_frame, text="Готов к работе", relief=tk.SUNKEN, anchor=tk.W)
+        self.status_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.setup_jobs_panel(bottom_frame)
         
         # Создаем вкладки
         notebook = ttk.Notebook(main_container)
@@ -312,40 +3821,36 @@ class ModernLabAnalyzerGUI:
         exp_entry = ttk.Entry(exp_frame, textvariable=self.exp_id_var, width=10)
         exp_entry.pack(side=tk.LEFT, padx=5)
         
-        ttk.Button(exp_frame, text="🔄 Загрузить", command=self.load_experiment_data).pack(side=tk.LEFT, padx=5)
-        ttk.Button(exp_frame, text="📋 Список экспериментов", command=self.show_experiments_list).pack(side=tk.LEFT, padx=5)
-        
-        # Таблица данных
-        data_frame = ttk.LabelFrame(frame, text="Просмотр данных", padding="10")
-        data_frame.pack(fill=tk.BOTH, expand=True)
+        ttk.Label(exp_frame, text="Режим загрузки:").pack(side=tk.LEFT, padx=5)
+        self.load_mode_var = tk.StringVar(value="pandas")
+        ttk.Combobox(exp_frame, textvariable=self.load_mode_var, values=["pandas", "stream", "copy", "reduce"],
+                     width=8, state="readonly").pack(side=tk.LEFT, padx=5)
         
-        # Создаем Treeview с прокруткой
-        tree_frame = ttk.Frame(data_frame)
-        tree_frame.pack(fill=tk.BOTH, expand=True)
+        self.use_cache_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(exp_frame, text="Локальный кэш", variable=self.use_cache_var).pack(side=tk.LEFT, padx=5)
         
-        columns = ("expirement_name", "researcher", "compound_name", "measurements_time_hours", 
-                  "od_value", "ph_value", "temperature_celsius", "replicate_number")
-        self.tree = ttk.Treeview(tree_frame, columns=columns, show="headings", height=15)
+        ttk.Button(exp_frame, text="🔄 Загрузить", command=self.load_experiment_data).pack(side=tk.LEFT, padx=5)
+        ttk.Button(exp_frame, text="🔁 Дозагрузить новые", command=self.refresh_experiment_data).pack(side=tk.LEFT, padx=5)
+        ttk.Button(exp_frame, text="📋 Список экспериментов", command=self.show_experiments_list).pack(side=tk.LEFT, padx=5)
         
-        # Настраиваем заголовки
-        col_names = ["Эксперимент", "Исследователь", "Соединение", "Время (ч)", "OD", "pH", "Температура", "Реплика"]
-        col_widths = [200, 180, 150, 100, 100, 80, 120, 80]
+        # Пакетная загрузка нескольких экспериментов одним запросом
+        batch_frame = ttk.LabelFrame(frame, text="Пакетная загрузка", padding="10")
+        batch_frame.pack(fill=tk.X, pady=(0, 10))
         
-        for col, name, width in zip(columns, col_names, col_widths):
-            self.tree.heading(col, text=name)
-            self.tree.column(col, width=width, minwidth=50)
+        ttk.Label(batch_frame, text="ID экспериментов (например, 1-50, 60):").pack(side=tk.LEFT, padx=5)
+        self.batch_ids_var = tk.StringVar(value="1-6")
+        ttk.Entry(batch_frame, textvariable=self.batch_ids_var, width=30).pack(side=tk.LEFT, padx=5)
+        ttk.Button(batch_frame, text="📚 Загрузить пакет", command=self.load_experiments_batch).pack(side=tk.LEFT, padx=5)
+        ttk.Button(batch_frame, text="📉 Ингибирование пакета",
+                   command=self.calculate_batch_inhibition).pack(side=tk.LEFT, padx=5)
         
-        # Добавляем прокрутки
-        vsb = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
-        hsb = ttk.Scrollbar(tree_frame, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
+        # Таблица данных
+        data_frame = ttk.LabelFrame(frame, text="Просмотр данных", padding="10")
+        data_frame.pack(fill=tk.BOTH, expand=True)
         
-        # Размещаем элементы
-        self.tree.grid(row=0, column=0, sticky="nsew")
-        vsb.grid(row=0, column=1, sticky="ns")
-        hsb.grid(row=1, column=0, sticky="ew")
-        tree_frame.grid_columnconfigure(0, weight=1)
-        tree_frame.grid_rowconfigure(0, weight=1)
+        # Виртуальная таблица: в Treeview только видимые строки
+        self.data_table = VirtualTable(data_frame)
+        self.data_table.frame.pack(fill=tk.BOTH, expand=True)
         
     def setup_analysis_tab(self, parent):
         frame = ttk.Frame(parent, padding="20")
@@ -358,6 +3863,9 @@ class ModernLabAnalyzerGUI:
         analysis_buttons = [
             ("📊 Статистика по данным", self.show_statistics),
             ("📈 Рассчитать скорость роста", self.calculate_growth),
+            ("📈 µmax по кривой", self.calculate_max_growth),
+            ("🗺️ Карта окон роста", self.show_growth_windows),
+            ("🧬 Модель роста", self.fit_growth_models),
             ("📉 Рассчитать ингибирование", self.calculate_inhibition),
             ("🧹 Очистить результаты", self.clear_results)
         ]
@@ -368,6 +3876,23 @@ class ModernLabAnalyzerGUI:
             )
             button_frame.grid_columnconfigure(i, weight=1)
         
+        engine_frame = ttk.Frame(button_frame)
+        engine_frame.grid(row=1, column=0, columnspan=len(analysis_buttons), sticky="w", padx=5)
+        ttk.Label(engine_frame, text="Расчет роста:").pack(side=tk.LEFT)
+        self.growth_engine_var = tk.StringVar(value="pandas")
+        ttk.Combobox(engine_frame, textvariable=self.growth_engine_var, values=["pandas", "sql"],
+                     width=8, state="readonly").pack(side=tk.LEFT, padx=5)
+        ttk.Label(engine_frame, text="Модель:").pack(side=tk.LEFT, padx=(15, 0))
+        self.fit_model_var = tk.StringVar(value=FIT_MODELS[0])
+        ttk.Combobox(engine_frame, textvariable=self.fit_model_var, values=list(FIT_MODELS),
+                     width=10, state="readonly").pack(side=tk.LEFT, padx=5)
+        self.interpolate_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(engine_frame, text="Интерполяция пропущенных точек",
+                        variable=self.interpolate_var).pack(side=tk.LEFT, padx=(15, 0))
+        self.inhibition_ci_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(engine_frame, text="95% бутстреп-интервалы ингибирования",
+                        variable=self.inhibition_ci_var).pack(side=tk.LEFT, padx=(15, 0))
+        
         # Результаты анализа
         results_frame = ttk.LabelFrame(frame, text="Результаты анализа", padding="10")
         results_frame.pack(fill=tk.BOTH, expand=True)
@@ -465,16 +3990,128 @@ class ModernLabAnalyzerGUI:
         self.output_text.tag_config("error", foreground="red")
         self.output_text.tag_config("warning", foreground="orange")
         
+    def setup_jobs_panel(self, parent):
+        jobs_frame = ttk.Frame(parent, relief=tk.SUNKEN)
+        jobs_frame.pack(side=tk.RIGHT)
+        
+        self.jobs_label = ttk.Label(jobs_frame, text="⚙️ Задач нет", width=50, anchor=tk.W)
+        self.jobs_label.pack(side=tk.LEFT, padx=5)
+        self.jobs_progress = ttk.Progressbar(jobs_frame, length=120, mode="determinate", maximum=1.0)
+        self.jobs_progress.pack(side=tk.LEFT, padx=5)
+        ttk.Button(jobs_frame, text="✖", width=3, command=self.jobs.cancel_all).pack(side=tk.LEFT)
+        ttk.Button(jobs_frame, text="📋", width=3, command=self.show_jobs).pack(side=tk.LEFT)
+    
+    def _on_job_change(self, job):
+        # Вызывается из рабочих потоков - панель обновляется в главном
+        if job.state == 'failed':
+            self.log_output(f"✗ Задача «{job.title}» завершилась ошибкой: {job.error}", "error")
+        self.dispatcher.post(self._update_jobs_panel)
+    
+    def _update_jobs_panel(self):
+        active = self.jobs.active()
+        if not active:
+            self.jobs_label.config(text="⚙️ Задач нет")
+            self.jobs_progress.stop()
+            self.jobs_progress.config(mode="determinate", value=0)
+            return
+        
+        # Показываем первую выполняемую задачу (или первую в очереди)
+        job = next((job for job in active if job.state == 'running'), active[0])
+        text = f"⚙️ {len(active)}: {job.title}"
+        if job.message:
+            text += f" - {job.message}"
+        self.jobs_label.config(text=f"{text} ({job.elapsed:.1f} с)")
+        
+        if job.progress is None:
+            if str(self.jobs_progress.cget("mode")) != "indeterminate":
+                self.jobs_progress.config(mode="indeterminate")
+                self.jobs_progress.start(50)
+        else:
+            self.jobs_progress.stop()
+            self.jobs_progress.config(mode="determinate", value=job.progress)
+        
+        # Пока есть задачи, время на панели обновляется дважды в секунду
+        if self._jobs_tick is None:
+            self._jobs_tick = self.root.after(500, self._tick_jobs)
+    
+    def _tick_jobs(self):
+        self._jobs_tick = None
+        self._update_jobs_panel()
+    
+    def show_jobs(self):
+        window = tk.Toplevel(self.root)
+        window.title("Фоновые задачи")
+        window.geometry("650x350")
+        
+        columns = ("title", "state", "progress", "elapsed")
+        tree = ttk.Treeview(window, columns=columns, show="headings", height=12)
+        for col, name, width in zip(columns, ["Задача", "Состояние", "Прогресс", "Время, с"], [300, 110, 110, 90]):
+            tree.heading(col, text=name)
+            tree.column(col, width=width)
+        
+        def refresh():
+            tree.delete(*tree.get_children())
+            jobs_by_item.clear()
+            for job in self.jobs.jobs():
+                progress = f"{job.progress:.0%}" if job.progress is not None else (job.message or "")
+                item = tree.insert("", tk.END, values=(job.title, JOB_STATES[job.state], progress,
+                                                       f"{job.elapsed:.2f}"), tags=(job.state,))
+                jobs_by_item[item] = job
+        
+        def cancel_selected():
+            for item in tree.selection():
+                jobs_by_item[item].cancel()
+            refresh()
+        
+        jobs_by_item = {}
+        tree.tag_configure("failed", foreground="red")
+        tree.tag_configure("cancelled", foreground="gray")
+        refresh()
+        
+        buttons = ttk.Frame(window)
+        buttons.pack(side=tk.BOTTOM, fill=tk.X, pady=5)
+        ttk.Button(buttons, text="🔄 Обновить", command=refresh).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="✖ Отменить выбранные", command=cancel_selected).pack(side=tk.LEFT, padx=5)
+        tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+    
+    @staticmethod
+    def _job_cancelled():
+        # Отмененная задача не публикует результаты в интерфейс
+        job = current_job()
+        return job is not None and job.cancelled
+    
     def log_output(self, message, message_type="info"):
+        # Можно вызывать из любого потока: строки копятся и выводятся в главном потоке
         timestamp = datetime.now().strftime("%H:%M:%S")
-        formatted_message = f"[{timestamp}] {message}\n"
+        self._log_lines.append((f"[{timestamp}] {message}\n", message_type, message))
+        self.dispatcher.call(self._flush_log)
+    
+    def _flush_log(self):
+        # Все накопленные строки - одной вставкой и одной прокруткой журнала
+        chunks, status = [], None
+        while self._log_lines:
+            formatted_message, message_type, message = self._log_lines.popleft()
+            chunks += [formatted_message, message_type]
+            # Статус бар - последнее короткое сообщение
+            if len(message) < 100:
+                status = message
+        if not chunks:
+            return
         
-        self.output_text.insert(tk.END, formatted_message, message_type)
+        self.output_text.insert(tk.END, *chunks)
         self.output_text.see(tk.END)
-        
-        # Обновляем статус бар (только для коротких сообщений)
-        if len(message) < 100:
-            self.status_bar.config(text=message)
+        if status is not None:
+            self.status_bar.config(text=status)
+    
+    def _show_analysis(self, report):
+        """Текст результата (список строк) в поле анализа - из любого потока"""
+        if self._job_cancelled():
+            return
+        self.dispatcher.call(self._set_analysis_text, "".join(report))
+    
+    def _set_analysis_text(self, text):
+        self.analysis_text.delete(1.0, tk.END)
+        self.analysis_text.insert(1.0, text)
     
     def connect_db(self):
         try:
@@ -493,7 +4130,7 @@ class ModernLabAnalyzerGUI:
             self.log_output(f"✗ Ошибка подключения: {e}", "error")
     
     def show_experiments_list(self):
-        if self.analyzer.conn is None:
+        if self.analyzer.pool is None:
             messagebox.showwarning("Ошибка", "Сначала подключитесь к БД")
             return
         
@@ -540,39 +4177,38 @@ class ModernLabAnalyzerGUI:
             self.log_output(f"✗ Ошибка получения списка экспериментов: {e}", "error")
     
     def load_experiment_data(self):
-        if self.analyzer.conn is None:
+        if self.analyzer.pool is None:
             messagebox.showwarning("Ошибка", "Сначала подключитесь к БД")
             return
         
         try:
             experiment_id = int(self.exp_id_var.get())
             self.current_experiment_id = experiment_id
+            mode = self.load_mode_var.get()
+            
+            if self.use_cache_var.get():
+                if self.analyzer.cache is None:
+                    self.analyzer.enable_cache()
+            else:
+                self.analyzer.disable_cache()
+            
+            def report_progress(rows, rows_per_sec):
+                current_job().report(message=f"{rows} строк")
+                self.log_output(f"⏳ Загружено {rows} строк ({rows_per_sec:.0f} строк/с)", "info")
             
             def load_data():
                 self.log_output(f"⏳ Загрузка данных эксперимента ID={experiment_id}...", "info")
                 
-                data = self.analyzer.load_experiment_data(experiment_id)
+                data = self.analyzer.load_experiment_data(experiment_id, mode=mode,
+                                                          progress_callback=report_progress)
+                if self._job_cancelled():
+                    return
                 
                 if data is None or data.empty:
                     self.log_output(f"⚠️ Нет данных для эксперимента ID={experiment_id}", "warning")
                     return
                 
-                # Очищаем таблицу
-                for row in self.tree.get_children():
-                    self.tree.delete(row)
-                
-                # Заполняем таблицу
-                for _, row in data.iterrows():
-                    self.tree.insert("", tk.END, values=(
-                        row['expirement_name'][:50] + "..." if len(row['expirement_name']) > 50 else row['expirement_name'],
-                        row['researcher'],
-                        row['compound_name'],
-                        f"{row['measurements_time_hours']:.1f}",
-                        f"{row['od_value']:.4f}",
-                        f"{row['ph_value']:.2f}",
-                        f"{row['temperature_celsius']:.2f}",
-                        row['replicate_number']
-                    ))
+                self._fill_table(data)
                 
                 # Получаем информацию об эксперименте
                 info = self.analyzer.get_experiment_info(experiment_id)
@@ -583,13 +4219,109 @@ class ModernLabAnalyzerGUI:
                 else:
                     self.log_output(f"✓ Загружено {len(data)} измерений", "success")
             
-            threading.Thread(target=load_data, daemon=True).start()
+            # Новая загрузка заменяет прежнюю и отменяет анализы и графики загруженного эксперимента
+            self.jobs.cancel_group(EXPERIMENT_JOBS)
+            self.jobs.submit('load', load_data, title=f"Загрузка эксперимента ID={experiment_id}")
             
         except ValueError:
             self.log_output("✗ ID эксперимента должен быть числом", "error")
         except Exception as e:
             self.log_output(f"✗ Ошибка загрузки: {e}", "error")
     
+    def load_experiments_batch(self):
+        if self.analyzer.pool is None:
+            messagebox.showwarning("Ошибка", "Сначала подключитесь к БД")
+            return
+        
+        try:
+            experiment_ids = parse_experiment_ids(self.batch_ids_var.get())
+            if not experiment_ids:
+                self.log_output("✗ Укажите хотя бы один ID эксперимента", "error")
+                return
+            mode = self.load_mode_var.get()
+            
+            def load_batch():
+                self.log_output(f"⏳ Пакетная загрузка {len(experiment_ids)} экспериментов...", "info")
+                experiments = self.analyzer.load_experiments(experiment_ids, mode=mode)
+                if self._job_cancelled():
+                    return
+                
+                if experiments is None:
+                    self.log_output("✗ Не удалось загрузить эксперименты", "error")
+                    return
+                
+                self.batch_experiments = experiments
+                loaded = {experiment_id: len(data) for experiment_id, data in experiments.items() if len(data)}
+                self.log_output(f"✓ Загружено {len(loaded)} экспериментов, "
+                                f"{sum(loaded.values())} измерений", "success")
+                for experiment_id, rows in loaded.items():
+                    self.log_output(f"   ID={experiment_id}: {rows} измерений", "info")
+            
+            self.jobs.submit('batch', load_batch, title=f"Пакетная загрузка ({len(experiment_ids)} экспериментов)")
+            
+        except ValueError:
+            self.log_output("✗ Список ID должен состоять из чисел и диапазонов", "error")
+    
+    def calculate_batch_inhibition(self):
+        if not self.batch_experiments:
+            messagebox.showwarning("Ошибка", "Сначала загрузите пакет экспериментов")
+            return
+        
+        experiments = self.batch_experiments
+        
+        def calc():
+            self.log_output(f"⏳ Расчет ингибирования для {len(experiments)} экспериментов...", "info")
+            results = self.analyzer.calculate_batch_inhibition(experiments)
+            
+            if results is None or results.empty:
+                self.log_output("✗ Не удалось рассчитать ингибирование", "error")
+                return
+            
+            formatted = results.copy()
+            formatted['inhibition_percent'] = formatted['inhibition_percent'].apply(
+                lambda x: f"{x:.2f}%" if pd.notnull(x) else "N/A"
+            )
+            formatted['growth_rate'] = formatted['growth_rate'].apply(lambda x: f"{x:.6f}")
+            
+            report = []
+            report.append("📉 ИНГИБИРОВАНИЕ ПО ПАКЕТУ ЭКСПЕРИМЕНТОВ\n")
+            report.append("="*60 + "\n\n")
+            report.append(formatted.to_string(index=False))
+            self._show_analysis(report)
+            self.log_output(f"✓ Ингибирование рассчитано для {len(results)} образцов", "success")
+        
+        self.jobs.submit('batch-inhibition', calc, title="Ингибирование пакета", after=('batch',))
+    
+    def _fill_table(self, data):
+        # Модель таблицы готовится в вызывающем (рабочем) потоке, в главном - только видимые строки
+        if self._job_cancelled():
+            return
+        self.dispatcher.call(self.data_table.set_model, self.data_table.prepare(data))
+    
+    def refresh_experiment_data(self):
+        if self.analyzer.data is None:
+            messagebox.showwarning("Ошибка", "Сначала загрузите данные")
+            return
+        
+        mode = self.load_mode_var.get()
+        
+        def refresh():
+            self.log_output("⏳ Проверка новых измерений...", "info")
+            new_rows = self.analyzer.refresh_experiment_data(mode)
+            
+            if new_rows is None:
+                self.log_output("✗ Не удалось обновить данные", "error")
+            elif new_rows.empty:
+                self.log_output("✓ Новых измерений нет", "info")
+            else:
+                self._fill_table(self.analyzer.data)
+                if self._job_cancelled():
+                    return
+                self.log_output(f"✓ Добавлено {len(new_rows)} новых измерений", "success")
+        
+        self.jobs.submit('refresh', refresh, title="Дозагрузка новых измерений",
+                         group=EXPERIMENT_JOBS, after=('load',))
+    
     def show_statistics(self):
         if self.analyzer.data is None:
             messagebox.showwarning("Ошибка", "Сначала загрузите данные")
@@ -617,6 +4349,15 @@ class ModernLabAnalyzerGUI:
                             self.analysis_text.insert(tk.END, f"  {key}: {value}\n")
                 self.analysis_text.insert(tk.END, "\n")
             
+            # Статистика по соединениям накоплена при загрузке вместе с общей
+            if self.analyzer.statistics is not None:
+                self.analysis_text.insert(tk.END, "OD по соединениям:\n")
+                self.analysis_text.insert(tk.END, "-"*30 + "\n")
+                for compound, od in self.analyzer.statistics.compound_summary('od_value').items():
+                    self.analysis_text.insert(
+                        tk.END, f"  {compound}: {od['mean']:.4f} ± {od['std']:.4f} "
+                                f"(медиана ≈ {od['50%']:.4f}, n={int(od['count'])})\n")
+            
             self.log_output("✓ Статистика рассчитана", "success")
             
         except Exception as e:
@@ -627,48 +4368,173 @@ class ModernLabAnalyzerGUI:
             messagebox.showwarning("Ошибка", "Сначала загрузите данные")
             return
         
+        self.analyzer.growth_engine = self.growth_engine_var.get()
         try:
             def calc():
                 self.log_output("⏳ Расчет скорости роста...", "info")
                 growth = self.analyzer.calculate_growth_rate()
                 
                 if growth is not None and not growth.empty:
-                    self.analysis_text.delete(1.0, tk.END)
-                    self.analysis_text.insert(1.0, "📈 РЕЗУЛЬТАТЫ РАСЧЕТА СКОРОСТИ РОСТА\n")
-                    self.analysis_text.insert(tk.END, "="*60 + "\n\n")
-                    self.analysis_text.insert(tk.END, growth.to_string(index=False))
+                    report = []
+                    report.append("📈 РЕЗУЛЬТАТЫ РАСЧЕТА СКОРОСТИ РОСТА\n")
+                    report.append("="*60 + "\n\n")
+                    report.append(growth.to_string(index=False))
                     
                     # Добавляем сводку
-                    self.analysis_text.insert(tk.END, "\n\n📊 СВОДКА:\n")
-                    self.analysis_text.insert(tk.END, "-"*30 + "\n")
+                    report.append("\n\n📊 СВОДКА:\n")
+                    report.append("-"*30 + "\n")
                     for compound in growth['compound'].unique():
                         compound_data = growth[growth['compound'] == compound]
                         mean_growth = compound_data['growth_rate'].mean()
-                        self.analysis_text.insert(tk.END, f"{compound}: µ = {mean_growth:.6f} (n={len(compound_data)})\n")
+                        report.append(f"{compound}: µ = {mean_growth:.6f} (n={len(compound_data)})\n")
                     
+                    self._show_analysis(report)
                     self.log_output("✓ Скорость роста рассчитана", "success")
                 else:
                     self.log_output("⚠️ Не удалось рассчитать скорость роста", "warning")
             
-            threading.Thread(target=calc, daemon=True).start()
+            self.jobs.submit('growth', calc, title="Скорость роста", group=EXPERIMENT_JOBS, after=('load',))
             
         except Exception as e:
             self.log_output(f"✗ Ошибка: {e}", "error")
     
+    def calculate_max_growth(self):
+        if self.analyzer.data is None:
+            messagebox.showwarning("Ошибка", "Сначала загрузите данные")
+            return
+        
+        def calc():
+            self.log_output("⏳ Расчет µmax по скользящему окну...", "info")
+            results = self.analyzer.calculate_max_growth_rate()
+            
+            if results is None or results.empty:
+                self.log_output("⚠️ Не удалось рассчитать µmax", "warning")
+                return
+            
+            report = []
+            report.append("📈 МАКСИМАЛЬНАЯ УДЕЛЬНАЯ СКОРОСТЬ РОСТА (µmax)\n")
+            report.append("="*60 + "\n\n")
+            report.append(results.to_string(index=False))
+            
+            report.append("\n\n📊 СВОДКА:\n")
+            report.append("-"*30 + "\n")
+            summary = results.groupby('compound', sort=False)['mu_max'].agg(['mean', 'count'])
+            for compound, row in summary.iterrows():
+                report.append(f"{compound}: µmax = {row['mean']:.6f} (n={int(row['count'])})\n")
+            
+            self._show_analysis(report)
+            self.log_output("✓ µmax рассчитана", "success")
+        
+        self.jobs.submit('mumax', calc, title="µmax по скользящему окну", group=EXPERIMENT_JOBS, after=('load',))
+    
+    def show_growth_windows(self):
+        if self.analyzer.data is None:
+            messagebox.showwarning("Ошибка", "Сначала загрузите данные")
+            return
+        
+        interpolate = self.interpolate_var.get()
+        figsize = self._figsize()
+        
+        def calc():
+            self.log_output("⏳ Расчет скорости роста для всех окон...", "info")
+            matrix = self.analyzer.calculate_growth_matrix(interpolate=interpolate)
+            if matrix is None:
+                self.log_output("⚠️ Не удалось рассчитать матрицу окон", "warning")
+                return
+            
+            pairs, grid, rates = matrix
+            compounds, means = compound_window_means(pairs, rates)
+            
+            report = []
+            report.append("🗺️ СКОРОСТЬ РОСТА ПО ОКНАМ (START, END)\n")
+            report.append("="*60 + "\n\n")
+            report.append(f"Точек времени: {len(grid)}, окон: {len(grid) * (len(grid) - 1) // 2}\n\n")
+            report.append("📊 ОКНО С НАИБОЛЬШЕЙ СРЕДНЕЙ µ:\n")
+            report.append("-"*30 + "\n")
+            for compound, mean in zip(compounds, means):
+                if np.isnan(mean).all():
+                    report.append(f"{compound}: нет окон с данными\n")
+                    continue
+                start, end = np.unravel_index(np.nanargmax(mean), mean.shape)
+                report.append(f"{compound}: µ = {mean[start, end]:.6f} ({grid[start]:g}-{grid[end]:g} ч)\n")
+            
+            self._show_analysis(report)
+            self._create_growth_windows_plot(figsize, compounds, grid, means)
+            self.log_output("✓ Карта окон роста построена", "success")
+        
+        self.jobs.submit('growth-windows', calc, title="Карта окон роста", group=EXPERIMENT_JOBS, after=('load',))
+    
+    def _create_growth_windows_plot(self, figsize, compounds, grid, means, max_panels=9):
+        try:
+            if len(compounds) > max_panels:
+                self.log_output(f"⚠️ На карте показаны первые {max_panels} из {len(compounds)} соединений", "warning")
+            shown = compounds[:max_panels]
+            columns = min(3, len(shown))
+            rows = -(-len(shown) // columns)
+            
+            fig = Figure(figsize=figsize)
+            labels = [f"{t:g}" for t in grid]
+            for i, compound in enumerate(shown):
+                ax = fig.add_subplot(rows, columns, i + 1)
+                image = ax.imshow(means[i], origin='lower', cmap='viridis', aspect='auto')
+                ax.set_title(compound, fontsize=10)
+                ticks = np.arange(0, len(grid), max(1, len(grid) // 6))
+                ax.set_xticks(ticks)
+                ax.set_xticklabels([labels[t] for t in ticks], fontsize=8)
+                ax.set_yticks(ticks)
+                ax.set_yticklabels([labels[t] for t in ticks], fontsize=8)
+                ax.set_xlabel('Конец окна, ч', fontsize=9)
+                ax.set_ylabel('Начало окна, ч', fontsize=9)
+                fig.colorbar(image, ax=ax, label='µ, 1/ч')
+            
+            fig.suptitle('Скорость роста по окнам расчета', fontsize=14, fontweight='bold')
+            fig.tight_layout()
+            self._show_plot_window(fig, "Карта окон роста")
+            
+        except Exception as e:
+            self.log_output(f"✗ Ошибка построения графика: {e}", "error")
+    
+    def fit_growth_models(self):
+        if self.analyzer.data is None:
+            messagebox.showwarning("Ошибка", "Сначала загрузите данные")
+            return
+        
+        model = self.fit_model_var.get()
+        
+        def calc():
+            self.log_output(f"⏳ Подгонка модели {model}...", "info")
+            results = self.analyzer.fit_growth_curves(model)
+            
+            if results is None or results.empty:
+                self.log_output("⚠️ Не удалось подогнать модель роста", "warning")
+                return
+            
+            columns = ['compound', 'replicate', 'mu_max', 'lag_time', 'carrying_capacity', 'r_squared', 'converged']
+            report = []
+            report.append(f"🧬 ПАРАМЕТРЫ МОДЕЛИ РОСТА ({model})\n")
+            report.append("="*60 + "\n\n")
+            report.append(results[columns].to_string(index=False))
+            self._show_analysis(report)
+            self.log_output(f"✓ Модель {model} подогнана", "success")
+        
+        self.jobs.submit('fit', calc, title=f"Подгонка модели {model}", group=EXPERIMENT_JOBS, after=('load',))
+    
     def calculate_inhibition(self):
         if self.analyzer.data is None:
             messagebox.showwarning("Ошибка", "Сначала загрузите данные эксперимента")
             return
         
+        self.analyzer.growth_engine = self.growth_engine_var.get()
+        with_ci = self.inhibition_ci_var.get()
         try:
             def calc():
                 self.log_output("⏳ Расчет ингибирования роста...", "info")
                 inhibition = self.analyzer.calculate_inhibition()
                 
                 if inhibition is not None and not inhibition.empty:
-                    self.analysis_text.delete(1.0, tk.END)
-                    self.analysis_text.insert(1.0, "📉 РЕЗУЛЬТАТЫ РАСЧЕТА ИНГИБИРОВАНИЯ\n")
-                    self.analysis_text.insert(tk.END, "="*60 + "\n\n")
+                    report = []
+                    report.append("📉 РЕЗУЛЬТАТЫ РАСЧЕТА ИНГИБИРОВАНИЯ\n")
+                    report.append("="*60 + "\n\n")
                     
                     # Форматируем вывод
                     formatted = inhibition.copy()
@@ -683,14 +4549,14 @@ class ModernLabAnalyzerGUI:
                             lambda x: f"{x:.6f}" if pd.notnull(x) else "N/A"
                         )
                     
-                    self.analysis_text.insert(tk.END, formatted.to_string(index=False))
+                    report.append(formatted.to_string(index=False))
                     
                     # Добавляем сводку по соединениям
-                    self.analysis_text.insert(tk.END, "\n\n📊 СВОДКА ПО СОЕДИНЕНИЯМ:\n")
-                    self.analysis_text.insert(tk.END, "-"*40 + "\n")
+                    report.append("\n\n📊 СВОДКА ПО СОЕДИНЕНИЯМ:\n")
+                    report.append("-"*40 + "\n")
                     
                     for compound in formatted['compound'].unique():
-                        if 'Контроль' not in str(compound):
+                        if CONTROL_MARKER not in str(compound):
                             compound_data = formatted[formatted['compound'] == compound]
                             inhibition_values = compound_data[compound_data['inhibition_percent'] != 'N/A']['inhibition_percent']
                             if not inhibition_values.empty:
@@ -699,14 +4565,26 @@ class ModernLabAnalyzerGUI:
                                 if values:
                                     mean_inhibition = np.mean(values)
                                     std_inhibition = np.std(values)
-                                    self.analysis_text.insert(tk.END, 
+                                    report.append(
                                         f"{compound}: {mean_inhibition:.1f}% ± {std_inhibition:.1f}% (n={len(values)})\n")
                     
+                    # Бутстреп-интервалы по репликам контроля и соединения - только по запросу
+                    intervals = self.analyzer.calculate_inhibition_ci() if with_ci else None
+                    if intervals is not None and not intervals.empty:
+                        report.append("\n📏 95% БУТСТРЕП-ИНТЕРВАЛЫ:\n")
+                        report.append("-"*40 + "\n")
+                        for row in intervals.itertuples(index=False):
+                            report.append(
+                                f"{row.compound}: {row.inhibition_percent:.1f}% "
+                                f"[{row.ci_low:.1f}%; {row.ci_high:.1f}%] (n={row.replicates})\n")
+                    
+                    self._show_analysis(report)
                     self.log_output("✓ Ингибирование рассчитано", "success")
                 else:
                     self.log_output("⚠️ Не удалось рассчитать ингибирование", "warning")
             
-            threading.Thread(target=calc, daemon=True).start()
+            self.jobs.submit('inhibition', calc, title="Ингибирование роста",
+                             group=EXPERIMENT_JOBS, after=('load',))
             
         except Exception as e:
             self.log_output(f"✗ Ошибка: {e}", "error")
@@ -732,299 +4610,219 @@ class ModernLabAnalyzerGUI:
             except Exception as e:
                 self.log_output(f"✗ Ошибка сохранения: {e}", "error")
     
-    def plot_growth(self):
+    def _plot_specs(self):
+        """Графики набора «Все графики»: {ключ: (заголовок, построитель, подготовка данных, нет данных)}.
+
+        Подготовка берет данные анализатора (в потоке задачи), построитель - функция верхнего
+        уровня, которую можно выполнить в другом процессе.
+        """
+        return {
+            'growth': ("Кривые роста", build_growth_figure,
+                       lambda: (self.analyzer.growth_curves(),), "Нет данных для кривых роста"),
+            'inhibition': ("Ингибирование роста", build_inhibition_figure,
+                           lambda: (self.analyzer.growth_results, self.analyzer.inhibition_ci),
+                           "Нет данных для графика ингибирования"),
+            'temp': ("Влияние температуры", build_condition_figure,
+                     lambda: (self.analyzer.condition_curves('temperature_celsius'), 'temperature_celsius'),
+                     "Нет данных для 24 часов"),
+            'ph': ("Влияние pH", build_condition_figure,
+                   lambda: (self.analyzer.condition_curves('ph_value'), 'ph_value'), "Нет данных для 24 часов"),
+            'replicates': ("Сравнение реплик", build_replicates_figure,
+                           lambda: (self.analyzer.replicate_values(),), "Нет данных для 24 часов")
+        }
+    
+    def _plot(self, key, after=('load',)):
+        """Один график в интерактивном окне; фигура строится фоновой задачей"""
         if self.analyzer.data is None:
             messagebox.showwarning("Ошибка", "Сначала загрузите данные")
             return
-        
-        threading.Thread(target=self._create_growth_plot, daemon=True).start()
+        title = self._plot_specs()[key][0]
+        self._run_plot(f"plot-{key}", f"График «{title}»", lambda figsize: self._create_plot(figsize, key), after=after)
     
-    def _create_growth_plot(self):
-        try:
-            # Получаем размер графика
-            width, height = map(int, self.figsize_var.get().split('x'))
-            
-            fig = Figure(figsize=(width, height))
-            ax = fig.add_subplot(111)
-            
-            data = self.analyzer.data
-            compounds = data['compound_name'].unique()
-            
-            # Используем цветовую палитру
-            colors = plt.cm.tab10(np.linspace(0, 1, len(compounds)))
-            
-            for compound, color in zip(compounds, colors):
-                compound_data = data[data['compound_name'] == compound]
-                
-                # Группируем по времени и рассчитываем среднее и стандартное отклонение
-                grouped = compound_data.groupby('measurements_time_hours')['od_value']
-                mean_curve = grouped.mean()
-                std_curve = grouped.std()
-                
-                # Рисуем кривую со стандартным отклонением
-                ax.plot(mean_curve.index, mean_curve.values, 
-                       label=compound, color=color, linewidth=2, marker='o', markersize=6)
-                
-                # Заливка для стандартного отклонения
-                ax.fill_between(mean_curve.index,
-                              mean_curve.values - std_curve.values,
-                              mean_curve.values + std_curve.values,
-                              color=color, alpha=0.2)
-            
-            ax.set_xlabel('Время, часы', fontsize=12)
-            ax.set_ylabel('Оптическая плотность (OD)', fontsize=12)
-            ax.set_title('Кинетика роста микроорганизмов', fontsize=14, fontweight='bold')
-            ax.legend(loc='best', fontsize=10)
-            ax.grid(True, alpha=0.3, linestyle='--')
-            ax.set_axisbelow(True)
-            
-            fig.tight_layout()
-            self._show_plot_window(fig, "Кривые роста")
-            
-        except Exception as e:
-            self.log_output(f"✗ Ошибка построения графика: {e}", "error")
+    def _figure_key(self, key, figsize):
+        """Ключ графика в кэше; ингибирование зависит еще от окна роста и наличия интервалов"""
+        params = ()
+        if key == 'inhibition':
+            params = (self.analyzer.growth_window, self.analyzer.inhibition_ci is not None)
+        return self.analyzer.figure_key(key, figsize, params)
     
-    def plot_inhibition(self):
-        if self.analyzer.growth_results is None or self.analyzer.growth_results.empty:
-            self.calculate_inhibition()
-        
-        if self.analyzer.growth_results is None or self.analyzer.growth_results.empty:
-            self.log_output("⚠️ Нет данных для графика ингибирования", "warning")
-            return
-        
-        threading.Thread(target=self._create_inhibition_plot, daemon=True).start()
+    def _cached_figure(self, cache_key):
+        """(PNG, фигура в pickle или None) из кэша графиков или None.
+
+        Фигура хранится только в памяти, поэтому после перезапуска с диска приходит один PNG.
+        """
+        if cache_key is None:
+            return None
+        png = self.analyzer.figure_cache.get(cache_key + ('png',))
+        if png is None:
+            return None
+        return png, self.analyzer.figure_cache.get(cache_key + ('figure',))
     
-    def _create_inhibition_plot(self):
-        try:
-            width, height = map(int, self.figsize_var.get().split('x'))
-            
-            fig = Figure(figsize=(width, height))
-            ax = fig.add_subplot(111)
-            
-            data = self.analyzer.growth_results
-            
-            # Фильтруем контроль и удаляем NaN
-            control_mask = data['compound'].str.contains('Контроль', case=False, na=False)
-            plot_data = data[~control_mask].dropna(subset=['inhibition_percent'])
-            
-            if plot_data.empty:
-                self.log_output("⚠️ Нет данных для графика ингибирования", "warning")
-                return
-            
-            # Группируем по соединениям
-            grouped = plot_data.groupby('compound')['inhibition_percent']
-            compounds = list(grouped.groups.keys())
-            means = grouped.mean().values
-            stds = grouped.std().values
-            
-            # Создаем столбчатую диаграмму с помощью seaborn для лучшего отображения
-            fig.clf()
-            ax = fig.add_subplot(111)
-            
-            # Используем seaborn для построения графика
-            sns.barplot(data=plot_data, x='compound', y='inhibition_percent', 
-                       ax=ax, palette='viridis', ci='sd', capsize=0.1)
-            
-            # Добавляем значения на столбцы
-            for i, (mean, std) in enumerate(zip(means, stds)):
-                ax.text(i, mean + 3, f'{mean:.1f}%', ha='center', fontweight='bold', fontsize=10)
-            
-            ax.set_xticklabels(ax.get_xticklabels(), rotation=45, ha='right')
-            ax.set_ylabel('% Ингибирования роста', fontsize=12)
-            ax.set_title('Эффективность соединений', fontsize=14, fontweight='bold')
-            ax.set_ylim(0, 105)
-            ax.grid(True, alpha=0.3, axis='y')
-            
-            # Линия 50% ингибирования
-            ax.axhline(y=50, color='red', linestyle='--', alpha=0.5, linewidth=1.5)
-            ax.text(0.02, 0.98, '50% ингибирование', transform=ax.transAxes, 
-                   color='red', fontsize=10, verticalalignment='top')
-            
-            fig.tight_layout()
-            self._show_plot_window(fig, "Ингибирование роста")
-            
-        except Exception as e:
-            self.log_output(f"✗ Ошибка построения графика: {e}", "error")
+    def _rebuild_figure(self, key, cache_key):
+        """Фигура графика заново, если в кэше осталось только изображение; None, если данные уже другие"""
+        figsize = cache_key[3]
+        if self._figure_key(key, figsize) != cache_key:
+            self.log_output("⚠️ Данные изменились после построения графика - постройте его заново", "warning")
+            return None
+        _, builder, prepare, _ = self._plot_specs()[key]
+        return builder(figsize, *prepare())
     
-    def plot_temp(self):
-        if self.analyzer.data is None:
-            messagebox.showwarning("Ошибка", "Сначала загрузите данные")
-            return
-        threading.Thread(target=self._create_temp_plot, daemon=True).start()
+    def _store_figure(self, cache_key, rendered):
+        if cache_key is not None:
+            png, pickled = rendered
+            self.analyzer.figure_cache.put(cache_key + ('png',), png)
+            self.analyzer.figure_cache.put(cache_key + ('figure',), pickled)
     
-    def _create_temp_plot(self):
+    def _create_plot(self, figsize, key, interactive=False):
+        title, builder, prepare, empty = self._plot_specs()[key]
         try:
-            width, height = map(int, self.figsize_var.get().split('x'))
-            
-            fig = Figure(figsize=(width, height))
-            ax = fig.add_subplot(111)
-            
-            data_24h = self.analyzer.data[self.analyzer.data['measurements_time_hours'] == 24]
-            if len(data_24h) == 0:
-                self.log_output("⚠️ Нет данных для 24 часов", "warning")
+            # Ключ берется до подготовки данных: после дозагрузки запись старой версии не найдется
+            cache_key = self._figure_key(key, figsize)
+            cached = self._cached_figure(cache_key)
+            if cached is not None and not interactive:
+                # Повторный просмотр - готовое изображение, без пересчета данных и отрисовки
+                self.log_output(f"⚡ График «{title}» взят из кэша", "info")
+                if not self._job_cancelled():
+                    self.dispatcher.post(self._open_image_window, title, *cached, cache_key, key)
+                return
+            if cached is not None and cached[1] is not None:
+                self._show_plot_window(pickle.loads(cached[1]), title, cache_key)
                 return
             
-            compounds = data_24h['compound_name'].unique()
-            colors = plt.cm.Set2(np.linspace(0, 1, len(compounds)))
-            
-            for compound, color in zip(compounds, colors):
-                compound_data = data_24h[data_24h['compound_name'] == compound]
-                
-                # Группируем по температуре
-                grouped = compound_data.groupby('temperature_celsius')['od_value']
-                mean_od = grouped.mean()
-                std_od = grouped.std()
-                
-                # Сортируем по температуре
-                mean_od = mean_od.sort_index()
-                std_od = std_od.sort_index()
-                
-                ax.plot(mean_od.index, mean_od.values, label=compound, 
-                       color=color, marker='o', linewidth=2, markersize=8)
-                
-                # Отображаем стандартное отклонение
-                ax.fill_between(mean_od.index,
-                              mean_od.values - std_od.values,
-                              mean_od.values + std_od.values,
-                              color=color, alpha=0.2)
-            
-            ax.set_xlabel('Температура, °C', fontsize=12)
-            ax.set_ylabel('Оптическая плотность (OD)', fontsize=12)
-            ax.set_title('Влияние температуры на рост микроорганизмов (24 ч)', 
-                        fontsize=14, fontweight='bold')
-            ax.legend(loc='best', fontsize=10)
-            ax.grid(True, alpha=0.3, linestyle='--')
-            ax.set_axisbelow(True)
-            
-            fig.tight_layout()
-            self._show_plot_window(fig, "Влияние температуры")
+            fig = builder(figsize, *prepare())
+            if fig is None:
+                self.log_output(f"⚠️ {empty}", "warning")
+                return
+            # Растр и pickle снимаются до показа: фигуру, открытую в окне, рисует главный поток
+            self._store_figure(cache_key, figure_bytes(fig))
+            self._show_plot_window(fig, title, cache_key)
             
         except Exception as e:
             self.log_output(f"✗ Ошибка построения графика: {e}", "error")
     
-    def plot_ph(self):
+    def plot_growth(self):
+        self._plot('growth')
+    
+    def plot_inhibition(self):
         if self.analyzer.data is None:
             messagebox.showwarning("Ошибка", "Сначала загрузите данные")
             return
-        threading.Thread(target=self._create_ph_plot, daemon=True).start()
+        if self.analyzer.growth_results is None or self.analyzer.growth_results.empty:
+            self.calculate_inhibition()
+        
+        # График строится после расчета ингибирования, если он запущен
+        self._plot('inhibition', after=('load', 'inhibition'))
     
-    def _create_ph_plot(self):
-        try:
-            width, height = map(int, self.figsize_var.get().split('x'))
-            
-            fig = Figure(figsize=(width, height))
-            ax = fig.add_subplot(111)
-            
-            data_24h = self.analyzer.data[self.analyzer.data['measurements_time_hours'] == 24]
-            if len(data_24h) == 0:
-                self.log_output("⚠️ Нет данных для 24 часов", "warning")
-                return
-            
-            compounds = data_24h['compound_name'].unique()
-            colors = plt.cm.Set3(np.linspace(0, 1, len(compounds)))
-            
-            for compound, color in zip(compounds, colors):
-                compound_data = data_24h[data_24h['compound_name'] == compound]
-                
-                # Группируем по pH
-                grouped = compound_data.groupby('ph_value')['od_value']
-                mean_od = grouped.mean()
-                std_od = grouped.std()
-                
-                # Сортируем по pH
-                mean_od = mean_od.sort_index()
-                std_od = std_od.sort_index()
-                
-                ax.plot(mean_od.index, mean_od.values, label=compound, 
-                       color=color, marker='s', linewidth=2, markersize=8)
-                
-                # Отображаем стандартное отклонение
-                ax.fill_between(mean_od.index,
-                              mean_od.values - std_od.values,
-                              mean_od.values + std_od.values,
-                              color=color, alpha=0.2)
-            
-            ax.set_xlabel('pH', fontsize=12)
-            ax.set_ylabel('Оптическая плотность (OD)', fontsize=12)
-            ax.set_title('Влияние pH на рост микроорганизмов (24 ч)', 
-                        fontsize=14, fontweight='bold')
-            ax.legend(loc='best', fontsize=10)
-            ax.grid(True, alpha=0.3, linestyle='--')
-            ax.set_axisbelow(True)
-            
-            fig.tight_layout()
-            self._show_plot_window(fig, "Влияние pH")
-            
-        except Exception as e:
-            self.log_output(f"✗ Ошибка построения графика: {e}", "error")
+    def plot_temp(self):
+        self._plot('temp')
+    
+    def plot_ph(self):
+        self._plot('ph')
     
     def plot_replicates(self):
+        self._plot('replicates')
+    
+    def plot_all(self):
+        """Все графики сразу: отрисовка вне экрана в пуле процессов, окна - по мере готовности"""
         if self.analyzer.data is None:
             messagebox.showwarning("Ошибка", "Сначала загрузите данные")
             return
-        threading.Thread(target=self._create_replicates_plot, daemon=True).start()
+        if self.analyzer.growth_results is None or self.analyzer.growth_results.empty:
+            self.calculate_inhibition()
+        
+        self.log_output("⏳ Построение всех графиков...", "info")
+        self.jobs.submit('plot-all', self._render_all_plots, self._figsize(), title="Все графики",
+                         group=EXPERIMENT_JOBS, after=('load', 'inhibition'))
     
-    def _create_replicates_plot(self):
+    def _render_all_plots(self, figsize):
+        job = current_job()
+        specs = self._plot_specs()
+        started = time.perf_counter()
+        
+        # Графики из кэша открываются сразу, для остальных данные готовятся здесь,
+        # а фигуры строятся и рисуются в пуле процессов
+        tasks = {}
+        cache_keys = {}
+        for key, (title, builder, prepare, empty) in specs.items():
+            try:
+                cache_keys[key] = self._figure_key(key, figsize)
+                cached = self._cached_figure(cache_keys[key])
+                if cached is not None:
+                    self.dispatcher.post(self._open_image_window, title, *cached, cache_keys[key], key)
+                    continue
+                tasks[key] = (builder, figsize, prepare())
+            except Exception as e:
+                self.log_output(f"✗ Ошибка подготовки графика «{title}»: {e}", "error")
+        if len(tasks) < len(cache_keys):
+            self.log_output(f"⚡ Из кэша графиков: {len(cache_keys) - len(tasks)}", "info")
+        
+        done = 0
+        for key, rendered, error in render_figures(tasks, self.analyzer.process_pool()):
+            job.check()
+            title, _, _, empty = specs[key]
+            done += 1
+            job.report(done / len(tasks), title)
+            if error is not None:
+                self.log_output(f"✗ Ошибка построения графика «{title}»: {error}", "error")
+            elif rendered is None:
+                self.log_output(f"⚠️ {title}: {empty.lower()}", "warning")
+            else:
+                self._store_figure(cache_keys[key], rendered)
+                self.dispatcher.post(self._open_image_window, title, *rendered, cache_keys[key], key)
+        self.log_output(f"✓ Графики построены за {time.perf_counter() - started:.2f} с", "success")
+    
+    def _open_image_window(self, title, png, pickled, cache_key=None, key=None):
+        """Окно с готовым изображением графика; фигура распаковывается только по запросу.
+
+        Если фигуры нет (изображение из дискового кэша), для сохранения и интерактивного
+        окна график key строится заново фоновой задачей.
+        """
         try:
-            width, height = map(int, self.figsize_var.get().split('x'))
-            
-            fig = Figure(figsize=(width, height))
-            ax = fig.add_subplot(111)
-            
-            data = self.analyzer.data
-            compounds = data['compound_name'].unique()
-            
-            # Фильтруем данные для 24 часов
-            data_24h = data[data['measurements_time_hours'] == 24]
-            
-            if data_24h.empty:
-                self.log_output("⚠️ Нет данных для 24 часов", "warning")
-                return
-            
-            # Подготовка данных для boxplot
-            plot_data = []
-            labels = []
-            
-            for compound in compounds:
-                compound_data = data_24h[data_24h['compound_name'] == compound]
-                if not compound_data.empty:
-                    plot_data.append(compound_data['od_value'].values)
-                    labels.append(f"{compound}\n(n={len(compound_data)})")
-            
-            # Создаем boxplot
-            bp = ax.boxplot(plot_data, labels=labels, patch_artist=True, showmeans=True)
-            
-            # Настраиваем цвета
-            colors = plt.cm.Paired(np.linspace(0, 1, len(plot_data)))
-            for patch, color in zip(bp['boxes'], colors):
-                patch.set_facecolor(color)
-                patch.set_alpha(0.7)
+            window = tk.Toplevel(self.root)
+            window.title(title)
             
-            ax.set_xlabel('Соединения', fontsize=12)
-            ax.set_ylabel('Оптическая плотность (OD, 24 ч)', fontsize=12)
-            ax.set_title('Сравнение реплик по соединениям', fontsize=14, fontweight='bold')
-            ax.grid(True, alpha=0.3, axis='y')
-            ax.set_axisbelow(True)
+            image = tk.PhotoImage(data=base64.b64encode(png).decode('ascii'))
+            label = ttk.Label(window, image=image)
+            label.image = image
+            label.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
             
-            # Поворачиваем подписи если их много
-            if len(labels) > 4:
-                ax.set_xticklabels(ax.get_xticklabels(), rotation=45, ha='right')
+            toolbar_frame = ttk.Frame(window)
+            toolbar_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+            rebuild = None
+            if pickled is None and key is not None and cache_key is not None:
+                rebuild = lambda: self._rebuild_figure(key, cache_key)
+            ttk.Button(toolbar_frame, text="💾 Сохранить график",
+                      command=lambda: self.save_figure(pickled, cache_key, rebuild)).pack(side=tk.RIGHT, padx=5)
+            ttk.Button(toolbar_frame, text="🔍 Интерактивно",
+                      command=lambda: self._open_interactive(title, pickled, cache_key, key)).pack(side=tk.RIGHT, padx=5)
             
-            fig.tight_layout()
-            self._show_plot_window(fig, "Сравнение реплик")
+            self.graph_windows.append(window)
+            self.log_output(f"✓ График '{title}' построен", "success")
             
         except Exception as e:
-            self.log_output(f"✗ Ошибка построения графика: {e}", "error")
+            self.log_output(f"✗ Ошибка отображения графика: {e}", "error")
     
-    def plot_all(self):
-        self.log_output("⏳ Построение всех графиков...", "info")
-        self.plot_growth()
-        self.plot_inhibition()
-        self.plot_temp()
-        self.plot_ph()
-        self.plot_replicates()
+    def _open_interactive(self, title, pickled, cache_key, key):
+        if pickled is not None:
+            self._open_plot_window(pickle.loads(pickled), title, cache_key)
+        elif key is not None and cache_key is not None:
+            self.jobs.submit(f"plot-{key}", self._create_plot, cache_key[3], key, True,
+                             title=f"График «{title}»", group=EXPERIMENT_JOBS, after=('load',))
+    
+    def _figsize(self):
+        return tuple(map(int, self.figsize_var.get().split('x')))
+    
+    def _run_plot(self, key, title, build, after=('load',)):
+        """Построение графика фоновой задачей; размер фигуры читается здесь, в главном потоке"""
+        self.jobs.submit(key, build, self._figsize(), title=title, group=EXPERIMENT_JOBS, after=after)
+    
+    def _show_plot_window(self, fig, title, cache_key=None):
+        # Окно создается в главном потоке; фигура уже построена в рабочем
+        if self._job_cancelled():
+            return
+        self.dispatcher.call(self._open_plot_window, fig, title, cache_key)
     
-    def _show_plot_window(self, fig, title):
+    def _open_plot_window(self, fig, title, cache_key=None):
         try:
             window = tk.Toplevel(self.root)
             window.title(title)
@@ -1046,9 +4844,11 @@ class ModernLabAnalyzerGUI:
             toolbar = NavigationToolbar2Tk(canvas, toolbar_frame)
             toolbar.update()
             
-            # Кнопка сохранения
+            # Кнопка сохранения; экспорт из кэша годится, пока вид не меняли масштабом или сдвигом
+            view = self._view_limits(fig)
             ttk.Button(toolbar_frame, text="💾 Сохранить график", 
-                      command=lambda: self.save_figure(fig)).pack(side=tk.RIGHT, padx=5)
+                      command=lambda: self.save_figure(
+                          fig, cache_key if self._view_limits(fig) == view else None)).pack(side=tk.RIGHT, padx=5)
             
             self.graph_windows.append(window)
             self.log_output(f"✓ График '{title}' построен", "success")
@@ -1056,7 +4856,16 @@ class ModernLabAnalyzerGUI:
         except Exception as e:
             self.log_output(f"✗ Ошибка отображения графика: {e}", "error")
     
-    def save_figure(self, fig):
+    @staticmethod
+    def _view_limits(fig):
+        return [ax.axis() for ax in fig.axes]
+    
+    def save_figure(self, fig, cache_key=None, rebuild=None):
+        """Сохранение графика; fig - фигура, она же в pickle (распаковывается, только если нужно) или None.
+
+        С cache_key файл того же формата, уже сохранявшийся для этого графика, берется из кэша.
+        Без фигуры она строится функцией rebuild в фоновой задаче.
+        """
         file_path = filedialog.asksaveasfilename(
             defaultextension=".png",
             filetypes=[
@@ -1066,12 +4875,35 @@ class ModernLabAnalyzerGUI:
                 ("All files", "*.*")
             ]
         )
-        if file_path:
-            try:
-                fig.savefig(file_path, dpi=300, bbox_inches='tight')
-                self.log_output(f"✓ График сохранен в {file_path}", "success")
-            except Exception as e:
-                self.log_output(f"✗ Ошибка сохранения графика: {e}", "error")
+        if not file_path:
+            return
+        fmt = os.path.splitext(file_path)[1].lstrip('.').lower() or 'png'
+        export_key = cache_key + (f"{fmt}@300",) if cache_key is not None else None
+        data = self.analyzer.figure_cache.get(export_key) if export_key is not None else None
+        if data is None and fig is None and rebuild is not None:
+            self.jobs.submit(f"save-{file_path}", lambda: self._export_figure(rebuild(), file_path, fmt, export_key),
+                             title="Сохранение графика", group=EXPERIMENT_JOBS)
+            return
+        self._export_figure(fig, file_path, fmt, export_key, data)
+    
+    def _export_figure(self, fig, file_path, fmt, export_key, data=None):
+        try:
+            if data is None:
+                if isinstance(fig, bytes):
+                    fig = pickle.loads(fig)
+                if fig is None:
+                    self.log_output("⚠️ График не сохранен: нет фигуры", "warning")
+                    return
+                buffer = io.BytesIO()
+                fig.savefig(buffer, format=fmt, dpi=300, bbox_inches='tight')
+                data = buffer.getvalue()
+                if export_key is not None:
+                    self.analyzer.figure_cache.put(export_key, data)
+            with open(file_path, 'wb') as f:
+                f.write(data)
+            self.log_output(f"✓ График сохранен в {file_path}", "success")
+        except Exception as e:
+            self.log_output(f"✗ Ошибка сохранения графика: {e}", "error")
     
     def export_results(self, file_type):
         if self.analyzer.data is None:
@@ -1104,6 +4936,9 @@ class ModernLabAnalyzerGUI:
                     if self.export_results_var.get() and self.analyzer.growth_results is not None:
                         self.analyzer.growth_results.to_excel(writer, sheet_name='Анализ_роста', index=False)
                     
+                    if self.export_results_var.get() and self.analyzer.inhibition_ci is not None:
+                        self.analyzer.inhibition_ci.to_excel(writer, sheet_name='Ингибирование_ДИ', index=False)
+                    
                     # Лист со статистикой
                     if self.export_stats_var.get():
                         stats = self.analyzer.get_statistics()
@@ -1173,11 +5008,47 @@ class ModernLabAnalyzerGUI:
         messagebox.showinfo("О программе", about_text)
     
     def on_closing(self):
-        if self.analyzer.conn:
+        self.jobs.shutdown()
+        self.dispatcher.close()
+        if self.analyzer.pool:
             self.analyzer.close()
         self.root.destroy()
 
+def run_command(argv):
+    """Служебные команды без графического интерфейса: python app.py migrate | refresh-growth"""
+    parser = argparse.ArgumentParser(prog="app.py")
+    parser.add_argument("--dbname", default="science_research")
+    parser.add_argument("--user", default="postgres")
+    parser.add_argument("--password", default="sql-class")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", default="5432")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("migrate", help="применить миграции схемы из каталога migrations")
+    refresh_parser = subparsers.add_parser("refresh-growth", help="обновить сводку скоростей роста growth_summary")
+    refresh_parser.add_argument("--experiments", help="ID экспериментов, например 1-5,8 (по умолчанию все)")
+    refresh_parser.add_argument("--window", nargs=2, type=float, action="append", metavar=("START", "END"),
+                                help="окно расчета (по умолчанию STANDARD_GROWTH_WINDOWS)")
+    refresh_parser.add_argument("--force", action="store_true", help="пересчитать и свежие окна")
+    args = parser.parse_args(argv)
+    
+    analyzer = LabExperimentAnalyzer()
+    if not analyzer.connect(dbname=args.dbname, user=args.user, password=args.password,
+                            host=args.host, port=args.port):
+        return 1
+    try:
+        if args.command == "migrate":
+            return 0 if analyzer.migrate() is not None else 1
+        if args.command == "refresh-growth":
+            experiment_ids = parse_experiment_ids(args.experiments) if args.experiments else None
+            refreshed = analyzer.refresh_growth_summary(experiment_ids, args.window, args.force)
+            return 0 if refreshed is not None else 1
+    finally:
+        analyzer.close()
+
 def main():
+    if len(sys.argv) > 1:
+        sys.exit(run_command(sys.argv[1:]))
+    
     root = tk.Tk()
     app = ModernLabAnalyzerGUI(root)
     
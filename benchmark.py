@@ -0,0 +1,786 @@
+"""Замеры производительности анализатора лабораторных экспериментов.
+
+Примеры:
+    python benchmark.py load --experiment 1
+    python benchmark.py load --synthetic-rows 1000000
+    python benchmark.py pushdown --synthetic-rows 1000000
+    python benchmark.py explain --experiments 20 --rows-per-experiment 150000
+    python benchmark.py growth --pairs 10 100 1000 10000
+    python benchmark.py mumax --pairs 100 1000 5000 --timepoints 120
+    python benchmark.py windows --pairs 100 1000 10000 --timepoints 25
+    python benchmark.py store --pairs 100 1000 10000
+    python benchmark.py stats --pairs 1000 10000 40000
+    python benchmark.py outofcore --synthetic-rows 1000000 --max-mb 64
+    python benchmark.py table --pairs 1000 10000 100000
+    python benchmark.py plots --pairs 100 2000 --workers 5
+    python benchmark.py figcache --pairs 100 2000
+    python benchmark.py fit --pairs 4000 --workers 1 2 4 8
+    python benchmark.py bootstrap --compounds 100 500 --resamples 10000
+"""
+import argparse
+import io
+import multiprocessing
+import os
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from app import (BATCH_MEASUREMENTS_QUERY, GROWTH_PUSHDOWN_QUERY, MEASUREMENTS_QUERY, MIGRATIONS_DIR,
+                 NEW_MEASUREMENTS_QUERY, VERSION_QUERY, LabExperimentAnalyzer, compute_growth_rates,
+                 compute_max_growth_rates, fit_growth_models, growth_frame, optimize_dtypes,
+                 DEFAULT_FIT_SHARD, FIT_MODELS, bootstrap_inhibition, TimeIndex, growth_rate_matrix,
+                 ExperimentData, grouped_mean_std, MeasurementStats, STATS_COLUMNS, TableModel,
+                 render_figure, render_figures, build_growth_figure, build_inhibition_figure,
+                 build_condition_figure, build_replicates_figure, FigureCache)
+
+DB_PARAMS = dict(dbname="science_research", user="postgres", password="sql-class")
+
+def connect_analyzer(args):
+    analyzer = LabExperimentAnalyzer()
+    if not analyzer.connect(dbname=args.dbname, user=args.user, password=args.password,
+                            host=args.host, port=args.port):
+        raise SystemExit(1)
+    return analyzer
+
+def seed_synthetic_experiment(conn, rows, compounds=6, replicates=4):
+    """Создает эксперимент с rows синтетическими измерениями, возвращает его ID"""
+    timepoints = max(1, rows // (compounds * replicates))
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT id_research FROM researchers ORDER BY id_research LIMIT 1")
+        research_id = cursor.fetchone()[0]
+        cursor.execute("""
+            INSERT INTO expirements (expirement_name, id_research)
+            VALUES ('Синтетический эксперимент (benchmark)', %s)
+            RETURNING id_expirement
+        """, (research_id,))
+        experiment_id = cursor.fetchone()[0]
+        cursor.execute("SELECT compound_id FROM compounds ORDER BY compound_id LIMIT %s", (compounds,))
+        compound_ids = [row[0] for row in cursor.fetchall()]
+        cursor.execute("""
+            INSERT INTO measurements (id_expirement, compound_id, measurements_time_hours,
+                                      od_value, ph_value, temperature_celsius, replicate_number)
+            SELECT %s, c.id, t.t * 0.25,
+                   round((2.8 / (1 + 55 * exp(-0.5 * t.t * 0.25 / c.k)) + random() * 0.01)::numeric, 4),
+                   round((6.5 + random())::numeric, 2),
+                   round((36.5 + random())::numeric, 2),
+                   r.r
+            FROM unnest(%s::int[]) WITH ORDINALITY AS c(id, k)
+            CROSS JOIN generate_series(0, %s - 1) AS t(t)
+            CROSS JOIN generate_series(1, %s) AS r(r)
+        """, (experiment_id, compound_ids, timepoints, replicates))
+    conn.commit()
+    return experiment_id
+
+def synthetic_measurements(pairs, timepoints=25, replicates=2, seed=0):
+    """Кадр измерений как после загрузки: pairs пар (соединение, реплика), по timepoints точек"""
+    rng = np.random.default_rng(seed)
+    compounds = max(1, pairs // replicates)
+    compound = np.repeat(np.arange(compounds), timepoints * replicates)
+    time = np.tile(np.repeat(np.arange(timepoints) * 1.0, replicates), compounds)
+    replicate = np.tile(np.arange(1, replicates + 1), compounds * timepoints)
+    rate = rng.uniform(0.1, 0.6, compounds)[compound]
+    od = np.round(2.8 / (1 + 55 * np.exp(-rate * time)) + rng.uniform(0, 0.01, len(time)), 4)
+    data = pd.DataFrame({
+        'compound_name': [f"Соединение {i:05d}" for i in compound],
+        'measurements_time_hours': time,
+        'od_value': od,
+        'ph_value': np.round(rng.uniform(6.5, 7.5, len(time)), 2),
+        'temperature_celsius': np.round(rng.uniform(36.5, 37.5, len(time)), 2),
+        'replicate_number': replicate
+    })
+    return optimize_dtypes(data)
+
+def legacy_growth_rates(data, start_time, end_time):
+    """Прежний расчет скорости роста вложенными циклами - эталон для сравнения"""
+    results = []
+    for compound in data['compound_name'].unique():
+        compound_data = data[data['compound_name'] == compound]
+        for replicate in compound_data['replicate_number'].unique():
+            rep_data = compound_data[compound_data['replicate_number'] == replicate]
+            start_measurement = rep_data[rep_data['measurements_time_hours'] == start_time]
+            end_measurement = rep_data[rep_data['measurements_time_hours'] == end_time]
+            if not start_measurement.empty and not end_measurement.empty:
+                initial_od = start_measurement.iloc[0]['od_value']
+                final_od = end_measurement.iloc[0]['od_value']
+                time_diff = end_time - start_time
+                if time_diff > 0 and initial_od > 0 and final_od > 0:
+                    results.append({
+                        'compound': compound,
+                        'replicate': replicate,
+                        'initial_od': initial_od,
+                        'final_od': final_od,
+                        'growth_rate': (np.log(final_od) - np.log(initial_od)) / time_diff,
+                        'inhibition_percent': None
+                    })
+    return growth_frame(results)
+
+def drop_experiment(conn, experiment_id):
+    with conn.cursor() as cursor:
+        cursor.execute("DELETE FROM measurements WHERE id_expirement = %s", (experiment_id,))
+        cursor.execute("DELETE FROM expirements WHERE id_expirement = %s", (experiment_id,))
+    conn.commit()
+
+def best_of(repeat, func):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+def copy_size(conn, query, params):
+    """Объем результата запроса в CSV-представлении COPY, байт"""
+    buffer = io.BytesIO()
+    with conn.cursor() as cursor:
+        cursor.copy_expert(f"COPY ({cursor.mogrify(query, params).decode()}) TO STDOUT WITH CSV", buffer)
+    return buffer.tell()
+
+def explain(cursor, query, params, repeat):
+    """Лучшее время выполнения (мс) по EXPLAIN ANALYZE и узлы сканирования плана"""
+    best = None
+    for _ in range(repeat):
+        cursor.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + query, params)
+        plan = cursor.fetchone()[0][0]
+        if best is None or plan['Execution Time'] < best['Execution Time']:
+            best = plan
+    scans = []
+    nodes = [best['Plan']]
+    while nodes:
+        node = nodes.pop()
+        if node.get('Relation Name') == 'measurements':
+            scans.append(node['Node Type'] + (f" ({node['Index Name']})" if 'Index Name' in node else ""))
+        nodes.extend(node.get('Plans', []))
+    return best['Execution Time'], ", ".join(scans)
+
+def bench_load(args):
+    """Сравнение режимов загрузки: pandas, серверный курсор, COPY"""
+    analyzer = connect_analyzer(args)
+    experiment_id = args.experiment
+    if args.synthetic_rows:
+        experiment_id = analyzer.run_query(lambda conn: seed_synthetic_experiment(conn, args.synthetic_rows))
+
+    try:
+        reference = None
+        print(f"\nЭксперимент ID={experiment_id}")
+        print(f"{'режим':<10}{'строк':>12}{'время, с':>12}{'строк/с':>14}")
+        for mode in args.modes:
+            elapsed, data = best_of(args.repeat, lambda: analyzer.load_experiment_data(experiment_id, mode=mode))
+            rows = len(data)
+            print(f"{mode:<10}{rows:>12}{elapsed:>12.3f}{rows / elapsed:>14.0f}")
+
+            if reference is None:
+                reference = data.copy()
+            else:
+                pd.testing.assert_frame_equal(reference, data, check_dtype=False)
+    finally:
+        if args.synthetic_rows:
+            analyzer.run_query(lambda conn: drop_experiment(conn, experiment_id))
+        analyzer.close()
+
+def bench_memory(args):
+    """Память загруженных экспериментов до и после сжатия типов"""
+    analyzer = connect_analyzer(args)
+    experiment_ids = list(args.experiments)
+    if args.synthetic_rows:
+        experiment_ids.append(analyzer.run_query(lambda conn: seed_synthetic_experiment(conn, args.synthetic_rows)))
+
+    try:
+        for experiment_id in experiment_ids:
+            if analyzer.load_experiment_data(experiment_id, mode=args.mode) is None:
+                continue
+            report = analyzer.get_memory_report()
+            if report is None:
+                continue
+            print(f"\nЭксперимент ID={experiment_id}")
+            print(report.to_string(float_format=lambda x: f"{x:.2f}"))
+    finally:
+        if args.synthetic_rows:
+            analyzer.run_query(lambda conn: drop_experiment(conn, experiment_ids[-1]))
+        analyzer.close()
+
+def bench_batch(args):
+    """Последовательная загрузка экспериментов против одного пакетного запроса"""
+    analyzer = connect_analyzer(args)
+    experiment_ids = list(range(args.first, args.last + 1))
+
+    try:
+        sequential, _ = best_of(args.repeat, lambda: [
+            analyzer.fetch_experiment_data(experiment_id, mode=args.mode) for experiment_id in experiment_ids])
+        batch, experiments = best_of(args.repeat, lambda: analyzer.load_experiments(experiment_ids, mode=args.mode))
+        rows = sum(len(data) for data in experiments.values())
+        print(f"\n{len(experiment_ids)} экспериментов, {rows} строк")
+        print(f"по одному:  {sequential:.3f} с")
+        print(f"пакетом:    {batch:.3f} с")
+    finally:
+        analyzer.close()
+
+def bench_pushdown(args):
+    """Расчет роста и ингибирования на клиенте против расчета в PostgreSQL"""
+    analyzer = connect_analyzer(args)
+    # Сравниваем сами расчеты, а не чтение готовой сводки growth_summary
+    analyzer.use_growth_summary = False
+    experiment_id = args.experiment
+    if args.synthetic_rows:
+        experiment_id = analyzer.run_query(lambda conn: seed_synthetic_experiment(conn, args.synthetic_rows))
+
+    try:
+        def run(engine):
+            # Для pandas-расчета в замер входит загрузка всех измерений
+            if engine == 'pandas':
+                analyzer.load_experiment_data(experiment_id, mode=args.mode)
+            # Иначе повторы и второй движок берут результат из кэша анализа
+            analyzer.analysis_cache.clear()
+            analyzer.growth_results = None
+            analyzer.calculate_growth_rate(args.start, args.end, engine=engine)
+            return analyzer.calculate_inhibition(engine=engine)
+
+        analyzer.load_experiment_data(experiment_id, mode=args.mode)
+        raw_params = (experiment_id, analyzer.data_version[1])
+        growth_params = {'experiment_id': experiment_id, 'max_id': analyzer.data_version[1],
+                         'start_time': args.start, 'end_time': args.end}
+        transfer = {
+            'pandas': analyzer.run_query(lambda conn: copy_size(conn, MEASUREMENTS_QUERY, raw_params)),
+            'sql': analyzer.run_query(lambda conn: copy_size(conn, GROWTH_PUSHDOWN_QUERY, growth_params))
+        }
+
+        reference = None
+        print(f"\nЭксперимент ID={experiment_id}, {len(analyzer.data)} измерений")
+        print(f"{'движок':<10}{'время, с':>12}{'передано, КБ':>16}{'строк':>10}")
+        for engine in ('pandas', 'sql'):
+            elapsed, results = best_of(args.repeat, lambda: run(engine))
+            rows = 0 if results is None else len(results)
+            print(f"{engine:<10}{elapsed:>12.3f}{transfer[engine] / 1024:>16.1f}{rows:>10}")
+
+            if reference is None:
+                reference = results
+            else:
+                pd.testing.assert_frame_equal(reference, results, check_exact=True)
+    finally:
+        if args.synthetic_rows:
+            analyzer.run_query(lambda conn: drop_experiment(conn, experiment_id))
+        analyzer.close()
+
+def bench_explain(args):
+    """EXPLAIN ANALYZE запросов анализатора без индексов миграции и с ними"""
+    migration = os.path.join(MIGRATIONS_DIR, args.migration)
+    with open(migration + ".down.sql", encoding="utf-8") as f:
+        down_sql = f.read()
+    with open(migration + ".sql", encoding="utf-8") as f:
+        up_sql = f.read()
+
+    analyzer = connect_analyzer(args)
+    experiment_ids = []
+    try:
+        for _ in range(args.experiments):
+            experiment_ids.append(analyzer.run_query(
+                lambda conn: seed_synthetic_experiment(conn, args.rows_per_experiment)))
+        target = experiment_ids[len(experiment_ids) // 2]
+
+        def vacuum(conn):
+            # Карта видимости нужна для index-only сканирования свежезаписанных строк
+            conn.autocommit = True
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("VACUUM ANALYZE measurements")
+            finally:
+                conn.autocommit = False
+
+        analyzer.run_query(vacuum)
+
+        def run(conn):
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT count(*) FROM measurements")
+                total = cursor.fetchone()[0]
+                cursor.execute(VERSION_QUERY, (target,))
+                max_id = cursor.fetchone()[1]
+                queries = [
+                    ("загрузка", MEASUREMENTS_QUERY, (target, max_id)),
+                    ("версия", VERSION_QUERY, (target,)),
+                    ("дозагрузка", NEW_MEASUREMENTS_QUERY, (target, max_id - 100, max_id)),
+                    ("пакет из 3", BATCH_MEASUREMENTS_QUERY, {'experiment_ids': experiment_ids[:3],
+                                                         'max_ids': [max_id] * 3}),
+                    ("рост в SQL", GROWTH_PUSHDOWN_QUERY, {'experiment_id': target, 'max_id': max_id,
+                                                          'start_time': 0, 'end_time': 24})
+                ]
+                # Обе фазы в одной транзакции, которая затем откатывается: схема базы не меняется
+                cursor.execute(down_sql)
+                before = [explain(cursor, query, params, args.repeat) for _, query, params in queries]
+                cursor.execute(up_sql)
+                after = [explain(cursor, query, params, args.repeat) for _, query, params in queries]
+            conn.rollback()
+            return total, [(name,) + b + a for (name, _, _), b, a in zip(queries, before, after)]
+
+        total, rows = analyzer.run_query(run)
+        print(f"\nmeasurements: {total} строк, эксперимент ID={target}, миграция {args.migration}")
+        print(f"{'запрос':<14}{'до, мс':>10}{'после, мс':>12}{'ускорение':>11}")
+        for name, before_ms, before_plan, after_ms, after_plan in rows:
+            print(f"{name:<14}{before_ms:>10.1f}{after_ms:>12.1f}{before_ms / after_ms:>10.1f}x")
+        print("\nПланы:")
+        for name, _, before_plan, _, after_plan in rows:
+            print(f"  {name}: {before_plan}  ->  {after_plan}")
+    finally:
+        for experiment_id in experiment_ids:
+            analyzer.run_query(lambda conn: drop_experiment(conn, experiment_id))
+        analyzer.close()
+
+def bench_growth(args):
+    """Масштабирование расчета скорости роста: векторный расчет против прежних циклов"""
+    print(f"{'пар':>8}{'строк':>10}{'циклы, с':>12}{'вектор, с':>12}{'ускорение':>11}")
+    for pairs in args.pairs:
+        data = synthetic_measurements(pairs, args.timepoints)
+        vectorized, results = best_of(args.repeat, lambda: compute_growth_rates(data, args.start, args.end))
+        if pairs <= args.legacy_limit:
+            legacy, reference = best_of(1, lambda: legacy_growth_rates(data, args.start, args.end))
+            pd.testing.assert_frame_equal(reference, results, check_exact=True)
+            print(f"{pairs:>8}{len(data):>10}{legacy:>12.3f}{vectorized:>12.4f}{legacy / vectorized:>10.0f}x")
+        else:
+            print(f"{pairs:>8}{len(data):>10}{'-':>12}{vectorized:>12.4f}{'-':>11}")
+
+def bench_mumax(args):
+    """µmax по скользящему окну против двухточечного расчета на тех же данных"""
+    print(f"{'пар':>8}{'точек':>7}{'строк':>10}{'2 точки, с':>12}{'µmax, с':>10}{'окон':>10}")
+    for pairs in args.pairs:
+        data = synthetic_measurements(pairs, args.timepoints)
+        two_point, _ = best_of(args.repeat, lambda: compute_growth_rates(data, args.start, args.end))
+        mumax, results = best_of(args.repeat, lambda: compute_max_growth_rates(data, args.window))
+        windows = int(results['windows'].sum())
+        print(f"{pairs:>8}{args.timepoints:>7}{len(data):>10}{two_point:>12.4f}{mumax:>10.4f}{windows:>10}")
+
+def bench_windows(args):
+    """Матрица всех окон (start, end) по индексу времени против вызова расчета роста на каждое окно"""
+    print(f"{'пар':>8}{'точек':>7}{'окон':>7}{'индекс, с':>11}{'матрица, с':>12}{'по окнам, с':>13}")
+    for pairs in args.pairs:
+        data = synthetic_measurements(pairs, args.timepoints)
+        build, index = best_of(args.repeat, lambda: TimeIndex(data))
+        matrix, (grid, _) = best_of(args.repeat, lambda: growth_rate_matrix(index, interpolate=args.interpolate))
+        windows = [(start, end) for i, start in enumerate(grid) for end in grid[i + 1:]]
+        # Полный перебор окон дорог - оцениваем по одному окну
+        one, _ = best_of(args.repeat, lambda: compute_growth_rates(data, windows[0][0], windows[0][1]))
+        print(f"{pairs:>8}{args.timepoints:>7}{len(windows):>7}{build:>11.4f}{matrix:>12.4f}{one * len(windows):>13.2f}")
+
+def bench_store(args):
+    """ExperimentData против фильтрации DataFrame по соединению: память и время кривых роста"""
+    print(f"{'пар':>8}{'строк':>10}{'DataFrame, МБ':>15}{'хранилище, МБ':>15}"
+          f"{'фильтр, с':>11}{'сборка, с':>11}{'срезы, с':>10}")
+    for pairs in args.pairs:
+        data = synthetic_measurements(pairs, args.timepoints, replicates=args.replicates)
+        compounds = data['compound_name'].unique()
+        
+        def filtered():
+            for compound in compounds:
+                grouped = data[data['compound_name'] == compound].groupby('measurements_time_hours')['od_value']
+                grouped.mean(), grouped.std()
+        
+        def sliced(store):
+            for i in range(len(store.compounds)):
+                view = store.compound_view(i, ['measurements_time_hours', 'od_value'])
+                grouped_mean_std(view['measurements_time_hours'], view['od_value'])
+        
+        frame_time, _ = best_of(args.repeat, filtered)
+        build_time, store = best_of(args.repeat, lambda: ExperimentData(data))
+        slice_time, _ = best_of(args.repeat, lambda: sliced(store))
+        frame_mb = data.memory_usage(deep=True).sum() / 2**20
+        print(f"{pairs:>8}{len(data):>10}{frame_mb:>15.2f}{store.nbytes / 2**20:>15.2f}"
+              f"{frame_time:>11.4f}{build_time:>11.4f}{slice_time:>10.4f}")
+
+def bench_stats(args):
+    """Статистика по порциям при загрузке против describe() по всему кадру при каждом показе"""
+    print(f"{'пар':>8}{'строк':>10}{'describe, с':>13}{'по порциям, с':>15}{'показ, с':>10}{'ошибка медианы':>16}")
+    for pairs in args.pairs:
+        data = synthetic_measurements(pairs, args.timepoints)
+        describe_time, reference = best_of(args.repeat, lambda: {col: data[col].describe() for col in STATS_COLUMNS})
+        
+        def streamed():
+            stats = MeasurementStats()
+            for start in range(0, len(data), args.chunk_size):
+                stats.update_frame(data.iloc[start:start + args.chunk_size])
+            return stats
+        
+        stream_time, stats = best_of(args.repeat, streamed)
+        show_time, summary = best_of(args.repeat, stats.summary)
+        od = summary[STATS_COLUMNS['od_value']]
+        spread = reference['od_value']['max'] - reference['od_value']['min']
+        error = abs(od['50%'] - reference['od_value']['50%']) / spread
+        print(f"{pairs:>8}{len(data):>10}{describe_time:>13.4f}{stream_time:>15.4f}{show_time:>10.4f}{error:>16.2e}")
+
+def bench_outofcore(args):
+    """Пиковая память и время полной загрузки против свертки 'reduce' и совпадение скоростей роста"""
+    analyzer = connect_analyzer(args)
+    analyzer.out_of_core_bytes = args.max_mb * 2**20
+    experiment_id = args.experiment
+    if args.synthetic_rows:
+        experiment_id = analyzer.run_query(lambda conn: seed_synthetic_experiment(conn, args.synthetic_rows))
+    
+    try:
+        reference = None
+        print(f"\nЭксперимент ID={experiment_id}, лимит свертки {args.max_mb} МБ")
+        print(f"{'режим':<10}{'строк в памяти':>16}{'время, с':>10}{'пик памяти, МБ':>16}")
+        for mode in args.modes:
+            tracemalloc.start()
+            started = time.perf_counter()
+            data = analyzer.load_experiment_data(experiment_id, mode=mode)
+            elapsed = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            if data is None:
+                print(f"{mode:<10}{'ошибка':>16}")
+                continue
+            print(f"{mode:<10}{len(data):>16}{elapsed:>10.2f}{peak / 2**20:>16.1f}")
+            
+            growth = analyzer.calculate_growth_rate(args.start, args.end)
+            if reference is None:
+                reference = growth.copy()
+            else:
+                pd.testing.assert_frame_equal(reference, growth)
+    finally:
+        if args.synthetic_rows:
+            analyzer.run_query(lambda conn: drop_experiment(conn, experiment_id))
+        analyzer.close()
+
+def legacy_table_rows(data):
+    """Прежнее заполнение таблицы: подписи всех строк через iterrows - эталон времени"""
+    rows = []
+    for _, row in data.iterrows():
+        rows.append((
+            row['expirement_name'][:50] + "..." if len(row['expirement_name']) > 50 else row['expirement_name'],
+            row['researcher'],
+            row['compound_name'],
+            f"{row['measurements_time_hours']:.1f}",
+            f"{row['od_value']:.4f}",
+            f"{row['ph_value']:.2f}",
+            f"{row['temperature_celsius']:.2f}",
+            row['replicate_number']
+        ))
+    return rows
+
+def bench_table(args):
+    """Открытие таблицы: подписи всех строк против TableModel с окном видимых строк"""
+    print(f"{'строк':>10}{'все строки, с':>15}{'открытие, с':>13}{'сортировка, с':>15}{'прокрутка, с':>14}")
+    for pairs in args.pairs:
+        data = synthetic_measurements(pairs, args.timepoints)
+        data['expirement_name'] = pd.Categorical(["Синтетический эксперимент"] * len(data))
+        data['researcher'] = pd.Categorical(["Исследователь"] * len(data))
+        model = TableModel()
+        
+        def open_table():
+            model.sort_column = None
+            model.set_data(data)
+            return model.rows(0, args.visible)
+        
+        def sort_table():
+            model.sort('od_value', descending=True)
+            return model.rows(0, args.visible)
+        
+        # Прокрутка - окна по всей таблице
+        offsets = np.linspace(0, max(0, len(data) - args.visible), 100).astype(int)
+        open_time, _ = best_of(args.repeat, open_table)
+        sort_time, _ = best_of(args.repeat, sort_table)
+        scroll_time, _ = best_of(args.repeat, lambda: [model.rows(offset, offset + args.visible) for offset in offsets])
+        legacy = '-'
+        if len(data) <= args.legacy_limit:
+            elapsed, _ = best_of(1, lambda: legacy_table_rows(data))
+            legacy = f"{elapsed:.3f}"
+        print(f"{len(data):>10}{legacy:>15}{open_time:>13.4f}{sort_time:>15.4f}{scroll_time / len(offsets):>14.5f}")
+
+def plot_tasks(analyzer, figsize):
+    """Набор «Все графики» для загруженных в analyzer данных: {ключ: (builder, figsize, args)}"""
+    return {
+        'growth': (build_growth_figure, figsize, (analyzer.growth_curves(),)),
+        'inhibition': (build_inhibition_figure, figsize, (analyzer.growth_results, analyzer.inhibition_ci)),
+        'temp': (build_condition_figure, figsize, (analyzer.condition_curves('temperature_celsius'),
+                                                   'temperature_celsius')),
+        'ph': (build_condition_figure, figsize, (analyzer.condition_curves('ph_value'), 'ph_value')),
+        'replicates': (build_replicates_figure, figsize, (analyzer.replicate_values(),))
+    }
+
+def bench_plots(args):
+    """Все графики: по очереди в одном процессе против отрисовки вне экрана в пуле процессов"""
+    executor = None
+    if args.workers > 1:
+        executor = ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context('spawn'))
+        list(executor.map(abs, range(args.workers)))
+    print(f"{'пар':>8}{'строк':>10}{'самый долгий, с':>17}{'по очереди, с':>15}{'в пуле, с':>11}  ядер: {os.cpu_count()}")
+    try:
+        for pairs in args.pairs:
+            data = synthetic_measurements(pairs, args.timepoints)
+            data['compound_name'] = data['compound_name'].cat.rename_categories(
+                {data['compound_name'].cat.categories[0]: "Контроль (без препарата)"})
+            analyzer = LabExperimentAnalyzer()
+            analyzer.log = lambda *_, **__: None
+            analyzer.data = data
+            analyzer.calculate_inhibition()
+            tasks = plot_tasks(analyzer, (10, 6))
+            
+            slowest = max(best_of(1, lambda: render_figure(*task))[0] for task in tasks.values())
+            sequential, _ = best_of(args.repeat, lambda: list(render_figures(tasks)))
+            pooled = '-'
+            if executor is not None:
+                elapsed, results = best_of(args.repeat, lambda: list(render_figures(tasks, executor)))
+                assert all(error is None for _, _, error in results)
+                pooled = f"{elapsed:.3f}"
+            print(f"{pairs:>8}{len(data):>10}{slowest:>17.3f}{sequential:>15.3f}{pooled:>11}")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+def bench_figcache(args):
+    """Все графики: подготовка и отрисовка против выдачи из кэша - PNG и фигуры из памяти, PNG с диска"""
+    print(f"{'пар':>8}{'строк':>10}{'отрисовка, с':>14}{'память, мс':>12}{'диск, мс':>10}{'объем, КБ':>11}")
+    for pairs in args.pairs:
+        data = synthetic_measurements(pairs, args.timepoints)
+        data['compound_name'] = data['compound_name'].cat.rename_categories(
+            {data['compound_name'].cat.categories[0]: "Контроль (без препарата)"})
+        analyzer = LabExperimentAnalyzer()
+        analyzer.log = lambda *_, **__: None
+        analyzer.data = data
+        analyzer.calculate_inhibition()
+        
+        def render_all():
+            return {kind: render_figure(*task) for kind, task in plot_tasks(analyzer, (10, 6)).items()}
+        rendered, results = best_of(args.repeat, render_all)
+        
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = FigureCache(cache_dir=cache_dir)
+            keys = []
+            for kind, result in results.items():
+                if result is not None:
+                    for form, value in zip(('png', 'figure'), result):
+                        keys.append((1, (len(data), 0), kind, (10, 6), (), form))
+                        cache.put(keys[-1], value)
+            
+            memory, _ = best_of(args.repeat, lambda: [cache.get(key) for key in keys])
+            
+            size = sum(len(cache.get(key)) for key in keys)
+            
+            # Фигуры в pickle на диск не попадают, с диска приходят только изображения
+            images = [key for key in keys if key[-1] not in FigureCache.MEMORY_ONLY]
+            def from_disk():
+                cache.clear()
+                return [cache.get(key) for key in images]
+            disk, _ = best_of(args.repeat, from_disk)
+        print(f"{pairs:>8}{len(data):>10}{rendered:>14.3f}{memory * 1000:>12.3f}{disk * 1000:>10.3f}{size / 1024:>11.0f}")
+
+def bench_fit(args):
+    """Подгонка моделей роста в пуле процессов: масштабирование по числу процессов"""
+    data = synthetic_measurements(args.pairs, args.timepoints)
+    growth = compute_growth_rates(data, 0, 24)
+    print(f"{args.pairs} кривых по {args.timepoints} точек, модель {args.model}, ядер: {os.cpu_count()}")
+    print(f"{'процессов':>10}{'время, с':>10}{'ускорение':>11}")
+    reference = baseline = None
+    for workers in args.workers:
+        executor = None
+        if workers > 1:
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            # Запуск процессов не входит в замер
+            list(executor.map(abs, range(workers)))
+        try:
+            elapsed, results = best_of(args.repeat, lambda: fit_growth_models(
+                data, args.model, growth, executor, shard_size=args.shard_size))
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        baseline = baseline or elapsed
+        print(f"{workers:>10}{elapsed:>10.3f}{baseline / elapsed:>10.2f}x")
+        if reference is None:
+            reference = results
+        else:
+            pd.testing.assert_frame_equal(reference, results, check_exact=True)
+
+def synthetic_growth(compounds, replicates=4, controls=6, seed=0):
+    """Таблица скоростей роста: compounds соединений по replicates реплик и контроль"""
+    rng = np.random.default_rng(seed)
+    names = np.repeat([f"Соединение {i:05d}" for i in range(compounds)], replicates)
+    rates = rng.normal(rng.uniform(0.05, 0.2, compounds).repeat(replicates), 0.02)
+    return pd.DataFrame({
+        'compound': np.concatenate([["Контроль (без препарата)"] * controls, names]),
+        'growth_rate': np.concatenate([rng.normal(0.2, 0.02, controls), rates])
+    })
+
+def legacy_bootstrap(growth, resamples, seed=0):
+    """Бутстреп циклом по соединениям и выборкам - эталон времени"""
+    rng = np.random.default_rng(seed)
+    control_mask = growth['compound'].str.contains("Контроль")
+    control = growth.loc[control_mask, 'growth_rate'].to_numpy()
+    intervals = {}
+    for compound, values in growth[~control_mask].groupby('compound', sort=False)['growth_rate']:
+        values = values.to_numpy()
+        inhibition = []
+        for _ in range(resamples):
+            control_mean = rng.choice(control, len(control)).mean()
+            inhibition.append((control_mean - rng.choice(values, len(values)).mean()) / control_mean * 100)
+        intervals[compound] = np.percentile(inhibition, [2.5, 97.5])
+    return intervals
+
+def bench_bootstrap(args):
+    """Бутстреп-интервалы ингибирования: пакетный расчет против цикла по соединениям"""
+    print(f"{'соединений':>11}{'выборок':>9}{'цикл, с':>10}{'пакетно, с':>12}{'в пуле, с':>11}")
+    executor = None
+    if args.workers > 1:
+        executor = ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context('spawn'))
+        list(executor.map(abs, range(args.workers)))
+    try:
+        for compounds in args.compounds:
+            growth = synthetic_growth(compounds)
+            batched, summary = best_of(args.repeat, lambda: bootstrap_inhibition(growth, args.resamples))
+            pooled = '-'
+            if executor is not None:
+                elapsed, pooled_summary = best_of(args.repeat, lambda: bootstrap_inhibition(
+                    growth, args.resamples, executor=executor))
+                pd.testing.assert_frame_equal(summary, pooled_summary, check_exact=True)
+                pooled = f"{elapsed:.3f}"
+            legacy = '-'
+            if compounds <= args.legacy_limit:
+                elapsed, _ = best_of(1, lambda: legacy_bootstrap(growth, args.resamples))
+                legacy = f"{elapsed:.2f}"
+            print(f"{compounds:>11}{args.resamples:>9}{legacy:>10}{batched:>12.3f}{pooled:>11}")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dbname", default=DB_PARAMS["dbname"])
+    parser.add_argument("--user", default=DB_PARAMS["user"])
+    parser.add_argument("--password", default=DB_PARAMS["password"])
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", default="5432")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    load_parser = subparsers.add_parser("load", help="скорость загрузки измерений")
+    load_parser.add_argument("--experiment", type=int, default=1)
+    load_parser.add_argument("--synthetic-rows", type=int, default=0,
+                             help="создать временный эксперимент с указанным числом строк")
+    load_parser.add_argument("--modes", nargs="+", default=["pandas", "stream", "copy"])
+    load_parser.add_argument("--repeat", type=int, default=3)
+    load_parser.set_defaults(func=bench_load)
+
+    memory_parser = subparsers.add_parser("memory", help="память до и после сжатия типов")
+    memory_parser.add_argument("--experiments", type=int, nargs="+", default=[1])
+    memory_parser.add_argument("--synthetic-rows", type=int, default=0)
+    memory_parser.add_argument("--mode", default="copy")
+    memory_parser.set_defaults(func=bench_memory)
+
+    batch_parser = subparsers.add_parser("batch", help="пакетная загрузка экспериментов")
+    batch_parser.add_argument("--first", type=int, default=1)
+    batch_parser.add_argument("--last", type=int, default=6)
+    batch_parser.add_argument("--mode", default="copy")
+    batch_parser.add_argument("--repeat", type=int, default=3)
+    batch_parser.set_defaults(func=bench_batch)
+
+    pushdown_parser = subparsers.add_parser("pushdown", help="расчет роста в PostgreSQL против pandas")
+    pushdown_parser.add_argument("--experiment", type=int, default=1)
+    pushdown_parser.add_argument("--synthetic-rows", type=int, default=0)
+    pushdown_parser.add_argument("--start", type=float, default=0)
+    pushdown_parser.add_argument("--end", type=float, default=24)
+    pushdown_parser.add_argument("--mode", default="copy")
+    pushdown_parser.add_argument("--repeat", type=int, default=3)
+    pushdown_parser.set_defaults(func=bench_pushdown)
+
+    explain_parser = subparsers.add_parser("explain", help="планы запросов до и после миграции индексов")
+    explain_parser.add_argument("--migration", default="001_measurement_indexes")
+    explain_parser.add_argument("--experiments", type=int, default=20,
+                                help="число синтетических экспериментов")
+    explain_parser.add_argument("--rows-per-experiment", type=int, default=150000)
+    explain_parser.add_argument("--repeat", type=int, default=3)
+    explain_parser.set_defaults(func=bench_explain)
+
+    growth_parser = subparsers.add_parser("growth", help="скорость расчета роста от числа пар")
+    growth_parser.add_argument("--pairs", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    growth_parser.add_argument("--timepoints", type=int, default=25)
+    growth_parser.add_argument("--start", type=float, default=0)
+    growth_parser.add_argument("--end", type=float, default=24)
+    growth_parser.add_argument("--legacy-limit", type=int, default=10000,
+                               help="не запускать прежний расчет для большего числа пар")
+    growth_parser.add_argument("--repeat", type=int, default=3)
+    growth_parser.set_defaults(func=bench_growth)
+
+    mumax_parser = subparsers.add_parser("mumax", help="µmax по скользящему окну против двух точек")
+    mumax_parser.add_argument("--pairs", type=int, nargs="+", default=[100, 1000, 5000])
+    mumax_parser.add_argument("--timepoints", type=int, default=120)
+    mumax_parser.add_argument("--window", type=int, default=3)
+    mumax_parser.add_argument("--start", type=float, default=0)
+    mumax_parser.add_argument("--end", type=float, default=24)
+    mumax_parser.add_argument("--repeat", type=int, default=3)
+    mumax_parser.set_defaults(func=bench_mumax)
+
+    windows_parser = subparsers.add_parser("windows", help="матрица окон скорости роста против перебора окон")
+    windows_parser.add_argument("--pairs", type=int, nargs="+", default=[100, 1000, 10000])
+    windows_parser.add_argument("--timepoints", type=int, default=25)
+    windows_parser.add_argument("--interpolate", action="store_true")
+    windows_parser.add_argument("--repeat", type=int, default=3)
+    windows_parser.set_defaults(func=bench_windows)
+
+    store_parser = subparsers.add_parser("store", help="ExperimentData против фильтрации DataFrame")
+    store_parser.add_argument("--pairs", type=int, nargs="+", default=[100, 1000, 10000])
+    store_parser.add_argument("--timepoints", type=int, default=25)
+    store_parser.add_argument("--replicates", type=int, default=4)
+    store_parser.add_argument("--repeat", type=int, default=3)
+    store_parser.set_defaults(func=bench_store)
+
+    stats_parser = subparsers.add_parser("stats", help="потоковая статистика против describe()")
+    stats_parser.add_argument("--pairs", type=int, nargs="+", default=[1000, 10000, 40000])
+    stats_parser.add_argument("--timepoints", type=int, default=25)
+    stats_parser.add_argument("--chunk-size", type=int, default=50000)
+    stats_parser.add_argument("--repeat", type=int, default=3)
+    stats_parser.set_defaults(func=bench_stats)
+
+    outofcore_parser = subparsers.add_parser("outofcore", help="память полной загрузки против свертки 'reduce'")
+    outofcore_parser.add_argument("--experiment", type=int, default=1)
+    outofcore_parser.add_argument("--synthetic-rows", type=int, default=0,
+                                  help="создать временный эксперимент с указанным числом строк")
+    outofcore_parser.add_argument("--modes", nargs="+", default=["copy", "stream", "reduce"])
+    outofcore_parser.add_argument("--max-mb", type=int, default=64)
+    outofcore_parser.add_argument("--start", type=float, default=0)
+    outofcore_parser.add_argument("--end", type=float, default=24)
+    outofcore_parser.set_defaults(func=bench_outofcore)
+
+    table_parser = subparsers.add_parser("table", help="виртуальная таблица против заполнения всех строк")
+    table_parser.add_argument("--pairs", type=int, nargs="+", default=[1000, 10000, 100000])
+    table_parser.add_argument("--timepoints", type=int, default=25)
+    table_parser.add_argument("--visible", type=int, default=40, help="строк в окне таблицы")
+    table_parser.add_argument("--legacy-limit", type=int, default=500000,
+                              help="не заполнять все строки для больших таблиц")
+    table_parser.add_argument("--repeat", type=int, default=3)
+    table_parser.set_defaults(func=bench_table)
+
+    plots_parser = subparsers.add_parser("plots", help="все графики по очереди против пула процессов")
+    plots_parser.add_argument("--pairs", type=int, nargs="+", default=[100, 2000])
+    plots_parser.add_argument("--timepoints", type=int, default=25)
+    plots_parser.add_argument("--workers", type=int, default=5)
+    plots_parser.add_argument("--repeat", type=int, default=3)
+    plots_parser.set_defaults(func=bench_plots)
+
+    figcache_parser = subparsers.add_parser("figcache", help="отрисовка графиков против кэша графиков")
+    figcache_parser.add_argument("--pairs", type=int, nargs="+", default=[100, 2000])
+    figcache_parser.add_argument("--timepoints", type=int, default=25)
+    figcache_parser.add_argument("--repeat", type=int, default=3)
+    figcache_parser.set_defaults(func=bench_figcache)
+
+    fit_parser = subparsers.add_parser("fit", help="подгонка логистической модели / модели Гомпертца")
+    fit_parser.add_argument("--pairs", type=int, default=4000)
+    fit_parser.add_argument("--timepoints", type=int, default=49)
+    fit_parser.add_argument("--model", choices=FIT_MODELS, default="gompertz")
+    fit_parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    fit_parser.add_argument("--shard-size", type=int, default=DEFAULT_FIT_SHARD)
+    fit_parser.add_argument("--repeat", type=int, default=3)
+    fit_parser.set_defaults(func=bench_fit)
+
+    bootstrap_parser = subparsers.add_parser("bootstrap", help="бутстреп-интервалы ингибирования")
+    bootstrap_parser.add_argument("--compounds", type=int, nargs="+", default=[10, 100, 500])
+    bootstrap_parser.add_argument("--resamples", type=int, default=10000)
+    bootstrap_parser.add_argument("--workers", type=int, default=1)
+    bootstrap_parser.add_argument("--legacy-limit", type=int, default=10,
+                                  help="не запускать цикл для большего числа соединений")
+    bootstrap_parser.add_argument("--repeat", type=int, default=3)
+    bootstrap_parser.set_defaults(func=bench_bootstrap)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
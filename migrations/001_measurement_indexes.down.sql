@@ -0,0 +1,3 @@
+-- Откат 001
+DROP INDEX IF EXISTS measurements_experiment_version_idx;
+DROP INDEX IF EXISTS measurements_experiment_access_idx;
@@ -0,0 +1,21 @@
+-- 001. Индексы путей доступа анализатора к measurements
+--
+-- Загрузка эксперимента (MEASUREMENTS_QUERY) фильтрует по id_expirement
+-- и id_measurement <= версия, затем сортирует по соединению, времени и реплике.
+-- Составной индекс с INCLUDE отдает все читаемые столбцы одним index-only
+-- сканированием диапазона эксперимента, без чтения кучи. Сортировку он не
+-- заменяет: запрос упорядочивает по c.compound_name после соединения с compounds,
+-- а ключ индекса - compound_id, поэтому строки эксперимента сортируются целиком.
+CREATE INDEX IF NOT EXISTS measurements_experiment_access_idx
+    ON measurements (id_expirement, compound_id, measurements_time_hours, replicate_number)
+    INCLUDE (od_value, ph_value, temperature_celsius, id_measurement);
+
+-- Проба версии (count, max(id_measurement)) и дозагрузка новых строк
+-- (id_measurement > последняя версия) - короткий диапазон по этому индексу.
+CREATE INDEX IF NOT EXISTS measurements_experiment_version_idx
+    ON measurements (id_expirement, id_measurement);
+
+-- BRIN по времени не добавляется: строки разных экспериментов перемешаны
+-- в куче, и диапазоны времени в блоках почти не коррелируют с запросами.
+
+ANALYZE measurements;
@@ -0,0 +1,3 @@
+-- Откат 002
+DROP TABLE IF EXISTS growth_summary_state;
+DROP TABLE IF EXISTS growth_summary;
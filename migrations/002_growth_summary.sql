@@ -0,0 +1,29 @@
+-- 002. Сводка скоростей роста по парам (эксперимент, соединение, реплика)
+--
+-- Заполняется командой python app.py refresh-growth для стандартных окон
+-- (STANDARD_GROWTH_WINDOWS). Строки окна хранятся в порядке расчета (position),
+-- чтобы чтение давало ту же таблицу, что и расчет по измерениям.
+CREATE TABLE IF NOT EXISTS growth_summary (
+    id_expirement INT NOT NULL REFERENCES expirements(id_expirement) ON DELETE CASCADE,
+    start_time DECIMAL(10,2) NOT NULL,
+    end_time DECIMAL(10,2) NOT NULL,
+    position INT NOT NULL,
+    compound_name VARCHAR(200) NOT NULL,
+    replicate_number INT NOT NULL,
+    initial_od DOUBLE PRECISION NOT NULL,
+    final_od DOUBLE PRECISION NOT NULL,
+    growth_rate DOUBLE PRECISION NOT NULL,
+    PRIMARY KEY (id_expirement, start_time, end_time, position)
+);
+
+-- Версия измерений (count, max(id_measurement)), по которой построена сводка окна.
+-- Сводка свежая, пока версия совпадает с версией загруженных данных.
+CREATE TABLE IF NOT EXISTS growth_summary_state (
+    id_expirement INT NOT NULL REFERENCES expirements(id_expirement) ON DELETE CASCADE,
+    start_time DECIMAL(10,2) NOT NULL,
+    end_time DECIMAL(10,2) NOT NULL,
+    measurement_count BIGINT NOT NULL,
+    max_measurement_id INT,
+    refreshed_at TIMESTAMP NOT NULL DEFAULT now(),
+    PRIMARY KEY (id_expirement, start_time, end_time)
+);